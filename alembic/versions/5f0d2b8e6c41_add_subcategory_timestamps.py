@@ -0,0 +1,30 @@
+"""add created_at / updated_at to subcategories
+
+Revision ID: 5f0d2b8e6c41
+Revises: e3a9c5d71b26
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0d2b8e6c41'
+down_revision: Union[str, Sequence[str], None] = 'e3a9c5d71b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Timestamps let subcategory reads be validated with ETag/Last-Modified."""
+    op.add_column('subcategories', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('subcategories', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop subcategory timestamps."""
+    op.drop_column('subcategories', 'updated_at')
+    op.drop_column('subcategories', 'created_at')
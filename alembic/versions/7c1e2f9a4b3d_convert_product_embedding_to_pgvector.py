@@ -0,0 +1,73 @@
+"""convert product_embedding to pgvector and add ANN indexes
+
+Revision ID: 7c1e2f9a4b3d
+Revises: ccff5b85172d
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e2f9a4b3d'
+down_revision: Union[str, Sequence[str], None] = 'ccff5b85172d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Store product embeddings as vector(1536) and index both embedding columns."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    # Migration 4682b39fb399 created `product_embedding` as TEXT holding a
+    # JSON array. Anything the cast below would reject (malformed JSON,
+    # wrong length, nulls or strings, out-of-range numbers) is cleared so
+    # the backfill script re-embeds those rows. The check is the cast
+    # itself, trapped per value, so no stored text can abort the migration.
+    op.execute(
+        """
+        CREATE FUNCTION pg_temp.is_product_vector(value text) RETURNS boolean
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM value::vector(1536);
+            RETURN true;
+        EXCEPTION WHEN others THEN
+            RETURN false;
+        END
+        $$
+        """
+    )
+    op.execute(
+        "UPDATE products SET product_embedding = NULL "
+        "WHERE product_embedding IS NOT NULL "
+        "AND NOT pg_temp.is_product_vector(product_embedding::text)"
+    )
+    op.execute("DROP FUNCTION pg_temp.is_product_vector(text)")
+    op.execute(
+        "ALTER TABLE products ALTER COLUMN product_embedding TYPE vector(1536) "
+        "USING product_embedding::text::vector(1536)"
+    )
+
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_products_product_embedding_hnsw ON products "
+        "USING hnsw (product_embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_canonical_products_embedding_hnsw ON canonical_products "
+        "USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    )
+
+
+def downgrade() -> None:
+    """Drop the ANN indexes and store product embeddings as TEXT again."""
+    op.execute("DROP INDEX IF EXISTS ix_canonical_products_embedding_hnsw")
+    op.execute("DROP INDEX IF EXISTS ix_products_product_embedding_hnsw")
+    op.alter_column(
+        'products',
+        'product_embedding',
+        type_=sa.Text(),
+        postgresql_using='product_embedding::text',
+    )
@@ -0,0 +1,121 @@
+"""add order_daily_rollups maintained by a trigger on orders
+
+Revision ID: a3f7c2d9e1b5
+Revises: 5f0d2b8e6c41
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f7c2d9e1b5'
+down_revision: Union[str, Sequence[str], None] = '5f0d2b8e6c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Adds (sign = 1) or removes (sign = -1) one order from its rollup bucket.
+APPLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION order_daily_rollups_apply(
+    p_vendor_id integer, p_status text, p_created_at timestamptz,
+    p_total double precision, p_earning double precision, p_sign integer
+) RETURNS void AS $$
+BEGIN
+    IF p_status IS NULL OR p_created_at IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO order_daily_rollups AS r
+        (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+    VALUES (
+        COALESCE(p_vendor_id, 0),
+        p_status,
+        to_timestamp(floor(extract(epoch FROM p_created_at) / 900) * 900),
+        p_sign,
+        p_sign * COALESCE(p_total, 0),
+        p_sign * COALESCE(p_earning, p_total, 0)
+    )
+    ON CONFLICT (vendor_id, status, bucket_start) DO UPDATE SET
+        orders_count = r.orders_count + EXCLUDED.orders_count,
+        total_sales = r.total_sales + EXCLUDED.total_sales,
+        total_earnings = r.total_earnings + EXCLUDED.total_earnings;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION orders_rollup_trigger() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM order_daily_rollups_apply(OLD.vendor_id, OLD.status, OLD.created_at, OLD.total_amount, OLD.vendor_earning, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM order_daily_rollups_apply(NEW.vendor_id, NEW.status, NEW.created_at, NEW.total_amount, NEW.vendor_earning, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGER = """
+CREATE TRIGGER orders_rollup
+AFTER INSERT OR DELETE OR UPDATE OF vendor_id, status, created_at, total_amount, vendor_earning
+ON orders FOR EACH ROW EXECUTE FUNCTION orders_rollup_trigger();
+"""
+
+BACKFILL = """
+INSERT INTO order_daily_rollups (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+SELECT COALESCE(vendor_id, 0), status,
+       to_timestamp(floor(extract(epoch FROM created_at) / 900) * 900),
+       COUNT(*), SUM(COALESCE(total_amount, 0)), SUM(COALESCE(vendor_earning, total_amount, 0))
+FROM orders
+WHERE status IS NOT NULL AND created_at IS NOT NULL
+GROUP BY 1, 2, 3;
+"""
+
+
+def upgrade() -> None:
+    """Create order_daily_rollups and keep it in sync with orders.
+
+    The reports already read orders.vendor_id / vendor_earning; they are
+    added here for databases created from the models alone.
+    """
+    bind = op.get_bind()
+    op.create_table(
+        'order_daily_rollups',
+        sa.Column('vendor_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('orders_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_sales', sa.Numeric(20, 2), nullable=False, server_default='0'),
+        sa.Column('total_earnings', sa.Numeric(20, 2), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('vendor_id', 'status', 'bucket_start'),
+    )
+    op.create_index('ix_order_daily_rollups_status_bucket', 'order_daily_rollups', ['status', 'bucket_start'], unique=False)
+
+    if bind.dialect.name != 'postgresql' or not sa.inspect(bind).has_table('orders'):
+        return
+    op.execute("ALTER TABLE orders ADD COLUMN IF NOT EXISTS vendor_id INTEGER")
+    op.execute("ALTER TABLE orders ADD COLUMN IF NOT EXISTS vendor_earning DOUBLE PRECISION")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_orders_vendor_id ON orders (vendor_id)")
+    op.execute(APPLY_FUNCTION)
+    op.execute(TRIGGER_FUNCTION)
+    # Block order writes while the existing rows are summed so no change
+    # is counted twice or missed between the backfill and the trigger.
+    op.execute("LOCK TABLE orders IN SHARE MODE")
+    op.execute(TRIGGER)
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    """Drop the trigger, its functions and the rollup table (order columns stay)."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS orders_rollup ON orders")
+        op.execute("DROP FUNCTION IF EXISTS orders_rollup_trigger()")
+        op.execute("DROP FUNCTION IF EXISTS order_daily_rollups_apply(integer, text, timestamptz, double precision, double precision, integer)")
+    op.drop_index('ix_order_daily_rollups_status_bucket', table_name='order_daily_rollups')
+    op.drop_table('order_daily_rollups')
@@ -0,0 +1,43 @@
+"""add product_attributes cache table
+
+Revision ID: b4d8e1c2a7f0
+Revises: 7c1e2f9a4b3d
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d8e1c2a7f0'
+down_revision: Union[str, Sequence[str], None] = '7c1e2f9a4b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create product_attributes for cached LLM attribute extraction."""
+    op.create_table(
+        'product_attributes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('extractor_version', sa.String(length=100), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.Column('attributes', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('content_hash', 'extractor_version', name='uq_product_attributes_hash_version'),
+    )
+    op.create_index(op.f('ix_product_attributes_id'), 'product_attributes', ['id'], unique=False)
+    op.create_index(op.f('ix_product_attributes_product_id'), 'product_attributes', ['product_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop product_attributes."""
+    op.drop_index(op.f('ix_product_attributes_product_id'), table_name='product_attributes')
+    op.drop_index(op.f('ix_product_attributes_id'), table_name='product_attributes')
+    op.drop_table('product_attributes')
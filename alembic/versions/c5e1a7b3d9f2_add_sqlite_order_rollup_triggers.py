@@ -0,0 +1,95 @@
+"""maintain order_daily_rollups with triggers on SQLite
+
+Revision ID: c5e1a7b3d9f2
+Revises: a3f7c2d9e1b5
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e1a7b3d9f2'
+down_revision: Union[str, Sequence[str], None] = 'a3f7c2d9e1b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# bucket_start uses the text format SQLAlchemy binds datetimes with on
+# SQLite, so range filters on it compare like for like.
+TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS orders_rollup_insert AFTER INSERT ON orders BEGIN
+    INSERT INTO order_daily_rollups (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+    SELECT COALESCE(NEW.vendor_id, 0), NEW.status, strftime('%Y-%m-%d %H:%M:%S.000000', CAST(strftime('%s', NEW.created_at) AS INTEGER) / 900 * 900, 'unixepoch'),
+           1, 1 * COALESCE(NEW.total_amount, 0), 1 * COALESCE(NEW.vendor_earning, NEW.total_amount, 0)
+    WHERE NEW.status IS NOT NULL AND NEW.created_at IS NOT NULL
+    ON CONFLICT (vendor_id, status, bucket_start) DO UPDATE SET
+        orders_count = orders_count + excluded.orders_count,
+        total_sales = total_sales + excluded.total_sales,
+        total_earnings = total_earnings + excluded.total_earnings;
+END""",
+    """CREATE TRIGGER IF NOT EXISTS orders_rollup_delete AFTER DELETE ON orders BEGIN
+    INSERT INTO order_daily_rollups (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+    SELECT COALESCE(OLD.vendor_id, 0), OLD.status, strftime('%Y-%m-%d %H:%M:%S.000000', CAST(strftime('%s', OLD.created_at) AS INTEGER) / 900 * 900, 'unixepoch'),
+           -1, -1 * COALESCE(OLD.total_amount, 0), -1 * COALESCE(OLD.vendor_earning, OLD.total_amount, 0)
+    WHERE OLD.status IS NOT NULL AND OLD.created_at IS NOT NULL
+    ON CONFLICT (vendor_id, status, bucket_start) DO UPDATE SET
+        orders_count = orders_count + excluded.orders_count,
+        total_sales = total_sales + excluded.total_sales,
+        total_earnings = total_earnings + excluded.total_earnings;
+END""",
+    """CREATE TRIGGER IF NOT EXISTS orders_rollup_update AFTER UPDATE OF vendor_id, status, created_at, total_amount, vendor_earning ON orders BEGIN
+    INSERT INTO order_daily_rollups (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+    SELECT COALESCE(OLD.vendor_id, 0), OLD.status, strftime('%Y-%m-%d %H:%M:%S.000000', CAST(strftime('%s', OLD.created_at) AS INTEGER) / 900 * 900, 'unixepoch'),
+           -1, -1 * COALESCE(OLD.total_amount, 0), -1 * COALESCE(OLD.vendor_earning, OLD.total_amount, 0)
+    WHERE OLD.status IS NOT NULL AND OLD.created_at IS NOT NULL
+    ON CONFLICT (vendor_id, status, bucket_start) DO UPDATE SET
+        orders_count = orders_count + excluded.orders_count,
+        total_sales = total_sales + excluded.total_sales,
+        total_earnings = total_earnings + excluded.total_earnings;
+    INSERT INTO order_daily_rollups (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+    SELECT COALESCE(NEW.vendor_id, 0), NEW.status, strftime('%Y-%m-%d %H:%M:%S.000000', CAST(strftime('%s', NEW.created_at) AS INTEGER) / 900 * 900, 'unixepoch'),
+           1, 1 * COALESCE(NEW.total_amount, 0), 1 * COALESCE(NEW.vendor_earning, NEW.total_amount, 0)
+    WHERE NEW.status IS NOT NULL AND NEW.created_at IS NOT NULL
+    ON CONFLICT (vendor_id, status, bucket_start) DO UPDATE SET
+        orders_count = orders_count + excluded.orders_count,
+        total_sales = total_sales + excluded.total_sales,
+        total_earnings = total_earnings + excluded.total_earnings;
+END""",
+]
+
+BACKFILL = """
+INSERT INTO order_daily_rollups (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+SELECT COALESCE(vendor_id, 0), status, strftime('%Y-%m-%d %H:%M:%S.000000', CAST(strftime('%s', created_at) AS INTEGER) / 900 * 900, 'unixepoch'),
+       COUNT(*), SUM(COALESCE(total_amount, 0)), SUM(COALESCE(vendor_earning, total_amount, 0))
+FROM orders
+WHERE status IS NOT NULL AND created_at IS NOT NULL
+GROUP BY 1, 2, 3
+"""
+
+
+def upgrade() -> None:
+    """Keep order_daily_rollups in sync with orders on SQLite as well.
+
+    PostgreSQL got its trigger in a3f7c2d9e1b5. SQLite serialises writes,
+    so summing the existing orders and creating the triggers in this
+    migration's transaction misses nothing.
+    """
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite' or not sa.inspect(bind).has_table('orders'):
+        return
+    op.execute("DELETE FROM order_daily_rollups")
+    op.execute(BACKFILL)
+    for ddl in TRIGGERS:
+        op.execute(ddl)
+
+
+def downgrade() -> None:
+    """Drop the SQLite triggers (the rollup rows stay until a3f7c2d9e1b5 is downgraded)."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for name in ('orders_rollup_insert', 'orders_rollup_delete', 'orders_rollup_update'):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
@@ -0,0 +1,46 @@
+"""add composite indexes for keyset pagination of products
+
+Revision ID: e3a9c5d71b26
+Revises: b4d8e1c2a7f0
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c5d71b26'
+down_revision: Union[str, Sequence[str], None] = 'b4d8e1c2a7f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Make products.created_at a total-order key and index (filter, created_at, id)."""
+    # Rows without a timestamp would fall outside every cursor comparison
+    op.execute("UPDATE products SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column(
+        'products', 'created_at',
+        existing_type=sa.DateTime(timezone=True),
+        existing_server_default=sa.text('now()'),
+        nullable=False,
+    )
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'], unique=False)
+    op.create_index('ix_products_is_public_created_at_id', 'products', ['is_public', 'created_at', 'id'], unique=False)
+    op.create_index('ix_products_vendor_id_created_at_id', 'products', ['vendor_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the keyset indexes and relax created_at again."""
+    op.drop_index('ix_products_vendor_id_created_at_id', table_name='products')
+    op.drop_index('ix_products_is_public_created_at_id', table_name='products')
+    op.drop_index('ix_products_created_at_id', table_name='products')
+    op.alter_column(
+        'products', 'created_at',
+        existing_type=sa.DateTime(timezone=True),
+        existing_server_default=sa.text('now()'),
+        nullable=True,
+    )
@@ -6,13 +6,74 @@ from pydantic import ConfigDict
 # For production, set the `DATABASE_URL` environment variable or `.env` file.
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite+aiosqlite:///./iccs.db"
+    # Engine / connection pool (pool settings are ignored for SQLite).
+    # Size pool_size + max_overflow times the worker count below max_connections.
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg only: prepared statement cache per connection (0 behind PgBouncer)
+    # and a server-side statement_timeout (0 = server default)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_APPLICATION_NAME: str = "iccs-backend"
+    # Read replicas for reporting/analytics (comma-separated URLs, empty = primary only).
+    # A replica lagging more than DB_REPLICA_MAX_LAG_SECONDS is skipped until it catches up.
+    DATABASE_REPLICA_URLS: str = ""
+    DB_REPLICA_MAX_LAG_SECONDS: float = 30.0
+    DB_REPLICA_CHECK_SECONDS: float = 5.0
     REDIS_URL: str = "redis://localhost:6379"
     # Secret settings for JWT; set these in production via env or .env
     SECRET_KEY: str = "change-me-please"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Decoded tokens and resolved roles, per process (see app/core/principal_cache.py)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Password hashing work factors and the hashing thread pool (0 = min(4, CPUs))
+    PASSWORD_PBKDF2_ROUNDS: int = 29000
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_CONCURRENCY: int = 0
+    # Login token buckets: burst size and refill rate, per client IP and per email
+    LOGIN_RATE_LIMIT_IP_BURST: int = 20
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: float = 30
+    LOGIN_RATE_LIMIT_EMAIL_BURST: int = 5
+    LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE: float = 5
     PRODUCT_DUPLICATE_THRESHOLD: float = 0.90
     OPENAI_API_KEY: str = ""
+    # Shared keep-alive connection pool for the OpenAI client
+    OPENAI_TIMEOUT_SECONDS: float = 30.0
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    # Storefront listing pages cached per catalog version
+    CATALOG_CACHE_TTL_SECONDS: int = 300
+    # Report/dashboard results (see app/core/result_cache.py): fresh for the TTL
+    # (spread by ±jitter), then served stale while one worker refreshes them
+    REPORT_CACHE_TTL_SECONDS: int = 120
+    REPORT_CACHE_STALE_SECONDS: int = 600
+    RESULT_CACHE_TTL_JITTER: float = 0.1
+    RESULT_CACHE_LOCK_SECONDS: float = 30.0
+    # Product similarity search backend: auto | exact | ivf | pgvector
+    VECTOR_INDEX_BACKEND: str = "auto"
+    VECTOR_INDEX_IVF_NLIST: int = 0  # 0 = 4 * sqrt(catalog size)
+    VECTOR_INDEX_IVF_NPROBE: int = 8
+    VECTOR_INDEX_IVF_MIN_TRAIN_SIZE: int = 2048
+    VECTOR_INDEX_HNSW_EF_SEARCH: int = 40
+    # Product matching: candidates retrieved by embedding before LLM comparison
+    MATCH_CANDIDATE_K: int = 20
+    MATCH_LLM_CONCURRENCY: int = 8
+    # Embeddings: provider (openai | local), model name and the vector cache
+    EMBEDDING_PROVIDER: str = "openai"
+    LOCAL_EMBEDDING_DIM: int = 1536
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_CACHE_MEMORY_MB: int = 64
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200000  # shared tier (Redis or SQLite file)
+    EMBEDDING_CACHE_PATH: str = "./.cache/embeddings.sqlite3"  # empty disables the file fallback
+    # Concurrent embedding requests are coalesced into one API call
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_WINDOW_MS: float = 10.0
 
     model_config = ConfigDict(env_file=".env", extra="ignore")
 
@@ -0,0 +1,86 @@
+"""Password hashing off the event loop.
+
+PBKDF2 and bcrypt cost tens of milliseconds of CPU per call by design.
+The async helpers here run them on a small dedicated thread pool (both
+release the GIL while hashing), and a semaphore caps how many run at once
+so a burst of logins queues up instead of starving other requests of CPU.
+
+Work factors come from settings; hashes made with older parameters keep
+verifying and can be upgraded on login via `needs_rehash`.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+# Users: PBKDF2 for new hashes, bcrypt still accepted
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256", "bcrypt"],
+    deprecated="auto",
+    pbkdf2_sha256__rounds=settings.PASSWORD_PBKDF2_ROUNDS,
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+# Vendor accounts have always been stored as bcrypt
+vendor_pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _max_concurrency() -> int:
+    return settings.PASSWORD_HASH_CONCURRENCY or min(4, os.cpu_count() or 1)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_concurrency(), thread_name_prefix="password-hash")
+    return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(_max_concurrency())
+    return _semaphore
+
+
+async def _run(fn, *args):
+    async with _get_semaphore():
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+
+
+async def hash_password(password: str, context: CryptContext = pwd_context) -> str:
+    return await _run(context.hash, password)
+
+
+async def check_password(password: str, hashed_password: str, context: CryptContext = pwd_context) -> bool:
+    """Async counterpart of `security.verify_password`; False for unknown hash formats."""
+    try:
+        return await _run(context.verify, password, hashed_password)
+    except (ValueError, TypeError):
+        return False
+
+
+def needs_rehash(hashed_password: str, context: CryptContext = pwd_context) -> bool:
+    """Whether the hash was made with a deprecated scheme or other work factor."""
+    try:
+        return context.needs_update(hashed_password)
+    except (ValueError, TypeError):
+        return False
+
+
+def shutdown_hashing_pool() -> None:
+    global _executor, _semaphore
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _semaphore = None
@@ -0,0 +1,95 @@
+"""Conditional GET support (ETag / Last-Modified).
+
+Endpoints compute a cheap validator first (a table watermark, a row's
+``updated_at`` or the catalog version) and call `conditional_response`.
+When the client's cached copy is still current it returns a bodiless
+``304 Not Modified`` before any rows are loaded or serialised.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+# Clients may store responses but must revalidate before reusing them
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the validator parts."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: ignore any W/ prefix
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """RFC 9110 precedence: If-None-Match wins; If-Modified-Since only without it."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+    vary: Optional[str] = None,
+) -> Optional[Response]:
+    """Attach validators to `response`; return a 304 if the client is up to date.
+
+    Usage in an endpoint::
+
+        not_modified = conditional_response(request, response, etag)
+        if not_modified is not None:
+            return not_modified
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    if vary:
+        headers["Vary"] = vary
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+async def table_watermark(db: AsyncSession, model) -> Tuple[int, Optional[datetime], Optional[int]]:
+    """`(row count, max(updated_at), max(id))` for `model` in one aggregate query.
+
+    Inserts move the count and max id, updates move max(updated_at) and
+    deletes move the count, so any change to the table changes the tuple.
+    Use it for the ETag only; max(updated_at) alone is not a valid
+    Last-Modified for a collection, since it misses deletes.
+    """
+    result = await db.execute(select(func.count(model.id), func.max(model.updated_at), func.max(model.id)))
+    count, updated_at, max_id = result.one()
+    return count, updated_at, max_id
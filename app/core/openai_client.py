@@ -0,0 +1,76 @@
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# One client (and one keep-alive connection pool) per process, created at
+# startup. Scripts and tests that skip the app lifespan get it lazily.
+_http_client: Optional[httpx.AsyncClient] = None
+_client = None
+
+
+def _api_key(api_key: Optional[str] = None) -> str:
+    key = api_key or settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+    if not key:
+        raise ValueError("OPENAI_API_KEY not set")
+    return key
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared HTTP connection pool used by every OpenAI client."""
+    global _http_client, _client
+    if _http_client is None or _http_client.is_closed:
+        # Clients bound to a closed pool can't be reused
+        _client = None
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT_SECONDS, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=60.0,
+            ),
+        )
+    return _http_client
+
+
+def get_openai_client(api_key: Optional[str] = None):
+    """Return the application-wide `AsyncOpenAI` client.
+
+    Raises ValueError when no API key is configured. Passing a different
+    `api_key` returns a separate client that still shares the connection pool.
+    """
+    global _client
+    key = _api_key(api_key)
+    try:
+        from openai import AsyncOpenAI
+    except Exception as e:
+        raise ImportError("openai package is required to get an OpenAI client") from e
+
+    http_client = get_http_client()
+    if _client is not None and _client.api_key == key:
+        return _client
+    client = AsyncOpenAI(api_key=key, http_client=http_client, max_retries=2)
+    if api_key is None or _client is None:
+        _client = client
+    return client
+
+
+async def init_openai_client() -> None:
+    """Create the client at startup so the first request doesn't pay for it."""
+    try:
+        get_openai_client()
+    except ValueError:
+        logger.warning("OPENAI_API_KEY not set; AI features will fail until it is configured")
+
+
+async def close_openai_client() -> None:
+    global _client, _http_client
+    _client = None
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
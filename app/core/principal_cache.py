@@ -0,0 +1,193 @@
+"""Per-process cache of authenticated principals, keyed by token hash.
+
+A hit skips JWT signature verification and any user lookup: the entry
+holds what `Principal` needs (user id, role, vendor account, active flag).
+Entries expire at the token's ``exp`` or after a short TTL, whichever
+comes first, and the cache is a bounded LRU.
+
+`invalidate_user` drops a user's entries and marks every token issued
+before that moment as stale, so requests carrying one re-read the role and
+active flag from the database instead of trusting the claims (cached or
+not). `is_token_stale` only reads this process's markers, so the request
+path never waits on the network.
+
+Markers reach the other workers through Redis: the sorted set
+``auth:stale_before`` holds each user's latest marker for the lifetime of
+a token, and the counter ``auth:invalidations`` goes up with every write.
+`watch_stale_markers` (started with the app) polls the counter off the
+event loop once a second and copies the set when it moves, so another
+worker honours an invalidation within about a second. Without Redis only
+the invalidating process knows; run a single worker in that case.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core import redis as redis_cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STALE_KEY = "auth:stale_before"
+_INVALIDATIONS_KEY = "auth:invalidations"
+_SYNC_SECONDS = 1.0
+# Counter value of the last copy of the markers, None before the first one
+_synced_invalidations: Optional[int] = None
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any, Dict[str, Any]]]" = OrderedDict()
+        self._by_user: Dict[Any, Set[str]] = {}
+        # str(user id) -> wall-clock time of the last invalidation
+        self._stale_before: Dict[str, float] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    self._drop(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return dict(entry[2])
+
+    def put(self, key: str, fields: Dict[str, Any], token_exp: Optional[float] = None) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        user_id = fields.get("id")
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (expires_at, user_id, dict(fields))
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def update(self, key: str, **fields) -> None:
+        """Fill in fields resolved after the entry was stored (e.g. the role
+        of a token without a role claim)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2].update(fields)
+
+    def is_stale(self, user_id, issued_at: Optional[float]) -> bool:
+        """Whether claims in a token issued at `issued_at` predate a change to the user."""
+        with self._lock:
+            stale_before = self._stale_before.get(str(user_id))
+        if stale_before is None:
+            return False
+        return issued_at is None or float(issued_at) <= stale_before
+
+    def invalidate_user(self, user_id, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        horizon = now - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._drop(key)
+            self._prune_markers(horizon)
+            self._stale_before[str(user_id)] = now
+
+    def merge_markers(self, markers: Dict[str, float], now: Optional[float] = None) -> None:
+        """Adopt invalidations made by other processes (``{str(user id): time}``)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._prune_markers(now - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+            for uid, stale_before in markers.items():
+                self._stale_before[uid] = max(stale_before, self._stale_before.get(uid, 0.0))
+
+    def _prune_markers(self, horizon: float) -> None:
+        # Markers older than any live token can go
+        for uid in [u for u, t in self._stale_before.items() if t < horizon]:
+            del self._stale_before[uid]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+            self._stale_before.clear()
+            self._hits = self._misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry[1]]
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user(user_id) -> None:
+    """Call after changing a user's role or active flag (see `crud_user.update_user_access`)."""
+    now = time.time()
+    principal_cache.invalidate_user(user_id, now)
+    # Markers only matter while tokens issued before them can still be live
+    token_lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    redis_cache.zadd_trim(_STALE_KEY, str(user_id), now, now - token_lifetime, token_lifetime)
+    redis_cache.incr_counter(_INVALIDATIONS_KEY)
+
+
+def is_token_stale(user_id, known_at: Optional[float]) -> bool:
+    """Whether what we know about the user (token claims issued, or a row read,
+    at `known_at`) predates a role or active-flag change. In-process only."""
+    return principal_cache.is_stale(user_id, known_at)
+
+
+def sync_stale_markers() -> None:
+    """Copy other workers' markers from Redis if any were written since the
+    last copy. Blocking; `watch_stale_markers` runs it off the event loop."""
+    global _synced_invalidations
+    count = redis_cache.get_counter(_INVALIDATIONS_KEY)
+    if count is None or count == _synced_invalidations:
+        return
+    now = time.time()
+    markers = redis_cache.zrange_since(_STALE_KEY, now - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    if markers is None:
+        return
+    principal_cache.merge_markers(markers, now)
+    _synced_invalidations = count
+
+
+async def watch_stale_markers() -> None:
+    """Keep this process's markers current; runs until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(sync_stale_markers)
+        except Exception as e:
+            logger.warning("Syncing principal invalidations failed: %s", e)
+        await asyncio.sleep(_SYNC_SECONDS)
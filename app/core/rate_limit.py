@@ -0,0 +1,117 @@
+"""Token-bucket rate limiting for credential checks.
+
+Buckets live in Redis (one atomic Lua call per check) so every worker
+shares them; without Redis a per-process bucket table is used instead.
+`limit_login_attempts` is a dependency for the login endpoints: it runs
+before the user lookup and password verification, so a rejected attempt
+costs a dictionary or Redis round trip rather than a hash computation.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core import redis as redis_cache
+from app.core.config import settings
+
+_KEY_PREFIX = "ratelimit:"
+
+
+class LocalTokenBuckets:
+    """In-process token buckets, bounded to `max_keys` (least recently used dropped)."""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            allowed = tokens >= cost
+            retry_after = 0.0
+            if allowed:
+                tokens -= cost
+            else:
+                retry_after = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+_local_buckets = LocalTokenBuckets()
+
+
+def take_token(key: str, capacity: float, per_minute: float) -> Tuple[bool, float]:
+    """Consume one token from bucket `key`; returns `(allowed, retry_after_seconds)`."""
+    rate = per_minute / 60.0
+    result = redis_cache.token_bucket_take(_KEY_PREFIX + key, capacity, rate)
+    if result is None:
+        result = _local_buckets.take(key, capacity, rate)
+    return result
+
+
+def _reject(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts; try again later",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _client_ip(request: Request) -> str:
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the real client
+    return request.client.host if request.client else "unknown"
+
+
+async def _submitted_email(request: Request) -> Optional[str]:
+    """Email from a JSON login body or an OAuth2 form (`username`).
+
+    FastAPI has already read the body for the endpoint, so this re-uses the
+    cached copy.
+    """
+    try:
+        if request.headers.get("content-type", "").startswith("application/json"):
+            body = await request.json()
+            email = body.get("email") if isinstance(body, dict) else None
+        else:
+            email = (await request.form()).get("username")
+    except Exception:
+        return None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+async def limit_login_attempts(request: Request) -> None:
+    """Reject login attempts beyond the per-IP and per-email budgets with 429."""
+    allowed, retry_after = take_token(
+        f"login:ip:{_client_ip(request)}",
+        settings.LOGIN_RATE_LIMIT_IP_BURST,
+        settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE,
+    )
+    if not allowed:
+        raise _reject(retry_after)
+
+    email = await _submitted_email(request)
+    if email is None:
+        return
+    # Hash so addresses don't appear in Redis keys
+    digest = hashlib.sha256(email.encode("utf-8")).hexdigest()[:32]
+    allowed, retry_after = take_token(
+        f"login:email:{digest}",
+        settings.LOGIN_RATE_LIMIT_EMAIL_BURST,
+        settings.LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE,
+    )
+    if not allowed:
+        raise _reject(retry_after)
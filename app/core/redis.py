@@ -1,4 +1,6 @@
+import json
 import logging
+import time
 import redis
 from app.core.config import settings
 
@@ -7,6 +9,10 @@ logger = logging.getLogger(__name__)
 # Redis client will be created lazily on first use so imports don't block
 redis_client = None
 _redis_available = False
+# After a failed connection attempt, wait this long before trying again so
+# callers on the request path don't each pay a connect timeout.
+_RETRY_SECONDS = 30.0
+_next_attempt_at = 0.0
 
 
 def _ensure_redis_client() -> None:
@@ -15,9 +21,12 @@ def _ensure_redis_client() -> None:
     This is intentionally lazy to avoid blocking at import time when
     Redis is not available (e.g. in test environments or CI).
     """
-    global redis_client, _redis_available
+    global redis_client, _redis_available, _next_attempt_at
     if redis_client is not None or _redis_available:
         return
+    if time.monotonic() < _next_attempt_at:
+        return
+    _next_attempt_at = time.monotonic() + _RETRY_SECONDS
 
     try:
         # Short timeouts so attempts fail fast
@@ -39,6 +48,12 @@ def _ensure_redis_client() -> None:
         logger.debug("Could not create Redis client: %s; caching disabled", e)
 
 
+def is_available() -> bool:
+    """Return True if Redis is reachable, connecting first if needed."""
+    _ensure_redis_client()
+    return _redis_available
+
+
 def get_inventory_quantity(product_id: int):
     """Return cached quantity or None. Fail silently if Redis is unavailable."""
     _ensure_redis_client()
@@ -75,3 +90,243 @@ def delete_inventory_quantity(product_id: int):
         redis_client.delete(key)
     except Exception as e:
         logger.warning("Redis DEL failed for %s: %s", key, e)
+
+
+def get_bytes_touch(key: str, lru_key: str, now: float):
+    """Return a raw value and bump its recency in the `lru_key` sorted set.
+
+    Returns None on a miss or when Redis is unavailable.
+    """
+    _ensure_redis_client()
+    if not _redis_available:
+        return None
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.zadd(lru_key, {key: now}, xx=True)
+        value, _ = pipe.execute()
+        return value
+    except Exception as e:
+        logger.warning("Redis GET failed for %s: %s", key, e)
+        return None
+
+
+def set_bytes_bounded(key: str, value: bytes, lru_key: str, now: float, max_entries: int) -> int:
+    """Store a raw value tracked in the `lru_key` sorted set, evicting the
+    least recently used keys beyond `max_entries`. Returns the number of
+    evicted keys; failures are ignored.
+    """
+    _ensure_redis_client()
+    if not _redis_available:
+        return 0
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.set(key, value)
+        pipe.zadd(lru_key, {key: now})
+        pipe.zcard(lru_key)
+        _, _, size = pipe.execute()
+        overflow = int(size) - max_entries
+        if overflow <= 0:
+            return 0
+        evicted = [member for member, _ in redis_client.zpopmin(lru_key, overflow)]
+        if evicted:
+            redis_client.delete(*evicted)
+        return len(evicted)
+    except Exception as e:
+        logger.warning("Redis SET failed for %s: %s", key, e)
+        return 0
+
+
+def cache_get_json(key: str):
+    """Return a cached JSON value or None. Fail silently if Redis is unavailable."""
+    _ensure_redis_client()
+    if not _redis_available:
+        return None
+    try:
+        raw = redis_client.get(key)
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        logger.warning("Redis GET failed for %s: %s", key, e)
+        return None
+
+
+def cache_set_json(key: str, value, ttl_seconds: int) -> None:
+    """Cache a JSON-serialisable value with a TTL; ignore failures."""
+    _ensure_redis_client()
+    if not _redis_available:
+        return
+    try:
+        redis_client.setex(key, ttl_seconds, json.dumps(value, default=str))
+    except Exception as e:
+        logger.warning("Redis SET failed for %s: %s", key, e)
+
+
+def zadd_trim(key: str, member: str, score: float, min_score: float, ttl_seconds: int) -> None:
+    """Set `member`'s score in a sorted set and drop members scored below
+    `min_score`; the set expires `ttl_seconds` after the last write. Ignore failures."""
+    _ensure_redis_client()
+    if not _redis_available:
+        return
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zadd(key, {member: score})
+        pipe.zremrangebyscore(key, "-inf", f"({min_score}")
+        pipe.expire(key, ttl_seconds)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Redis ZADD failed for %s: %s", key, e)
+
+
+def zrange_since(key: str, min_score: float):
+    """Return ``{member: score}`` for members scored at least `min_score`,
+    or None if Redis is unavailable."""
+    _ensure_redis_client()
+    if not _redis_available:
+        return None
+    try:
+        pairs = redis_client.zrangebyscore(key, min_score, "+inf", withscores=True)
+        return {member.decode("utf-8"): float(score) for member, score in pairs}
+    except Exception as e:
+        logger.warning("Redis ZRANGEBYSCORE failed for %s: %s", key, e)
+        return None
+
+
+# Increment a version counter and log `version:item` under that version in
+# one step, so readers never see a version whose entry is missing. Entries
+# more than ARGV[2] versions old are trimmed.
+_APPEND_LOG_LUA = """
+local version = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[2], version, version .. ':' .. ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', version - tonumber(ARGV[2]))
+return version
+"""
+_append_log_script = None
+
+
+def append_versioned_log(version_key: str, log_key: str, item: str, max_entries: int):
+    """Bump the counter at `version_key` and log `item` under the new version
+    in the `log_key` sorted set (see `zrange_since`). Returns the new version,
+    or None if Redis is unavailable."""
+    global _append_log_script
+    _ensure_redis_client()
+    if not _redis_available:
+        return None
+    try:
+        if _append_log_script is None:
+            _append_log_script = redis_client.register_script(_APPEND_LOG_LUA)
+        return int(_append_log_script(keys=[version_key, log_key], args=[item, max_entries]))
+    except Exception as e:
+        logger.warning("Redis log append failed for %s: %s", log_key, e)
+        return None
+
+
+def get_counter(key: str):
+    """Return an integer counter, 0 when unset, or None if Redis is unavailable."""
+    _ensure_redis_client()
+    if not _redis_available:
+        return None
+    try:
+        value = redis_client.get(key)
+        return int(value) if value else 0
+    except Exception as e:
+        logger.warning("Redis GET failed for %s: %s", key, e)
+        return None
+
+
+def incr_counter(key: str):
+    """Atomically increment a counter; returns the new value or None on failure."""
+    _ensure_redis_client()
+    if not _redis_available:
+        return None
+    try:
+        return int(redis_client.incr(key))
+    except Exception as e:
+        logger.warning("Redis INCR failed for %s: %s", key, e)
+        return None
+
+
+# Token bucket refilled continuously at `rate` tokens/second, up to
+# `capacity`. Uses the server clock so every worker sees the same time.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+_token_bucket_script = None
+
+
+def token_bucket_take(key: str, capacity: float, rate: float, cost: float = 1.0):
+    """Take `cost` tokens from the bucket at `key` in one atomic script call.
+
+    Returns `(allowed, retry_after_seconds)`, or None if Redis is unavailable.
+    """
+    global _token_bucket_script
+    _ensure_redis_client()
+    if not _redis_available:
+        return None
+    try:
+        if _token_bucket_script is None:
+            _token_bucket_script = redis_client.register_script(_TOKEN_BUCKET_LUA)
+        allowed, retry_after = _token_bucket_script(keys=[key], args=[capacity, rate, cost])
+        return bool(int(allowed)), float(retry_after)
+    except Exception as e:
+        logger.warning("Redis token bucket failed for %s: %s", key, e)
+        return None
+
+
+# Delete the lock only if it still holds our token, so a holder whose lock
+# expired cannot release the next holder's.
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_release_lock_script = None
+
+
+def try_lock(key: str, token: str, ttl_seconds: float):
+    """Take a short-lived lock (SET NX PX) identified by `token`.
+
+    Returns True if acquired, False if someone else holds it, or None if
+    Redis is unavailable.
+    """
+    _ensure_redis_client()
+    if not _redis_available:
+        return None
+    try:
+        return bool(redis_client.set(key, token, nx=True, px=max(1, int(ttl_seconds * 1000))))
+    except Exception as e:
+        logger.warning("Redis lock failed for %s: %s", key, e)
+        return None
+
+
+def release_lock(key: str, token: str) -> None:
+    """Release a lock taken with `try_lock`; ignore failures."""
+    global _release_lock_script
+    _ensure_redis_client()
+    if not _redis_available:
+        return
+    try:
+        if _release_lock_script is None:
+            _release_lock_script = redis_client.register_script(_RELEASE_LOCK_LUA)
+        _release_lock_script(keys=[key], args=[token])
+    except Exception as e:
+        logger.warning("Redis unlock failed for %s: %s", key, e)
@@ -0,0 +1,231 @@
+"""Stampede-safe caching of expensive read-only results (reports, dashboards).
+
+`cached_result` wraps an async ``fn(db, *args, **kwargs)`` that returns a
+JSON-serialisable value; callers invoke the result as ``fn(*args, **kwargs)``. Every entry is fresh for a jittered `ttl` (so keys
+written together do not expire together) and may then be served stale for
+`stale_ttl` more seconds:
+
+- fresh hit: returned as is
+- stale hit: returned immediately, and whoever takes the refresh lock
+  recomputes it in the background on its own read session
+- miss: single-flight. Concurrent callers in this process await the same
+  computation; across workers the lock holder computes while the others
+  poll for its result, computing themselves only if it does not arrive
+
+Results are always computed on a read session the cache opens itself
+(`db`), never on one of the callers': a shared computation outlives
+whichever request started it, and a hit needs no session at all.
+
+Entries live in Redis when available; otherwise in a bounded per-process
+store, so single-worker deployments and tests get the same behaviour.
+Exceptions are never cached.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.core import redis as redis_cache
+from app.core.config import settings
+from app.db.session import replica_router
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "result:"
+_LOCK_SUFFIX = ":lock"
+_LOCAL_MAX_ENTRIES = 1024
+# How often a waiting worker checks whether the lock holder has stored the value
+_POLL_SECONDS = 0.05
+
+_lock = threading.Lock()
+_local_entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_local_locks: Dict[str, float] = {}
+_inflight: Dict[str, "asyncio.Task"] = {}
+# Strong references so background refreshes are not garbage collected mid-flight
+_background: Set["asyncio.Task"] = set()
+_counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "refresh_errors": 0}
+
+
+def jittered(ttl: float, jitter: Optional[float] = None) -> float:
+    """`ttl` spread uniformly by ±`jitter` (a fraction, default from settings)."""
+    jitter = settings.RESULT_CACHE_TTL_JITTER if jitter is None else jitter
+    return ttl * random.uniform(1.0 - jitter, 1.0 + jitter)
+
+
+def result_key(namespace: str, *args, **kwargs) -> str:
+    raw = json.dumps([args, sorted(kwargs.items())], default=str, separators=(",", ":"))
+    return f"{_KEY_PREFIX}{namespace}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+
+
+def _read(key: str) -> Optional[Dict[str, Any]]:
+    entry = redis_cache.cache_get_json(key)
+    if entry is None and not redis_cache.is_available():
+        with _lock:
+            local = _local_entries.get(key)
+            if local is not None and local[0] > time.time():
+                _local_entries.move_to_end(key)
+                entry = local[1]
+    return entry
+
+
+def _write(key: str, value: Any, ttl: float, stale_ttl: float) -> None:
+    fresh_for = jittered(ttl)
+    entry = {"value": value, "fresh_until": time.time() + fresh_for}
+    expires_in = math.ceil(fresh_for + stale_ttl)
+    redis_cache.cache_set_json(key, entry, expires_in)
+    if not redis_cache.is_available():
+        # Round-trip through JSON so local hits look exactly like Redis hits
+        entry = json.loads(json.dumps(entry, default=str))
+        with _lock:
+            _local_entries[key] = (time.time() + expires_in, entry)
+            _local_entries.move_to_end(key)
+            while len(_local_entries) > _LOCAL_MAX_ENTRIES:
+                _local_entries.popitem(last=False)
+
+
+def _acquire(key: str, token: str) -> bool:
+    lock_seconds = settings.RESULT_CACHE_LOCK_SECONDS
+    acquired = redis_cache.try_lock(key + _LOCK_SUFFIX, token, lock_seconds)
+    if acquired is not None:
+        return acquired
+    now = time.monotonic()
+    with _lock:
+        if _local_locks.get(key, 0.0) > now:
+            return False
+        _local_locks[key] = now + lock_seconds
+        return True
+
+
+def _release(key: str, token: str) -> None:
+    redis_cache.release_lock(key + _LOCK_SUFFIX, token)
+    with _lock:
+        _local_locks.pop(key, None)
+
+
+def _read_session():
+    """Session maker for computing results, independent of any request."""
+    return replica_router.session_maker()
+
+
+async def _compute(key: str, fn, args, kwargs, ttl: float, stale_ttl: float):
+    session_maker = await _read_session()
+    async with session_maker() as db:
+        value = await fn(db, *args, **kwargs)
+    _write(key, value, ttl, stale_ttl)
+    return value
+
+
+async def _load(key: str, fn, args, kwargs, ttl: float, stale_ttl: float):
+    token = uuid.uuid4().hex
+    if _acquire(key, token):
+        try:
+            return await _compute(key, fn, args, kwargs, ttl, stale_ttl)
+        finally:
+            _release(key, token)
+    # Another worker is computing it: wait for its result rather than
+    # sending the same query to the database
+    deadline = time.monotonic() + settings.RESULT_CACHE_LOCK_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(_POLL_SECONDS)
+        entry = _read(key)
+        if entry is not None:
+            return entry["value"]
+    return await _compute(key, fn, args, kwargs, ttl, stale_ttl)
+
+
+async def _refresh(key: str, token: str, fn, args, kwargs, ttl: float, stale_ttl: float) -> None:
+    try:
+        await _compute(key, fn, args, kwargs, ttl, stale_ttl)
+        _count("refreshes")
+    except Exception as e:
+        _count("refresh_errors")
+        logger.warning("Background refresh of %s failed: %s", key, e)
+    finally:
+        _release(key, token)
+
+
+def _schedule_refresh(key: str, fn, args, kwargs, ttl: float, stale_ttl: float) -> None:
+    token = uuid.uuid4().hex
+    if not _acquire(key, token):
+        return
+    task = asyncio.get_running_loop().create_task(_refresh(key, token, fn, args, kwargs, ttl, stale_ttl))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def cached_result(
+    namespace: str,
+    ttl: float,
+    stale_ttl: float = 0.0,
+    key: Optional[Callable[..., Any]] = None,
+):
+    """Cache an async ``fn(db, *args, **kwargs)`` as described in the module docstring.
+
+    The wrapper takes ``(*args, **kwargs)`` only; `db` is supplied by the
+    cache when `fn` runs. The cache key is built from those arguments, or
+    from ``key(*args, **kwargs)`` when given. ``fn.__wrapped__`` is the
+    uncached function.
+    """
+    def decorate(fn: Callable[..., Awaitable[Any]]):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            cache_key = result_key(namespace, key(*args, **kwargs)) if key else result_key(namespace, *args, **kwargs)
+            entry = _read(cache_key)
+            if entry is not None:
+                if entry.get("fresh_until", 0) > time.time():
+                    _count("hits")
+                else:
+                    _count("stale_hits")
+                    _schedule_refresh(cache_key, fn, args, kwargs, ttl, stale_ttl)
+                return entry["value"]
+
+            loop = asyncio.get_running_loop()
+            task = _inflight.get(cache_key)
+            if task is not None and not task.done() and task.get_loop() is loop:
+                _count("coalesced")
+            else:
+                _count("misses")
+                task = loop.create_task(_load(cache_key, fn, args, kwargs, ttl, stale_ttl))
+                _inflight[cache_key] = task
+                task.add_done_callback(lambda t, k=cache_key: _inflight.get(k) is t and _inflight.pop(k, None))
+            # A cancelled waiter must not cancel the computation others share
+            return await asyncio.shield(task)
+
+        signature = inspect.signature(fn)
+        wrapper.__signature__ = signature.replace(parameters=list(signature.parameters.values())[1:])
+        return wrapper
+
+    return decorate
+
+
+def clear_local() -> None:
+    """Drop the per-process store (tests, or after a bulk data fix)."""
+    with _lock:
+        _local_entries.clear()
+        _local_locks.clear()
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_counters)
+        local_entries = len(_local_entries)
+    return {
+        **counters,
+        "backend": "redis" if redis_cache.is_available() else "local",
+        "local_entries": local_entries,
+        "refreshing": len(_background),
+    }
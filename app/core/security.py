@@ -1,20 +1,20 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.core.config import settings
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
+from app.core.hashing import pwd_context
+from app.core.principal_cache import is_token_stale, principal_cache, token_key
 
 # SINGLE oauth2 scheme (ONLY ONE)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256", "bcrypt"], deprecated="auto")
-
-
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Blocking; in request handlers use `app.core.hashing.check_password`."""
     return pwd_context.verify(plain_password, hashed_password)
 
 
@@ -24,7 +24,10 @@ def get_password_hash(password: str) -> str:
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=15))
+    # iat lets the principal cache tell tokens minted before a role change
+    to_encode.setdefault("iat", now)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
@@ -36,71 +39,185 @@ def decode_access_token(token: str):
         return None
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-        )
-
-    user_id = payload.get("sub") or payload.get("user_id")
+class Principal:
+    """The authenticated caller of one request.
 
-    class _SimpleUser:
-        pass
-
-    user = _SimpleUser()
-    try:
-        user.id = int(user_id) if user_id is not None else None
-    except Exception:
-        user.id = user_id
+    Built from the JWT claims alone: ``sub`` is the user id and, for tokens
+    issued by `/auth/login` and `/auth/token`, ``role`` and ``vendor_id``
+    are embedded too, so role checks need no database round trip. Tokens
+    without those claims fall back to loading the user row, at most once
+    per request (see `get_user`). Resolved principals are cached per token
+    in `app.core.principal_cache`.
 
-    return user
+    `known_at` is when the role and active flag were last known to be
+    right: the token's ``iat``, or the time the user row was read.
+    """
 
+    def __init__(
+        self,
+        id,
+        role=None,
+        vendor_id: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        known_at: Optional[float] = None,
+        cache_key: Optional[str] = None,
+    ):
+        self.id = id
+        self.role = role
+        self.vendor_id = vendor_id
+        # None until the user row has been read
+        self.is_active = is_active
+        self.known_at = known_at
+        self.cache_key = cache_key
+        self._user = None
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "Principal":
+        from app.models.user import UserRole
+
+        user_id = payload.get("sub") or payload.get("user_id")
+        try:
+            user_id = int(user_id) if user_id is not None else None
+        except Exception:
+            pass
+        try:
+            role = UserRole(payload["role"]) if payload.get("role") else None
+        except ValueError:
+            role = None
+        vendor_id = payload.get("vendor_id") or payload.get("vendor_account_id")
+        return cls(user_id, role, str(vendor_id) if vendor_id else None, known_at=payload.get("iat"))
+
+    async def get_user(self, db: AsyncSession):
+        """The full User row, loaded on first use and reused afterwards."""
+        if self._user is None:
+            # import crud at runtime to avoid circular imports
+            from app.crud import crud_user
+
+            known_at = time.time()
+            self._user = await crud_user.get_user(db, self.id)
+            if self._user is not None:
+                self.role = self._user.role
+                self.is_active = self._user.is_active
+                self.known_at = known_at
+                if self.cache_key is not None:
+                    principal_cache.update(
+                        self.cache_key, role=self.role, is_active=self.is_active, known_at=known_at
+                    )
+        return self._user
+
+    async def get_role(self, db: AsyncSession):
+        """Role from the token, or from the user row for older tokens.
+        None when neither is available."""
+        if self.role is None:
+            await self.get_user(db)
+        return self.role
+
+    def cache_fields(self) -> dict:
+        return {
+            "id": self.id,
+            "role": self.role,
+            "vendor_id": self.vendor_id,
+            "is_active": self.is_active,
+            "known_at": self.known_at,
+        }
+
+
+def principal_claims(user, vendor_id=None) -> dict:
+    """JWT claims identifying `user`; see `Principal`."""
+    role = getattr(user, "role", None)
+    claims = {"sub": str(user.id), "role": getattr(role, "value", role)}
+    if vendor_id is not None:
+        claims["vendor_id"] = str(vendor_id)
+    return claims
+
+
+async def get_current_principal(request: Request, db: AsyncSession = Depends(get_db)) -> Principal:
+    """Request-scoped principal.
+
+    The token is read with `get_token_from_request` (Authorization header,
+    ``access_token`` cookie or ``token`` query parameter). A token seen
+    recently is served from the principal cache without re-verifying its
+    signature; otherwise it is decoded and the result cached until the
+    token's ``exp``.
+
+    If the user's role or active flag changed after what the principal
+    knows (`principal_cache.is_token_stale`, an in-process lookup), the
+    user row is re-read before anything is trusted.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
 
-async def get_current_admin(request: Request, db: AsyncSession = Depends(get_db)):
+    token = get_token_from_request(request)
+    key = token_key(token)
+    cached = principal_cache.get(key)
+    if cached is not None:
+        principal = Principal(**cached, cache_key=key)
+    else:
+        payload = decode_access_token(token)
+        if not payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials",
+            )
+        principal = Principal.from_claims(payload)
+        principal.cache_key = key
+        principal_cache.put(key, principal.cache_fields(), payload.get("exp"))
+
+    if is_token_stale(principal.id, principal.known_at):
+        # Role or active flag changed since; the claims can't be trusted
+        principal.role = None
+        principal.is_active = None
+        if await principal.get_user(db) is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    if principal.is_active is False:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+    request.state.principal = principal
+    return principal
+
+
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Authenticated caller (bearer token). Has at least an ``id``; use
+    `Principal.get_user` when the full row is needed."""
+    return await get_current_principal(request, db)
+
+
+async def get_current_admin(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
     """Dependency that validates JWT and ensures the user is an admin.
 
     This helper reads the token from the Authorization header, cookies, or
     the `token` query parameter using `get_token_from_request` to make it
     easier to debug via Swagger (you can append `?token=<JWT>`).
 
+    The role claim in the token is trusted when present; older tokens
+    without one cost a single user lookup.
+
     Raises:
         HTTPException 401: when token is invalid or user not found
         HTTPException 403: when user exists but is not an admin
 
-    Returns the full User ORM object when successful.
+    Returns the request's `Principal`.
     """
-    # attempt to extract token from header/cookie/query
-    token = get_token_from_request(request)
-
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-        )
-
-    user_id = payload.get("sub") or payload.get("user_id")
-
-    try:
-        _uid = int(user_id) if user_id is not None else None
-    except Exception:
-        _uid = user_id
-
-    # import crud at runtime to avoid circular imports
-    crud_user = __import__("app.crud.crud_user", fromlist=["get_user"])
-    db_user = await crud_user.get_user(db, _uid)
-    if not db_user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-
     # Import UserRole here to avoid module-level cycles
     from app.models.user import UserRole
 
-    if getattr(db_user, "role", None) != UserRole.admin:
+    role = await principal.get_role(db)
+    if role is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if principal.is_active is False:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+    if role != UserRole.admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
 
-    return db_user
+    return principal
 
 
 def get_token_from_request(request: Request) -> str:
@@ -1,11 +1,16 @@
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException, status
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.models.product import Product
 from app.models.subcategory import Subcategory
 from app.models.user import UserRole
-from app.services.embedding_service import cosine_similarity
+from app.core.config import settings
+from app.services.vector_index import get_vector_index, as_unit_vector
+from app.crud.pagination import DEFAULT_PAGE_SIZE, ProductPage, fetch_product_page, fetch_row_page
+from app.services.catalog_cache import bump_catalog_version
+from app.services.vector_index.changes import record_embedding_change
 
 async def create_product(db: AsyncSession, product_data: dict):
     # Validate subcategory exists
@@ -21,112 +26,225 @@ async def create_product(db: AsyncSession, product_data: dict):
 
     new_product = Product(**product_data)
 
-    # 🔍 Duplicate detection using cosine similarity
-    if product_data.get("product_embedding") is not None:
-        existing_products = await get_products(db)
-        for product in existing_products:
-            if product.product_embedding:
-                try:
-                    sim = cosine_similarity(
-                        product_data["product_embedding"],
-                        product.product_embedding
-                    )
-                    print(f"🔍 Similarity with {product.name}: {sim}")
-                    if sim > 0.90:  # threshold
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"Duplicate product detected → Similar to '{product.name}' ({sim:.2f})"
-                        )
-                except Exception as e:
-                    print("❌ Similarity calc error:", e)
-                    continue
+    # 🔍 Duplicate detection against the configured vector index
+    embedding = product_data.get("product_embedding")
+    if embedding is not None:
+        await ensure_not_duplicate(db, embedding)
 
     db.add(new_product)
     await db.commit()
     await db.refresh(new_product)
+
+    if embedding is not None:
+        index = get_vector_index()
+        index.on_product_saved(new_product.id, embedding)
+        index.on_embedding_version(record_embedding_change(new_product.id))
+    bump_catalog_version()
     return new_product
 
 
+# Columns matching and duplicate detection read from each hit; never the embedding
+SIMILAR_PRODUCT_COLUMNS = (Product.id, Product.name, Product.description)
+
+
+async def find_similar_products(
+    db: AsyncSession,
+    embedding,
+    k: int = 5,
+    threshold: Optional[float] = None,
+) -> List[Tuple[Row, float]]:
+    """
+    Return up to `k` `(row, cosine_similarity)` pairs closest to `embedding`,
+    best first, optionally keeping only matches scoring at least `threshold`.
+    Each row is a lightweight `(id, name, description)` tuple
+    (`SIMILAR_PRODUCT_COLUMNS`), not an ORM entity.
+
+    The search backend (exact NumPy, IVF or pgvector/HNSW) is chosen by
+    `settings.VECTOR_INDEX_BACKEND`; see `app.services.vector_index`.
+    """
+    query_vec = as_unit_vector(embedding)
+    if query_vec is None or k <= 0:
+        return []
+
+    index = get_vector_index()
+    await index.ensure_ready(db)
+    hits = await index.search(db, query_vec, k=k, threshold=threshold)
+    if not hits:
+        return []
+    result = await db.execute(
+        select(*SIMILAR_PRODUCT_COLUMNS).where(Product.id.in_([pid for pid, _ in hits]))
+    )
+    rows = {row.id: row for row in result.all()}
+    return [(rows[pid], sim) for pid, sim in hits if pid in rows]
+
+
+async def ensure_not_duplicate(db: AsyncSession, embedding, exclude_id: Optional[int] = None):
+    """
+    Raise HTTP 400 if an existing product's embedding is at least
+    `PRODUCT_DUPLICATE_THRESHOLD` similar to `embedding`.
+
+    The whole catalog is checked through `find_similar_products` instead of
+    comparing against a limited page of products one row at a time.
+    """
+    matches = await find_similar_products(
+        db,
+        embedding,
+        k=2 if exclude_id is not None else 1,
+        threshold=settings.PRODUCT_DUPLICATE_THRESHOLD,
+    )
+    for existing, sim in matches:
+        if existing.id == exclude_id:
+            continue
+        raise HTTPException(
+            status_code=400,
+            detail=f"Duplicate product detected → Similar to '{existing.name}' ({sim:.2f})"
+        )
+
+
+async def update_product(db: AsyncSession, product_id: int, update_data: dict):
+    product = await get_product(db, product_id)
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+
+    embedding_changed = "product_embedding" in update_data
+    if embedding_changed and update_data["product_embedding"] is not None:
+        await ensure_not_duplicate(db, update_data["product_embedding"], exclude_id=product_id)
+
+    for k, v in update_data.items():
+        if hasattr(product, k):
+            setattr(product, k, v)
+
+    db.add(product)
+    await db.commit()
+    await db.refresh(product)
+
+    if embedding_changed:
+        index = get_vector_index()
+        index.on_product_saved(product.id, update_data["product_embedding"])
+        index.on_embedding_version(record_embedding_change(product.id))
+    bump_catalog_version()
+    return product
+
+
+async def delete_product(db: AsyncSession, product_id: int):
+    product = await get_product(db, product_id)
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+
+    had_embedding = product.product_embedding is not None
+    await db.delete(product)
+    await db.commit()
+
+    index = get_vector_index()
+    index.on_product_deleted(product_id)
+    if had_embedding:
+        index.on_embedding_version(record_embedding_change(product_id))
+    bump_catalog_version()
+    return product
+
+
 async def get_product(db: AsyncSession, product_id: int):
     result = await db.execute(select(Product).where(Product.id == product_id))
     return result.scalars().first()
 
 
-async def get_products(db: AsyncSession, skip: int = 0, limit: int = 1000):
-    result = await db.execute(select(Product).offset(skip).limit(limit))
-    return result.scalars().all()
+async def get_products(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> ProductPage:
+    """One keyset page of all products, newest first, plus the next cursor."""
+    return await fetch_product_page(db, select(Product), cursor, limit)
 
 
-async def get_public_products(db: AsyncSession, skip: int = 0, limit: int = 1000) -> List[Product]:
+async def get_public_products(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> ProductPage:
     """
-    Fetch all publicly visible products.
+    Fetch publicly visible products, one keyset page at a time.
     Optimized for storefront display; returns only is_public=True products.
     """
-    query = (
-        select(Product)
-        .where(Product.is_public == True)
-        .offset(skip)
-        .limit(limit)
-    )
-    result = await db.execute(query)
-    return result.scalars().all()
+    query = select(Product).where(Product.is_public == True)
+    return await fetch_product_page(db, query, cursor, limit)
 
 
 async def get_vendor_private_products(
     db: AsyncSession,
     vendor_id: int,
-    skip: int = 0,
-    limit: int = 1000
-) -> List[Product]:
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> ProductPage:
     """
-    Fetch all private (is_public=False) products for a specific vendor.
+    Fetch private (is_public=False) products for a specific vendor, one page at a time.
     Used for vendor dashboard to show products awaiting publication.
     """
-    query = (
-        select(Product)
-        .where(
-            (Product.vendor_id == vendor_id) &
-            (Product.is_public == False)
-        )
-        .offset(skip)
-        .limit(limit)
+    query = select(Product).where(
+        (Product.vendor_id == vendor_id) &
+        (Product.is_public == False)
     )
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await fetch_product_page(db, query, cursor, limit)
 
 
 async def get_all_products_for_vendor(
     db: AsyncSession,
     vendor_id: int,
-    skip: int = 0,
-    limit: int = 1000
-) -> List[Product]:
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> ProductPage:
     """
-    Fetch all products (public and private) belonging to a vendor.
-    Used for vendor management portal; returns their complete inventory.
+    Fetch products (public and private) belonging to a vendor, one page at a time.
+    Used for vendor management portal; pages through their complete inventory.
     """
-    query = (
-        select(Product)
-        .where(Product.vendor_id == vendor_id)
-        .offset(skip)
-        .limit(limit)
-    )
-    result = await db.execute(query)
-    return result.scalars().all()
+    query = select(Product).where(Product.vendor_id == vendor_id)
+    return await fetch_product_page(db, query, cursor, limit)
 
 
 async def get_all_products_for_admin(
     db: AsyncSession,
-    skip: int = 0,
-    limit: int = 1000
-) -> List[Product]:
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> ProductPage:
     """
-    Fetch all products in the system (public and private, all vendors).
+    Fetch products in the system (public and private, all vendors), one page at a time.
     Used for admin moderation and reporting dashboards; no visibility filters.
     """
-    query = select(Product).offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await fetch_product_page(db, select(Product), cursor, limit)
+
+
+# Columns behind `ProductListItem`; listings never load descriptions or embeddings
+PRODUCT_LIST_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.selling_price,
+    Product.category_id,
+    Product.subcategory_id,
+    Product.brand_id,
+    Product.vendor_id,
+    Product.visibility,
+    Product.is_public,
+    Product.created_at,
+)
+
+
+async def get_product_list_rows(
+    db: AsyncSession,
+    include_private: bool = False,
+    vendor_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+):
+    """
+    One keyset page of lightweight row tuples for listing endpoints.
+    Only `PRODUCT_LIST_COLUMNS` are selected, so no ORM entities are built.
+    """
+    query = select(*PRODUCT_LIST_COLUMNS)
+    if not include_private:
+        query = query.where(Product.is_public == True)
+    if vendor_id is not None:
+        query = query.where(Product.vendor_id == vendor_id)
+    return await fetch_row_page(db, query, cursor, limit)
 
 
 # ========== AUTHORIZATION & PERMISSION CHECKS ==========
@@ -1,11 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.user import User
-from app.core.security import pwd_context
+from app.core.hashing import hash_password
+from app.core.principal_cache import invalidate_user
 
 
 async def create_user(db: AsyncSession, username: str, email: str, password: str):
-    hashed_password = pwd_context.hash(password)
+    hashed_password = await hash_password(password)
 
     new_user = User(
         username=username,
@@ -24,6 +25,26 @@ async def get_user(db: AsyncSession, user_id: int):
     return await db.get(User, user_id)
 
 
+async def update_user_access(db: AsyncSession, user_id: int, role=None, is_active=None):
+    """Change a user's role and/or active flag.
+
+    Cached principals for the user are dropped and the claims in their
+    existing tokens stop being trusted by every worker (see
+    `app.core.principal_cache.invalidate_user`).
+    """
+    user = await db.get(User, user_id)
+    if user is None:
+        return None
+    if role is not None:
+        user.role = role
+    if is_active is not None:
+        user.is_active = is_active
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user(user.id)
+    return user
+
+
 async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
     result = await db.execute(select(User).offset(skip).limit(limit))
     return result.scalars().all()
@@ -0,0 +1,94 @@
+"""Keyset pagination over products, newest first.
+
+Pages are ordered by ``(created_at DESC, id DESC)``; the continuation token
+encodes the last row's key so the next page starts with an index seek
+instead of skipping ``OFFSET`` rows. Tokens are opaque to clients.
+
+SQLite keeps timestamps as text, and in two formats: ``func.now()`` server
+defaults store ``YYYY-MM-DD HH:MM:SS`` while bound datetimes carry
+microseconds. Comparing those strings directly puts a cursor after every
+row of its own second, so on SQLite both sides of the keyset are first
+normalised to one format.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row, func, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.product import Product
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Millisecond precision; rows that tie on it are still ordered by id
+_SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%f"
+
+ProductPage = Tuple[List[Product], Optional[str]]
+
+
+def encode_cursor(created_at: datetime, product_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), product_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    """Raise 400 for tokens that were not produced by `encode_cursor`."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, product_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(product_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    return max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def _sortable(value, dialect: Optional[str]):
+    if dialect == "sqlite":
+        return func.strftime(_SQLITE_TIMESTAMP_FORMAT, value)
+    return value
+
+
+def apply_keyset(query: Select, cursor: Optional[str], limit: int, dialect: Optional[str] = None) -> Select:
+    """Order `query` by the product keyset and start after `cursor`.
+
+    `dialect` is the name of the database the query runs on. Fetches one
+    extra row so the caller can tell whether a next page exists.
+    """
+    created_key = _sortable(Product.created_at, dialect)
+    if cursor:
+        created_at, product_id = decode_cursor(cursor)
+        bound = _sortable(literal(created_at, Product.created_at.type), dialect)
+        query = query.where(tuple_(created_key, Product.id) < tuple_(bound, product_id))
+    return query.order_by(created_key.desc(), Product.id.desc()).limit(limit + 1)
+
+
+async def fetch_product_page(db: AsyncSession, query: Select, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> ProductPage:
+    """Run `query` as one keyset page; returns the rows and the next cursor (None on the last page)."""
+    limit = clamp_page_size(limit)
+    result = await db.execute(apply_keyset(query, cursor, limit, db.bind.dialect.name))
+    return _page(list(result.scalars().all()), limit)
+
+
+async def fetch_row_page(db: AsyncSession, query: Select, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Row], Optional[str]]:
+    """Like `fetch_product_page` for column projections; `query` must select
+    ``Product.created_at`` and ``Product.id``."""
+    limit = clamp_page_size(limit)
+    result = await db.execute(apply_keyset(query, cursor, limit, db.bind.dialect.name))
+    return _page(list(result.all()), limit)
+
+
+def _page(rows: list, limit: int):
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
@@ -1,13 +1,93 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from app.core.config import settings
 
-"""Database async engine and session factory using settings.DATABASE_URL."""
+"""Database async engine and session factory using settings.DATABASE_URL.
+
+Pool sizing, statement logging and driver options come from the ``DB_*``
+settings; see `engine_options`. Read-only analytics can be routed to
+replicas listed in ``DATABASE_REPLICA_URLS`` through `get_read_db`.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Keyword arguments for `create_async_engine` derived from settings.
+
+    Pool settings only apply to server databases; SQLite keeps SQLAlchemy's
+    defaults. For asyncpg the prepared-statement cache size and a
+    server-side ``statement_timeout`` are passed per connection (set the
+    cache size to 0 behind PgBouncer in transaction mode).
+    """
+    backend = make_url(url).get_backend_name()
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO}
+    if backend == "sqlite":
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if make_url(url).get_driver_name() == "asyncpg":
+        server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        options["connect_args"] = {
+            # SQLAlchemy's own prepared statement LRU and asyncpg's
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        }
+    return options
+
+
+def build_engine(url: Optional[str] = None) -> AsyncEngine:
+    url = url or settings.DATABASE_URL
+    return create_async_engine(url, **engine_options(url))
+
+
+def describe_engine(engine: AsyncEngine) -> Dict[str, Any]:
+    """Effective engine configuration, safe to log (no password)."""
+    pool = engine.sync_engine.pool
+    info: Dict[str, Any] = {
+        "url": engine.url.render_as_string(hide_password=True),
+        "pool": type(pool).__name__,
+        "echo": engine.echo,
+    }
+    if hasattr(pool, "size"):
+        info.update(
+            pool_size=pool.size(),
+            max_overflow=getattr(pool, "_max_overflow", None),
+            pool_timeout=getattr(pool, "_timeout", None),
+            pool_recycle=pool._recycle,
+            pool_pre_ping=pool._pre_ping,
+        )
+    if engine.dialect.driver == "asyncpg":
+        info.update(
+            statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+            statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS or None,
+        )
+    return info
+
+
+def log_engine_config() -> None:
+    logger.info("Database engine: %s", describe_engine(engine))
+    for replica in replica_router.replicas:
+        logger.info("Read replica: %s", describe_engine(replica.engine))
+
 
 # Use configured DATABASE_URL from settings (ensure .env / env var is correct)
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-)
+engine = build_engine()
 
 # single async session factory (SQLAlchemy 1.4+ / 2.x compatible)
 async_session_maker = async_sessionmaker(
@@ -21,8 +101,102 @@ async def get_db():
     async with async_session_maker() as session:
         yield session
 
-# Explicit exports for consumers of this module
-__all__ = ["engine", "async_session_maker", "get_db"]
 
-# No changes required — file already exports engine, async_session_maker and get_db
+# Replication delay of a PostgreSQL standby in seconds; 0 on a primary and
+# on a standby that has replayed everything it received (an idle primary
+# would otherwise look like growing lag).
+_PG_REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
 
+class _Replica:
+    def __init__(self, url: str):
+        self.engine = build_engine(url)
+        self.session_maker = async_sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.usable = True
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = float("-inf")
+
+    async def refresh(self, max_lag: float) -> None:
+        # Claim the slot first so concurrent requests don't all probe
+        self.checked_at = time.monotonic()
+        if self.engine.dialect.name != "postgresql":
+            self.usable = True
+            return
+        try:
+            async with self.engine.connect() as conn:
+                self.lag_seconds = float((await conn.execute(_PG_REPLICA_LAG_SQL)).scalar() or 0)
+            self.usable = self.lag_seconds <= max_lag
+            if not self.usable:
+                logger.warning("Replica %s is %.1fs behind; reading from primary", self.engine.url.host, self.lag_seconds)
+        except Exception as e:
+            self.usable = False
+            logger.warning("Replica %s unavailable; reading from primary: %s", self.engine.url.host, e)
+
+
+class ReplicaRouter:
+    """Round-robin over healthy replicas, falling back to the primary.
+
+    A replica is skipped while its replication lag exceeds
+    ``DB_REPLICA_MAX_LAG_SECONDS`` or it cannot be reached. Health is
+    re-checked at most every ``DB_REPLICA_CHECK_SECONDS``, so the check
+    costs one small query per replica per interval, not per request.
+    """
+
+    def __init__(self, urls: List[str], max_lag_seconds: float, check_seconds: float):
+        self.replicas = [_Replica(url) for url in urls]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self._next = itertools.count()
+
+    async def session_maker(self) -> async_sessionmaker:
+        if not self.replicas:
+            return async_session_maker
+        now = time.monotonic()
+        start = next(self._next)
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(start + i) % len(self.replicas)]
+            if now - replica.checked_at >= self.check_seconds:
+                await replica.refresh(self.max_lag_seconds)
+            if replica.usable:
+                return replica.session_maker
+        return async_session_maker
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {"host": r.engine.url.host, "usable": r.usable, "lag_seconds": r.lag_seconds}
+            for r in self.replicas
+        ]
+
+
+def _replica_urls() -> List[str]:
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+
+replica_router = ReplicaRouter(
+    _replica_urls(),
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_seconds=settings.DB_REPLICA_CHECK_SECONDS,
+)
+
+
+async def get_read_db():
+    """Session for read-only queries that tolerate replication lag.
+
+    Use for reporting and analytics; anything that writes, or must read
+    its own writes, keeps using `get_db`.
+    """
+    session_maker = await replica_router.session_maker()
+    async with session_maker() as session:
+        yield session
+
+# Explicit exports for consumers of this module
+__all__ = [
+    "engine", "async_session_maker", "get_db", "get_read_db", "replica_router",
+    "build_engine", "engine_options", "log_engine_config",
+]
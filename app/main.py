@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 load_dotenv()  # First thing after imports
 
+import asyncio
 import os
 
 from fastapi import FastAPI, Request
@@ -8,9 +9,15 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from contextlib import asynccontextmanager
 from fastapi import HTTPException
 import sqlalchemy
 
+from app.core.openai_client import init_openai_client, close_openai_client
+from app.core.hashing import shutdown_hashing_pool
+from app.core.principal_cache import watch_stale_markers
+from app.db.session import log_engine_config
+
 from app.schemas.routers.auth import router as auth_router
 from app.schemas.routers.user import router as user_router
 from app.schemas.routers.vendor import router as vendor_router
@@ -31,11 +38,24 @@ from app.schemas.routers.order import router as order_router
 from app.schemas.routers.reports import router as reports_router
 from app.schemas.routers.dashboard import router as dashboard_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Application-scoped clients: created once, reused by every request
+    log_engine_config()
+    await init_openai_client()
+    stale_markers = asyncio.create_task(watch_stale_markers())
+    yield
+    stale_markers.cancel()
+    await close_openai_client()
+    shutdown_hashing_pool()
+
+
 # FastAPI App
 app = FastAPI(
     title="ICCS Backend",
     description="E-commerce Backend for Stationery System",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 app.add_middleware(
     CORSMiddleware,
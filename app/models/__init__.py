@@ -10,6 +10,7 @@ from app.models.vendor import Vendor  # noqa: F401
 from app.models.product import Product  # noqa: F401
 from app.models.inventory import Inventory  # noqa: F401
 from app.models.order import Order  # noqa: F401
+from app.models.order_rollup import OrderDailyRollup  # noqa: F401
 from app.models.product_uniform_details import ProductUniformDetails  # noqa: F401
 from app.models.product_image import ProductImage  # noqa: F401
 from app.models.product_variant import ProductVariant  # noqa: F401
@@ -17,6 +18,7 @@ from app.models.category import Category  # noqa: F401
 from app.models.subcategory import Subcategory  # noqa: F401
 from app.models.brand import Brand  # noqa: F401
 from app.models.product_match_approval import ProductMatchApproval  # noqa: F401
+from app.models.product_attribute import ProductAttributeCache  # noqa: F401
 
 # New canonical product models
 from app.models.canonical_product import CanonicalProduct  # noqa: F401
@@ -9,6 +9,9 @@ class Order(Base):
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
     status = Column(String(50), default="pending")
     total_amount = Column(Float, default=0.0)
+    # Selling vendor and their share of the total; read by the sales reports
+    vendor_id = Column(Integer, nullable=True, index=True)
+    vendor_earning = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="orders")
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, Index, event
+from app.db.base import Base
+
+
+class OrderDailyRollup(Base):
+    """Order totals per (vendor, status, 15-minute UTC bucket).
+
+    Maintained by the ``orders_rollup`` trigger on PostgreSQL (see migration
+    a3f7c2d9e1b5) and by ``orders_rollup_*`` triggers on SQLite (migration
+    c5e1a7b3d9f2, or `create_all`), and rebuilt with
+    ``scripts/rebuild_order_rollups.py``.
+    Buckets are 15 minutes rather than an hour so that local days in zones
+    with :30/:45 offsets (e.g. Asia/Kolkata) can be summed exactly.
+    `vendor_id` is 0 for orders without a vendor.
+    """
+
+    __tablename__ = "order_daily_rollups"
+
+    vendor_id = Column(Integer, primary_key=True, default=0)
+    status = Column(String(50), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    orders_count = Column(Integer, nullable=False, default=0)
+    total_sales = Column(Numeric(20, 2), nullable=False, default=0)
+    total_earnings = Column(Numeric(20, 2), nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_order_daily_rollups_status_bucket', 'status', 'bucket_start'),
+    )
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_sqlite_rollup_triggers(target, connection, **kw):
+    # Databases built from the models (development, tests) get the
+    # triggers the migrations install elsewhere
+    if connection.dialect.name == "sqlite":
+        # Imported here: the service module imports this one
+        from app.services.sales_rollup import install_sqlite_triggers
+
+        install_sqlite_triggers(connection)
@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, Float, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, Float, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
 from app.db.base import Base
 
+# Dimension of OpenAI `text-embedding-3-small` vectors
+PRODUCT_EMBEDDING_DIM = 1536
+
 
 class Product(Base):
     __tablename__ = "products"
@@ -17,10 +21,10 @@ class Product(Base):
     vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=True)
     visibility = Column(Boolean, default=True)
     is_public = Column(Boolean, default=False)
-    product_embedding = Column(Float, nullable=True)  # Placeholder for vector
+    product_embedding = Column(Vector(PRODUCT_EMBEDDING_DIM), nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
@@ -32,3 +36,18 @@ class Product(Base):
     order_items = relationship("OrderItem", back_populates="product")
     uniform_details = relationship("ProductUniformDetails", back_populates="product", cascade="all, delete-orphan")
     match_approvals = relationship("ProductMatchApproval", back_populates="source_product", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Keyset pagination: listings are ordered by (created_at DESC, id DESC)
+        Index('ix_products_created_at_id', 'created_at', 'id'),
+        Index('ix_products_is_public_created_at_id', 'is_public', 'created_at', 'id'),
+        Index('ix_products_vendor_id_created_at_id', 'vendor_id', 'created_at', 'id'),
+        # Approximate nearest-neighbour index for cosine similarity search (pgvector)
+        Index(
+            'ix_products_product_embedding_hnsw',
+            'product_embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'product_embedding': 'vector_cosine_ops'},
+        ),
+    )
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, UniqueConstraint, func
+from app.db.base import Base
+
+
+class ProductAttributeCache(Base):
+    """LLM-extracted product attributes, keyed by content hash and extractor version.
+
+    `content_hash` is the sha256 of the normalised "name description" text,
+    so identical catalog text never needs a second extraction. Changing the
+    prompt or model bumps `extractor_version` and naturally invalidates entries.
+    """
+
+    __tablename__ = "product_attributes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False)
+    extractor_version = Column(String(100), nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="SET NULL"), nullable=True, index=True)
+    attributes = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('content_hash', 'extractor_version', name='uq_product_attributes_hash_version'),
+    )
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, ConfigDict
 
 from typing import List, Optional
@@ -51,6 +53,22 @@ class ProductOut(BaseModel):
 	model_config = ConfigDict(from_attributes=True)
 
 
+class ProductListItem(BaseModel):
+	"""Compact row for catalog listings: no description, no embedding."""
+	id: int
+	name: str
+	selling_price: float
+	category_id: Optional[int] = None
+	subcategory_id: Optional[int] = None
+	brand_id: Optional[int] = None
+	vendor_id: Optional[int] = None
+	visibility: Optional[bool] = True
+	is_public: Optional[bool] = False
+	created_at: Optional[datetime] = None
+
+	model_config = ConfigDict(from_attributes=True)
+
+
 class ProductSimilarity(BaseModel):
 	id: int
 	name: str
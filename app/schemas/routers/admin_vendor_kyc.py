@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.security import get_current_user, get_current_admin
-from app.db.session import get_db
-from app.crud import crud_user
+from app.core.config import settings
+from app.core.result_cache import cached_result
+from app.core.security import get_current_admin
+from app.db.session import get_db, get_read_db
 from app.crud.crud_vendor_account import verify_vendor_kyc
 from app.schemas.vendor_admin_kyc import VendorAdminKYCRequest
 from app.schemas.vendor_account import VendorKYCStatus
 from app.schemas.vendor_admin_list import VendorAdminListResponse
-from app.models.user import UserRole
 from app.models.vendor_account import VendorAccount, VendorStatus
 from app.models.vendor_kyc_document import VendorKYCDocument, DocumentType
 from app.models.vendor_alert import VendorAlert
@@ -20,7 +20,6 @@ from app.models.inventory import Inventory
 from sqlalchemy.future import select
 from sqlalchemy import func, or_, and_, case
 from datetime import datetime, timedelta
-from app.db.session import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
@@ -29,29 +28,26 @@ from uuid import UUID
 router = APIRouter()
 
 
+def _cached(namespace: str):
+    """Stale-while-revalidate caching for the heavy admin performance aggregates."""
+    return cached_result(
+        namespace,
+        ttl=settings.REPORT_CACHE_TTL_SECONDS,
+        stale_ttl=settings.REPORT_CACHE_STALE_SECONDS,
+    )
+
+
 @router.post("/kyc/verify", response_model=VendorKYCStatus)
 async def admin_verify_vendor_kyc(
     payload: VendorAdminKYCRequest,
     current_user = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await crud_user.get_user(db, user_id)
-    if not db_user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unable to resolve user")
-
-    if db_user.role != UserRole.admin:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins may verify KYC")
-
     # Map incoming status to internal action
     action = "APPROVE" if payload.status == "APPROVED" else "REJECT"
 
     try:
-        updated = await verify_vendor_kyc(db, payload.vendor_id, action, payload.rejection_reason, admin_id=db_user.id)
+        updated = await verify_vendor_kyc(db, payload.vendor_id, action, payload.rejection_reason, admin_id=current_user.id)
     except HTTPException:
         raise
     except Exception as e:
@@ -79,15 +75,6 @@ async def admin_list_vendors(
     db: AsyncSession = Depends(get_db),
 ):
     # only admins
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may list vendors")
-
     # Base query for vendors
     q = select(VendorAccount)
 
@@ -174,17 +161,8 @@ async def admin_list_vendors(
 
 
 @router.get("/stats")
-async def admin_vendor_stats(current_user = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+async def admin_vendor_stats(current_user = Depends(get_current_admin), db: AsyncSession = Depends(get_read_db)):
     """Return aggregated vendor statistics optimized with a single DB query."""
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view vendor stats")
-
     # Use SQL aggregates and conditional sums to compute all counts in one query
     stats_q = select(
         func.count().label("total_vendors"),
@@ -213,15 +191,6 @@ async def admin_vendor_stats(current_user = Depends(get_current_admin), db: Asyn
 
 @router.get("/review/{vendor_id}")
 async def admin_get_vendor_review(vendor_id: UUID, current_user = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view vendor review")
-
     vendor = await db.execute(select(VendorAccount).where(VendorAccount.id == vendor_id))
     vendor = vendor.scalars().first()
     if not vendor:
@@ -265,16 +234,7 @@ async def admin_approve_vendor(vendor_id: UUID, current_user = Depends(get_curre
     Uses existing `verify_vendor_kyc` CRUD helper to keep behavior consistent.
     """
     try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may approve vendors")
-
-    try:
-        updated = await verify_vendor_kyc(db, vendor_id, "APPROVE", None, admin_id=db_user.id)
+        updated = await verify_vendor_kyc(db, vendor_id, "APPROVE", None, admin_id=current_user.id)
     except HTTPException:
         raise
     except Exception as e:
@@ -297,16 +257,7 @@ class VendorRejectRequest(BaseModel):
 async def admin_reject_vendor(vendor_id: UUID, payload: VendorRejectRequest, current_user = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
     """Reject a vendor: mark KYC rejected and save rejection reason."""
     try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may reject vendors")
-
-    try:
-        updated = await verify_vendor_kyc(db, vendor_id, "REJECT", payload.reason, admin_id=db_user.id)
+        updated = await verify_vendor_kyc(db, vendor_id, "REJECT", payload.reason, admin_id=current_user.id)
     except HTTPException:
         raise
     except Exception as e:
@@ -328,15 +279,6 @@ async def admin_get_vendor_documents(vendor_id: UUID, current_user = Depends(get
 
     Response items contain: document_type, file_url, uploaded_at
     """
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view vendor documents")
-
     vendor_q = await db.execute(select(VendorAccount).where(VendorAccount.id == vendor_id))
     vendor = vendor_q.scalars().first()
     if not vendor:
@@ -364,15 +306,6 @@ async def admin_get_vendor_reviews(vendor_id: UUID, current_user = Depends(get_c
 
     Each item contains: customer_name, product_name, rating, sentiment, comment, date
     """
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view vendor reviews")
-
     # Resolve vendor account and legacy vendor mapping
     vendor_account_q = await db.execute(select(VendorAccount).where(VendorAccount.id == vendor_id))
     vendor_account = vendor_account_q.scalars().first()
@@ -411,7 +344,7 @@ async def admin_get_vendor_reviews(vendor_id: UUID, current_user = Depends(get_c
 
 
 @router.get("/id/{vendor_id}/performance/summary")
-async def admin_vendor_performance_summary(vendor_id: UUID, current_user = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+async def admin_vendor_performance_summary(vendor_id: UUID, current_user = Depends(get_current_admin)):
     """Return a performance summary for a vendor (last 30 days).
 
     Fields returned:
@@ -427,15 +360,11 @@ async def admin_vendor_performance_summary(vendor_id: UUID, current_user = Depen
     Notes: Several metrics require additional timestamps or review data which
     are not present in the current schema; those fields return `None`.
     """
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
+    return await vendor_performance_summary(vendor_id)
 
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view vendor performance summary")
 
+@_cached("admin:vendor-performance-summary")
+async def vendor_performance_summary(db: AsyncSession, vendor_id: UUID):
     # verify vendor exists (new vendor account)
     vendor_obj = await db.execute(select(VendorAccount).where(VendorAccount.id == vendor_id))
     vendor_obj = vendor_obj.scalars().first()
@@ -520,22 +449,18 @@ async def admin_vendor_performance_summary(vendor_id: UUID, current_user = Depen
 
 
 @router.get("/id/{vendor_id}/performance/charts")
-async def admin_vendor_performance_charts(vendor_id: UUID, current_user = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+async def admin_vendor_performance_charts(vendor_id: UUID, current_user = Depends(get_current_admin)):
     """Return structured chart data for vendor performance.
 
     - Order trends (last 30 days)
     - Cancellation breakdown (vendor/system/customer) — returns unknown bucket if source not available
     - Handling time distribution (not computable without timestamps)
     """
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
+    return await vendor_performance_charts(vendor_id)
 
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view vendor performance charts")
 
+@_cached("admin:vendor-performance-charts")
+async def vendor_performance_charts(db: AsyncSession, vendor_id: UUID):
     # Find vendor account and legacy vendor (by contact email)
     vendor_account_q = await db.execute(select(VendorAccount).where(VendorAccount.id == vendor_id))
     vendor_account = vendor_account_q.scalars().first()
@@ -596,7 +521,7 @@ async def admin_vendor_performance_charts(vendor_id: UUID, current_user = Depend
 
 
 @router.get("/id/{vendor_id}/products/performance")
-async def admin_vendor_products_performance(vendor_id: UUID, current_user = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+async def admin_vendor_products_performance(vendor_id: UUID, current_user = Depends(get_current_admin)):
     """Return per-product performance for a vendor.
 
     Fields per product:
@@ -607,15 +532,11 @@ async def admin_vendor_products_performance(vendor_id: UUID, current_user = Depe
     - return_percentage (percentage of ordered units returned)
     - stock_status (in_stock/out_of_stock/low_stock)
     """
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
+    return await vendor_products_performance(vendor_id)
 
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view product performance")
 
+@_cached("admin:vendor-products-performance")
+async def vendor_products_performance(db: AsyncSession, vendor_id: UUID):
     # Resolve vendor account -> legacy vendor id
     vendor_account_q = await db.execute(select(VendorAccount).where(VendorAccount.id == vendor_id))
     vendor_account = vendor_account_q.scalars().first()
@@ -686,15 +607,6 @@ async def admin_get_vendor_alerts(vendor_id: UUID, current_user = Depends(get_cu
 
     Each alert contains: alert_type, message, created_at
     """
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view vendor alerts")
-
     # Verify vendor exists
     vendor_q = await db.execute(select(VendorAccount).where(VendorAccount.id == vendor_id))
     vendor = vendor_q.scalars().first()
@@ -716,7 +628,7 @@ async def admin_get_vendor_alerts(vendor_id: UUID, current_user = Depends(get_cu
 
 
 @router.get("/performance")
-async def admin_vendors_performance(current_user = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+async def admin_vendors_performance(current_user = Depends(get_current_admin)):
     """Return vendor performance overview.
 
     Metrics returned per vendor:
@@ -738,15 +650,11 @@ async def admin_vendors_performance(current_user = Depends(get_current_admin), d
     - Rating is not available in current schema; returned as 0.0 placeholder.
     - performance_score is a weighted combination of accept_rate and return_rate and rating.
     """
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
+    return await vendors_performance()
 
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view vendor performance")
 
+@_cached("admin:vendors-performance")
+async def vendors_performance(db: AsyncSession):
     # Join VendorAccount -> Product -> OrderItem -> Order and aggregate
     # Use DISTINCT on Order.id to avoid double-counting when multiple items per order
     accepted_excluded = ["cancelled", "pending", "returned", "failed"]
@@ -815,14 +723,6 @@ async def admin_vendors_performance(current_user = Depends(get_current_admin), d
 @router.get("/pending")
 async def admin_pending_vendors(current_user = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
     """Return vendors pending approval with document status."""
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view pending vendors")
     # Simpler, more reliable implementation:
     # 1) Query pending vendor accounts
     # 2) For each vendor, check existence of each document type
@@ -869,15 +769,6 @@ async def admin_get_vendor_details(vendor_id: UUID, current_user = Depends(get_c
     Includes business information, contact details, address, GST/PAN, bank details,
     and current status & verification metadata.
     """
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await __import__("app.crud.crud_user", fromlist=["get_user"]).get_user(db, user_id)
-    if not db_user or db_user.role != UserRole.admin:
-        raise HTTPException(status_code=403, detail="Only admins may view vendor details")
-
     vendor = await db.execute(select(VendorAccount).where(VendorAccount.id == vendor_id))
     vendor = vendor.scalars().first()
     if not vendor:
@@ -2,7 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud import crud_user
-from app.core.security import verify_password, create_access_token
+from app.core.hashing import check_password, hash_password, needs_rehash
+from app.core.rate_limit import limit_login_attempts
+from app.core.security import create_access_token, principal_claims
+from app.crud.crud_vendor_account import get_vendor_by_email
+from app.models.user import User, UserRole
 from app.db.session import async_session_maker
 from typing import Optional
 from datetime import timedelta
@@ -22,20 +26,36 @@ async def get_db():
     async with async_session_maker() as session:
         yield session
 
-@router.post("/login", response_model=TokenResponse)
+async def token_claims(db: AsyncSession, user: User) -> dict:
+    """Embed the role (and vendor account for vendors) so protected endpoints
+    can authorise without loading the user again."""
+    vendor_id = None
+    if user.role == UserRole.vendor:
+        vendor = await get_vendor_by_email(db, user.email)
+        vendor_id = vendor.id if vendor else None
+    return principal_claims(user, vendor_id)
+
+async def upgrade_password_hash(db: AsyncSession, user: User, password: str) -> None:
+    """Re-hash with the current work factor after a successful login."""
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password(password)
+        await db.commit()
+
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(limit_login_attempts)])
 async def login(login_req: LoginRequest, db: AsyncSession = Depends(get_db)):
     user = await crud_user.get_user_by_email(db, login_req.email)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
-    if not verify_password(login_req.password, user.hashed_password):
+    if not await check_password(login_req.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    await upgrade_password_hash(db, user, login_req.password)
 
     access_token_expires = timedelta(minutes=60)
-    access_token = create_access_token(data={"sub": str(user.id)}, expires_delta=access_token_expires)
+    access_token = create_access_token(data=await token_claims(db, user), expires_delta=access_token_expires)
     return TokenResponse(access_token=access_token)
 
 
-@router.post("/token", response_model=TokenResponse)
+@router.post("/token", response_model=TokenResponse, dependencies=[Depends(limit_login_attempts)])
 async def token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     # OAuth2 password flow expects 'username' and 'password' form fields.
     # We treat 'username' as the user's email for compatibility with existing login.
@@ -45,9 +65,10 @@ async def token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     user = await crud_user.get_user_by_email(db, email)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
-    if not verify_password(password, user.hashed_password):
+    if not await check_password(password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+    await upgrade_password_hash(db, user, password)
 
     access_token_expires = timedelta(minutes=60)
-    access_token = create_access_token(data={"sub": str(user.id)}, expires_delta=access_token_expires)
+    access_token = create_access_token(data=await token_claims(db, user), expires_delta=access_token_expires)
     return TokenResponse(access_token=access_token)
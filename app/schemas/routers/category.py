@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.db.session import get_db
+from app.core.http_cache import conditional_response, make_etag, table_watermark
+from app.models.category import Category as CategoryModel
 from app.crud.crud_category import (
     create_category,
     get_category,
@@ -20,15 +22,26 @@ async def create_category_endpoint(category_in: CategoryCreate, db: AsyncSession
 
 
 @router.get("/{category_id}", response_model=CategoryOut)
-async def read_category(category_id: int, db: AsyncSession = Depends(get_db)):
+async def read_category(category_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     category = await get_category(db, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
+    etag = make_etag("category", category.id, category.updated_at)
+    not_modified = conditional_response(request, response, etag, category.updated_at)
+    if not_modified is not None:
+        return not_modified
     return category
 
 
 @router.get("/", response_model=List[CategoryOut])
-async def read_categories(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def read_categories(request: Request, response: Response, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    # Validate against the table watermark before loading any rows. No
+    # Last-Modified: max(updated_at) does not move when a row is deleted.
+    count, updated_at, max_id = await table_watermark(db, CategoryModel)
+    etag = make_etag("categories", count, updated_at, max_id, skip, limit)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     return await get_categories(db, skip=skip, limit=limit)
 
 
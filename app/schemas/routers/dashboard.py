@@ -2,11 +2,9 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.db.session import get_db
 from app.core.security import decode_access_token, oauth2_scheme
 from app.schemas.dashboard_schemas import WeeklySummaryResponse, PerDayItem, Datasets, Totals
+from app.services.analytics import lookup_zone
 from app.services.dashboard_service import get_weekly_summary
 
 router = APIRouter()
@@ -30,7 +28,6 @@ async def weekly_summary(
     tz: str = Query("UTC", description="Timezone for grouping, e.g. 'UTC' or 'America/Los_Angeles'"),
     status: str = Query("completed", description="Order status to include"),
     token_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
 ):
     """
     GET /api/dashboard/weekly-summary
@@ -56,18 +53,16 @@ async def weekly_summary(
         # compute last 7 days (start inclusive)
         # Use server-local time in requested timezone for day boundaries
         # For deterministic grouping, let service use the week_start ISO date
-        from zoneinfo import ZoneInfo
-
         try:
-            tzinfo = ZoneInfo(tz)
-        except Exception:
-            tzinfo = ZoneInfo("UTC")
+            tzinfo = lookup_zone(tz)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
         today = datetime.now(tzinfo).date()
         week_start_date = (today - timedelta(days=6)).isoformat()
         week_end_date = today.isoformat()
 
-        rows = await get_weekly_summary(db=db, week_start_date=week_start_date, tz=tz, status=status, vendor_id=vendor_filter)
+        rows = await get_weekly_summary(week_start_date=week_start_date, tz=tz, status=status, vendor_id=vendor_filter)
 
         labels = ["Day"]
         # Build labels Mon..Sun? Since we're returning last 7 days, labels should be the short day labels in order
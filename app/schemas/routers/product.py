@@ -1,27 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
-from app.schemas.product import ProductCreate, ProductOut
-from typing import List
+from app.schemas.product import ProductCreate, ProductListItem, ProductOut
+from typing import List, Optional
 import traceback
 
-from app.services.embedding_service import get_embedding, cosine_similarity
-from app.services.product_matcher import match_products, find_top_matches
-from app.services.product_service import get_products_for_user, get_filtered_products_for_matching
+from app.services import catalog_cache
+from app.services.embedding_cache import get_embedding_cache
+from app.services.embedding_service import get_embedding
+from app.services.product_matcher import match_products, find_top_matches_in_catalog, precompute_product_attributes
+from app.services.product_service import (
+    EXPORT_FORMATS,
+    get_products_for_user,
+    stream_product_export,
+)
 from app.crud import crud_product
-from app.core.security import get_current_user
-from app.models.user import User, UserRole
-from app.crud import crud_user
+from app.crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.http_cache import conditional_response, make_etag
+from app.core.security import Principal, get_current_admin, get_current_user
+from app.models.user import UserRole
 from fastapi import Body
+from fastapi.responses import StreamingResponse
 
 router = APIRouter()
-DUPLICATE_THRESHOLD = 0.90
 
 
 @router.post("/", response_model=ProductOut, status_code=status.HTTP_201_CREATED)
 async def create_product_endpoint(
     product_in: ProductCreate,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     try:
@@ -33,41 +41,30 @@ async def create_product_endpoint(
             product_text = f"{product_in.name} {product_in.description or ''}"
             new_embedding = await get_embedding(product_text)
             product_data['product_embedding'] = new_embedding
-
-            # Step 2: Duplicate Similarity Check
-            existing_products = await crud_product.get_products(db, skip=0, limit=1000)
-            for product in existing_products:
-                if product.product_embedding:
-                    try:
-                        similarity = cosine_similarity(new_embedding, product.product_embedding)
-                        print(f"🔍 Similarity with {product.name}: {similarity}")
-
-                        if similarity > DUPLICATE_THRESHOLD:
-                            return {
-                                "error": f"Duplicate detected → Similar to '{product.name}' ({similarity:.2f})"
-                            }
-
-                    except Exception as e:
-                        print(" Similarity comparison failed:", e)
-                        traceback.print_exc()
         except Exception as e:
             print(f" Embedding generation failed: {str(e)}. Creating product without embedding.")
             product_data['product_embedding'] = None
 
-        # Step 3: Create Product Record
+        # Step 2: Create Product Record (duplicate similarity check runs
+        # against the whole catalog inside the CRUD layer)
         created_product = await crud_product.create_product(db, product_data)
+
+        # Step 3: Extract and cache matching attributes off the request path
+        background_tasks.add_task(precompute_product_attributes, created_product.id, product_text)
         return created_product
 
+    except HTTPException:
+        raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=400, detail=f"Error creating product: {str(e)}")
 
 
 @router.post("/match", response_model=dict)
-async def match_products_endpoint(new_product: str, existing_product: str):
+async def match_products_endpoint(new_product: str, existing_product: str, db: AsyncSession = Depends(get_db)):
     """Match one product with another using AI"""
     try:
-        result = await match_products(new_product, existing_product)
+        result = await match_products(new_product, existing_product, db=db)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error matching products: {str(e)}")
@@ -77,13 +74,7 @@ async def match_products_endpoint(new_product: str, existing_product: str):
 async def find_top_matches_endpoint(new_product: str, db: AsyncSession = Depends(get_db)):
     """Suggest similar products for admin approval"""
     try:
-        existing_products_result = await crud_product.get_products(db, skip=0, limit=1000)
-        existing_products = [
-            {"id": p.id, "name": p.name, "description": p.description or ""}
-            for p in existing_products_result
-        ]
-
-        top_matches = await find_top_matches(new_product, existing_products)
+        top_matches = await find_top_matches_in_catalog(db, new_product)
         return top_matches
 
     except Exception as e:
@@ -91,20 +82,69 @@ async def find_top_matches_endpoint(new_product: str, db: AsyncSession = Depends
         raise HTTPException(status_code=500, detail=f"Error finding matches: {str(e)}")
 
 
-@router.get("/list", response_model=List[ProductOut])
+@router.get("/list", response_model=List[ProductListItem])
 async def list_products_endpoint(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Continuation token from the previous page's X-Next-Cursor header"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """List products visible to the current user based on their role"""
+    """List products visible to the current user based on their role.
+
+    Newest first, one page per call. When more products exist the response
+    carries an `X-Next-Cursor` header to pass back as `cursor`. Responses
+    carry an ETag derived from the catalog version; a matching
+    `If-None-Match` gets a 304 without touching the product table.
+    """
     try:
-        products = await get_products_for_user(db, current_user.id)
+        include_private = await current_user.get_role(db) == UserRole.admin
+        etag = make_etag(
+            "products", "all" if include_private else "public",
+            catalog_cache.catalog_version_token(), cursor, limit,
+        )
+        not_modified = conditional_response(request, response, etag, vary="Authorization")
+        if not_modified is not None:
+            return not_modified
+
+        products, next_cursor = await get_products_for_user(
+            db, current_user.id, cursor, limit, include_private=include_private
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return products
+    except HTTPException:
+        raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error listing products: {str(e)}")
 
 
+@router.get("/export")
+async def export_products_endpoint(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream every product visible to the current user as NDJSON or CSV."""
+    include_private = await current_user.get_role(db) == UserRole.admin
+    return StreamingResponse(
+        stream_product_export(include_private, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+
+@router.get("/cache/stats")
+async def catalog_cache_stats(current_admin=Depends(get_current_admin)):
+    """Hit-rate metrics for the storefront listing and embedding caches (admin only)."""
+    return {
+        "catalog": catalog_cache.stats(),
+        "embeddings": get_embedding_cache().stats(),
+    }
+
+
 #  TEST ENDPOINT TO VERIFY OPENAI EMBEDDINGS
 @router.get("/test-embedding")
 async def test_embedding():
@@ -115,7 +155,8 @@ async def test_embedding():
         return {
             "success": True,
             "message": "Embedding generated successfully ",
-            "embedding_length": len(emb)
+            "embedding_length": len(emb),
+            "cache": get_embedding_cache().stats(),
         }
     except Exception as e:
         print(" Embedding generation failed:", e)
@@ -131,7 +172,7 @@ async def test_embedding():
 async def update_product_visibility(
     product_id: int,
     payload: dict = Body(...),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Toggle product public/private visibility.
@@ -147,18 +188,19 @@ async def update_product_visibility(
 
     is_public = bool(payload.get("is_public"))
 
-    # Fetch full user from DB to check role
-    db_user = await crud_user.get_user(db, int(current_user.id)) if getattr(current_user, "id", None) is not None else None
-    if db_user is None:
+    # Role comes from the token claims; older tokens load the user once
+    role = await current_user.get_role(db)
+    if role is None:
         raise HTTPException(status_code=401, detail="Unable to resolve current user")
 
     # Use CRUD layer authorization checks
-    product = await crud_product.get_product_for_update(db, product_id, db_user.id, db_user.role)
+    product = await crud_product.get_product_for_update(db, product_id, current_user.id, role)
 
     # Update and persist
     product.is_public = is_public
     db.add(product)
     await db.commit()
     await db.refresh(product)
+    catalog_cache.bump_catalog_version()
 
     return product
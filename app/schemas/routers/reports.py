@@ -1,17 +1,14 @@
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.core.config import settings
+from app.db.session import engine
 from app.core.security import oauth2_scheme, decode_access_token, get_token_from_request
-from app.core import redis as cache
-import json
-from datetime import time as dt_time
+from app.core.config import settings
+from app.core.result_cache import cached_result
+from app.services.analytics import SalesQuery, lookup_zone, sales_series
 
 router = APIRouter()
 
@@ -26,7 +23,6 @@ async def weekly_sales_report(
     # Accept token from header/cookie/query for development convenience.
     # `get_token_from_request` will look in Authorization header, `access_token` cookie, or `token` query param.
     token: str = Depends(get_token_from_request),
-    db: AsyncSession = Depends(get_db),
 ):
     """Return a Mon->Sun weekly sales summary suitable for dashboard charts.
 
@@ -56,17 +52,9 @@ async def weekly_sales_report(
 
     # Determine week_start (Monday) in the requested tz
     try:
-        z = ZoneInfo(tz)
-    except Exception:
-        # zoneinfo may be unavailable on some Windows setups without the
-        # `tzdata` package. Fall back to UTC using the stdlib timezone
-        # object so the endpoint remains usable in those environments.
-        try:
-            z = ZoneInfo("UTC")
-        except Exception:
-            import datetime as _dt
-
-            z = _dt.timezone.utc
+        z = lookup_zone(tz)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     if week_start:
         try:
@@ -77,230 +65,54 @@ async def weekly_sales_report(
         today = datetime.now(z).date()
         week_start_date = today - timedelta(days=today.weekday())
 
-    # Raw SQL using generate_series to ensure zero-days are returned
-    vendor_clause = "AND vendor_id = :vendor_id" if vendor_filter_id is not None else ""
-
-    sql = f"""
-    WITH params AS (
-      SELECT :week_start::date AS wstart, :tz::text AS tz
-    ),
-    days AS (
-      SELECT generate_series(wstart, wstart + INTERVAL '6 days', INTERVAL '1 day')::date AS day FROM params
-    ),
-    agg AS (
-      SELECT
-        (created_at AT TIME ZONE 'UTC' AT TIME ZONE params.tz)::date AS day,
-        SUM(total_amount)::numeric(20,2) AS total_sales,
-        SUM(COALESCE(vendor_earning, total_amount))::numeric(20,2) AS total_earnings,
-        COUNT(*)::int AS orders_count
-      FROM orders, params
-      WHERE (created_at AT TIME ZONE 'UTC' AT TIME ZONE params.tz)::date BETWEEN params.wstart AND (params.wstart + INTERVAL '6 days')
-        AND status = :status
-        {vendor_clause}
-      GROUP BY day
-    )
-    SELECT to_char(d.day, 'YYYY-MM-DD') AS date, to_char(d.day, 'Dy') AS day_label,
-      COALESCE(a.total_sales, 0) AS total_sales, COALESCE(a.total_earnings, 0) AS total_earnings, COALESCE(a.orders_count, 0) AS orders_count
-    FROM days d
-    LEFT JOIN agg a USING (day)
-    ORDER BY d.day
-    """
-
-    params = {"week_start": week_start_date.isoformat(), "tz": tz, "status": status}
-    if vendor_filter_id is not None:
-        params["vendor_id"] = vendor_filter_id
-
-    # Try to read from cache first (short TTL). Key includes week_start,tz,status and vendor scope.
-    cache_key_parts = [
-        "reports:weekly",
-        params["week_start"],
-        params["tz"],
-        params["status"],
-        str(params.get("vendor_id", "all")),
-    ]
-    cache_key = ":".join(cache_key_parts)
-
-    rows = None
-    try:
-        if getattr(cache, "_redis_available", False) and cache.redis_client:
-            cached = cache.redis_client.get(cache_key)
-            if cached:
-                # cached is JSON encoded response dict; return it directly
-                return json.loads(cached)
-    except Exception:
-        # Fail silently and compute fresh result
-        pass
-
     try:
-        # If running against SQLite (common for local dev/tests) the
-        # Postgres-specific SQL above will fail. Provide a pure-Python
-        # fallback that queries a simple range of orders and aggregates
-        # per-day in the requested timezone. This makes the endpoint
-        # usable whether the app uses Postgres or SQLite.
-        is_sqlite_url = bool(settings.DATABASE_URL and settings.DATABASE_URL.startswith("sqlite"))
-        if is_sqlite_url:
-            # Compute UTC window that covers the requested local week
-            # Start of local week at 00:00 of week_start_date in `tz` -> to UTC
-            try:
-                local_zone = ZoneInfo(tz)
-            except Exception:
-                try:
-                    local_zone = ZoneInfo("UTC")
-                except Exception:
-                    import datetime as _dt
-
-                    local_zone = _dt.timezone.utc
-
-            local_week_start = datetime.combine(week_start_date, dt_time(0, 0), tzinfo=local_zone)
-            utc_week_start = local_week_start.astimezone(ZoneInfo("UTC"))
-            utc_week_end = utc_week_start + timedelta(days=7)
-
-            q = text(
-                """
-                SELECT created_at, total_amount, COALESCE(vendor_earning, total_amount) AS vendor_earning
-                FROM orders
-                WHERE created_at >= :start_utc AND created_at < :end_utc AND status = :status
-                """
-            )
-            result = await db.execute(q, {"start_utc": utc_week_start.isoformat(), "end_utc": utc_week_end.isoformat(), "status": status})
-            raw_rows = result.fetchall()
-
-            # Build a map of date_str -> aggregated values
-            agg_map = {}
-            for r in raw_rows:
-                created_at = r[0]
-                total_amount = r[1] or 0
-                vendor_earning = r[2] or total_amount
-
-                # Normalize created_at to a datetime with UTC tzinfo if naive
-                if isinstance(created_at, str):
-                    try:
-                        created_dt = datetime.fromisoformat(created_at)
-                    except Exception:
-                        # Fallback: try removing Z
-                        created_dt = datetime.fromisoformat(created_at.rstrip("Z"))
-                else:
-                    created_dt = created_at
-
-                if created_dt.tzinfo is None:
-                    try:
-                        created_dt = created_dt.replace(tzinfo=ZoneInfo("UTC"))
-                    except Exception:
-                        import datetime as _dt
-
-                        created_dt = created_dt.replace(tzinfo=_dt.timezone.utc)
-
-                # Convert to requested local tz and take the date
-                local_dt = created_dt.astimezone(local_zone)
-                day_key = local_dt.date().isoformat()
-
-                ent = agg_map.setdefault(day_key, {"sales": 0.0, "earnings": 0.0, "orders": 0})
-                ent["sales"] += float(total_amount)
-                ent["earnings"] += float(vendor_earning)
-                ent["orders"] += 1
-
-            # Build rows in the same shape as the Postgres query would return
-            rows = []
-            for i in range(7):
-                d = week_start_date + timedelta(days=i)
-                ds = d.isoformat()
-                ent = agg_map.get(ds, {"sales": 0.0, "earnings": 0.0, "orders": 0})
-                rows.append((ds, d.strftime("%a"), round(ent["sales"], 2), round(ent["earnings"], 2), ent["orders"]))
-        else:
-            result = await db.execute(text(sql), params)
-            rows = result.fetchall()
+        return await weekly_report(
+            week_start_date.isoformat(), tz, status, vendor_filter_id, include_totals
+        )
     except Exception as e:
-        # If the Postgres-specific SQL fails (or we're running on SQLite),
-        # attempt a pure-Python fallback aggregation. This provides a more
-        # resilient endpoint that works in dev (sqlite) and in environments
-        # where the fancy SQL might not be allowed or fails for some reason.
-        err_msg = str(e)
-        is_sqlite_url = bool(settings.DATABASE_URL and settings.DATABASE_URL.startswith("sqlite"))
-        should_attempt_fallback = is_sqlite_url or any(tok in err_msg for tok in ("generate_series", "AT TIME ZONE", "INTERVAL"))
-
-        if should_attempt_fallback:
-            try:
-                # Reuse the same fallback logic as the sqlite branch above.
-                try:
-                    local_zone = ZoneInfo(tz)
-                except Exception:
-                    try:
-                        local_zone = ZoneInfo("UTC")
-                    except Exception:
-                        import datetime as _dt
-
-                        local_zone = _dt.timezone.utc
-
-                local_week_start = datetime.combine(week_start_date, dt_time(0, 0), tzinfo=local_zone)
-                try:
-                    utc_week_start = local_week_start.astimezone(ZoneInfo("UTC"))
-                except Exception:
-                    import datetime as _dt
-
-                    utc_week_start = local_week_start.astimezone(_dt.timezone.utc)
-
-                utc_week_end = utc_week_start + timedelta(days=7)
-
-                q = text(
-                    """
-                    SELECT created_at, total_amount, COALESCE(vendor_earning, total_amount) AS vendor_earning
-                    FROM orders
-                    WHERE created_at >= :start_utc AND created_at < :end_utc AND status = :status
-                    """
-                )
-                result = await db.execute(q, {"start_utc": utc_week_start.isoformat(), "end_utc": utc_week_end.isoformat(), "status": status})
-                raw_rows = result.fetchall()
-
-                agg_map = {}
-                for r in raw_rows:
-                    created_at = r[0]
-                    total_amount = r[1] or 0
-                    vendor_earning = r[2] or total_amount
-
-                    if isinstance(created_at, str):
-                        try:
-                            created_dt = datetime.fromisoformat(created_at)
-                        except Exception:
-                            created_dt = datetime.fromisoformat(created_at.rstrip("Z"))
-                    else:
-                        created_dt = created_at
-
-                    if created_dt.tzinfo is None:
-                        try:
-                            created_dt = created_dt.replace(tzinfo=ZoneInfo("UTC"))
-                        except Exception:
-                            import datetime as _dt
-
-                            created_dt = created_dt.replace(tzinfo=_dt.timezone.utc)
-
-                    local_dt = created_dt.astimezone(local_zone)
-                    day_key = local_dt.date().isoformat()
-
-                    ent = agg_map.setdefault(day_key, {"sales": 0.0, "earnings": 0.0, "orders": 0})
-                    ent["sales"] += float(total_amount)
-                    ent["earnings"] += float(vendor_earning)
-                    ent["orders"] += 1
+        if engine.dialect.name == "postgresql":
+            # Unexpected DB errors: return a 500 with the DB error message to aid debugging.
+            raise HTTPException(status_code=500, detail=f"Database error: {e}")
+        # Dev databases (SQLite) may not have an orders table yet; return a
+        # zeroed week rather than failing so the dashboard UI stays usable.
+        # Built here, outside the cache, so the next request retries the query.
+        rows = [
+            {"date": (week_start_date + timedelta(days=i)).isoformat(),
+             "day": (week_start_date + timedelta(days=i)).strftime("%a"),
+             "total_sales": 0.0, "total_earnings": 0.0, "orders_count": 0}
+            for i in range(7)
+        ]
+        return _report_body(week_start_date, rows, include_totals)
+
+
+@cached_result(
+    "reports:weekly",
+    ttl=settings.REPORT_CACHE_TTL_SECONDS,
+    stale_ttl=settings.REPORT_CACHE_STALE_SECONDS,
+)
+async def weekly_report(
+    db: AsyncSession,
+    week_start: str,
+    tz: str,
+    status: str,
+    vendor_id: Optional[int],
+    include_totals: bool,
+) -> dict:
+    """Build the weekly report body. Cached per week, tz, status and vendor scope."""
+    week_start_date = datetime.fromisoformat(week_start).date()
+    query = SalesQuery(
+        start=week_start_date,
+        end=week_start_date + timedelta(days=7),
+        granularity="day",
+        tz=tz,
+        statuses=(status,),
+        vendor_id=vendor_id,
+    )
+    rows = (await sales_series(db, query)).rows()
+    return _report_body(week_start_date, rows, include_totals)
 
-                rows = []
-                for i in range(7):
-                    d = week_start_date + timedelta(days=i)
-                    ds = d.isoformat()
-                    ent = agg_map.get(ds, {"sales": 0.0, "earnings": 0.0, "orders": 0})
-                    rows.append((ds, d.strftime("%a"), round(ent["sales"], 2), round(ent["earnings"], 2), ent["orders"]))
-            except Exception:
-                # If fallback also fails (missing table, permission issues, etc.),
-                # return an empty weekly series (zeroed totals) rather than
-                # propagating a 500/501. This keeps the dashboard UI stable in
-                # dev environments where the orders table may be absent.
-                rows = []
-                for i in range(7):
-                    d = week_start_date + timedelta(days=i)
-                    ds = d.isoformat()
-                    rows.append((ds, d.strftime("%a"), 0.0, 0.0, 0))
-        else:
-            # Other unexpected DB errors: return a 500 with the DB error message to aid debugging.
-            raise HTTPException(status_code=500, detail=f"Database error: {err_msg}")
 
+def _report_body(week_start_date, rows, include_totals: bool) -> dict:
     labels = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
     per_day = []
     sales = []
@@ -308,23 +120,10 @@ async def weekly_sales_report(
     orders = []
 
     for r in rows:
-        date_str = r[0]
-        day_label = r[1]
-        total_sales = float(r[2]) if r[2] is not None else 0.0
-        total_earnings = float(r[3]) if r[3] is not None else 0.0
-        orders_count = int(r[4]) if r[4] is not None else 0
-
-        per_day.append({
-            "date": date_str,
-            "day": day_label,
-            "total_sales": round(total_sales, 2),
-            "total_earnings": round(total_earnings, 2),
-            "orders_count": orders_count,
-        })
-
-        sales.append(round(total_sales, 2))
-        earnings.append(round(total_earnings, 2))
-        orders.append(orders_count)
+        per_day.append(r)
+        sales.append(r["total_sales"])
+        earnings.append(r["total_earnings"])
+        orders.append(r["orders_count"])
 
     resp = {
         "week_start": week_start_date.isoformat(),
@@ -345,11 +144,4 @@ async def weekly_sales_report(
             "week_orders_count": sum(orders),
         }
 
-    # Set cache with short TTL (e.g., 120 seconds) to improve dashboard responsiveness.
-    try:
-        if getattr(cache, "_redis_available", False) and cache.redis_client:
-            cache.redis_client.setex(cache_key, 120, json.dumps(resp))
-    except Exception:
-        pass
-
     return resp
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
+from app.core.http_cache import conditional_response, make_etag, table_watermark
+from app.models.subcategory import Subcategory as SubcategoryModel
 from app.crud.crud_subcategory import (
     create_subcategory,
     get_subcategory,
@@ -21,15 +23,26 @@ async def create_subcategory_endpoint(subcategory_in: SubcategoryCreate, db: Asy
 
 
 @router.get("/{subcategory_id}", response_model=Subcategory)
-async def read_subcategory(subcategory_id: int, db: AsyncSession = Depends(get_db)):
+async def read_subcategory(subcategory_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     subcategory = await get_subcategory(db, subcategory_id)
     if not subcategory:
         raise HTTPException(status_code=404, detail="Subcategory not found")
+    etag = make_etag("subcategory", subcategory.id, subcategory.updated_at)
+    not_modified = conditional_response(request, response, etag, subcategory.updated_at)
+    if not_modified is not None:
+        return not_modified
     return subcategory
 
 
 @router.get("/", response_model=List[Subcategory])
-async def read_subcategories(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def read_subcategories(request: Request, response: Response, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+    # Validate against the table watermark before loading any rows. No
+    # Last-Modified: max(updated_at) does not move when a row is deleted.
+    count, updated_at, max_id = await table_watermark(db, SubcategoryModel)
+    etag = make_etag("subcategories", count, updated_at, max_id, skip, limit)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     return await get_subcategories(db, skip=skip, limit=limit)
 
 
@@ -4,8 +4,7 @@ from pathlib import Path
 import os
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_current_user, oauth2_scheme, decode_access_token
-from app.crud import crud_user
+from app.core.security import get_current_user
 from app.db.session import get_db
 from app.models.user import UserRole
 from app.crud.crud_vendor_account import get_vendor_by_email, get_vendor_by_id
@@ -24,7 +23,6 @@ async def upload_kyc_document(
     request: Request,
     file: UploadFile = File(...),
     document_type: str = Form(...),
-    token: str = Depends(oauth2_scheme),
     current_user = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -37,12 +35,7 @@ async def upload_kyc_document(
     """
 
     # Authenticate user and ensure vendor role
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await crud_user.get_user(db, user_id)
+    db_user = await current_user.get_user(db)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unable to resolve user")
 
@@ -50,8 +43,7 @@ async def upload_kyc_document(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only vendors may upload KYC documents")
 
     # Try to extract vendor_id from token payload; fall back to vendor lookup by user email
-    payload = decode_access_token(token) or {}
-    payload_vendor_id = payload.get("vendor_id") or payload.get("vendor_account_id") or None
+    payload_vendor_id = current_user.vendor_id
 
     vendor_by_email = await get_vendor_by_email(db, db_user.email)
 
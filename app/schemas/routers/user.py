@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr, ConfigDict
 import os
-from typing import List
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import get_current_admin
 from app.crud import crud_user
 from app.db.session import async_session_maker
-from app.models.user import User
+from app.models.user import User, UserRole
 import logging
 
 router = APIRouter()
@@ -22,6 +23,10 @@ class UserOut(BaseModel):
     is_active: bool
     model_config = ConfigDict(from_attributes=True)
 
+class UserAccessUpdate(BaseModel):
+    role: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+
 async def get_db():
     async with async_session_maker() as session:
         yield session
@@ -61,3 +66,22 @@ async def read_user(user_id: int, db: AsyncSession = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
+
+@router.patch("/{user_id}/access", response_model=UserOut)
+async def update_user_access(
+    user_id: int,
+    payload: UserAccessUpdate,
+    current_user = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """Change a user's role and/or deactivate them (admin only).
+
+    Tokens issued to the user before the change stop being trusted by
+    every worker on their next request.
+    """
+    if payload.role is None and payload.is_active is None:
+        raise HTTPException(status_code=400, detail="Nothing to update; pass role and/or is_active")
+    user = await crud_user.update_user_access(db, user_id, role=payload.role, is_active=payload.is_active)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
-from passlib.context import CryptContext
+from app.core.hashing import hash_password, vendor_pwd_context
 from app.db.session import get_db
 from app.crud.crud_vendor_account import (
     create_vendor_account,
@@ -12,15 +12,13 @@ from app.crud.crud_vendor_account import (
 )
 from app.schemas.vendor_account import VendorCreate, VendorResponse
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 router = APIRouter()
 
 
 @router.post("/", response_model=VendorResponse)
 async def create_vendor_endpoint(vendor_in: VendorCreate, db: AsyncSession = Depends(get_db)):
     # Hash password before creating account
-    hashed = pwd_context.hash(vendor_in.password)
+    hashed = await hash_password(vendor_in.password, vendor_pwd_context)
     vendor_data = vendor_in.model_dump()
     vendor_data["password_hash"] = hashed
     # remove plain password
@@ -50,7 +48,7 @@ async def update_vendor_endpoint(vendor_id: str, update_data: Dict[str, Any], db
     # Prevent updating password_hash directly via this endpoint
     if "password" in update_data:
         # If password provided, hash and set password_hash
-        hashed = pwd_context.hash(update_data.pop("password"))
+        hashed = await hash_password(update_data.pop("password"), vendor_pwd_context)
         update_data["password_hash"] = hashed
 
     updated = await update_vendor_account(db, vendor_id, update_data)
@@ -2,7 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.security import get_current_user
 from app.db.session import get_db
-from app.crud import crud_user
 from app.crud.crud_vendor_account import (
     get_vendor_by_email,
     update_vendor_kyc,
@@ -40,12 +39,7 @@ async def submit_vendor_kyc(
     - set vendor account status to PENDING
     """
     # Resolve full user
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await crud_user.get_user(db, user_id)
+    db_user = await current_user.get_user(db)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unable to resolve user")
 
@@ -102,12 +96,7 @@ async def get_kyc_status(
     db: AsyncSession = Depends(get_db),
 ):
     # Resolve full user
-    try:
-        user_id = int(current_user.id)
-    except Exception:
-        user_id = current_user.id
-
-    db_user = await crud_user.get_user(db, user_id)
+    db_user = await current_user.get_user(db)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unable to resolve user")
 
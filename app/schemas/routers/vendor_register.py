@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from passlib.context import CryptContext
+from app.core.hashing import hash_password, vendor_pwd_context
 from app.db.session import get_db
 from app.schemas.vendor_account import VendorCreate, VendorResponse
 from app.crud.crud_vendor_account import (
@@ -10,8 +10,6 @@ from app.crud.crud_vendor_account import (
 )
 from datetime import datetime
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 router = APIRouter()
 
 
@@ -24,7 +22,7 @@ async def register_vendor(vendor_in: VendorCreate, db: AsyncSession = Depends(ge
         raise HTTPException(status_code=400, detail="Phone number already registered")
 
     # Hash password
-    hashed = pwd_context.hash(vendor_in.password)
+    hashed = await hash_password(vendor_in.password, vendor_pwd_context)
 
     vendor_data = {
         "business_name": vendor_in.business_name,
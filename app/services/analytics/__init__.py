@@ -0,0 +1,71 @@
+"""Sales analytics engine shared by the reports and the dashboard.
+
+A `SalesQuery` (local date range, granularity, timezone, statuses, vendor
+scope) is answered by `sales_series()` with the best plan the backend
+supports:
+
+- PostgreSQL and SQLite: the ``rollup`` plan over `order_daily_rollups`,
+  falling back to the ``sql`` push-down plan (PostgreSQL) or the ``numpy``
+  plan (SQLite) when the rollup table is unavailable
+- anything else: the ``numpy`` plan
+
+Pass `plan=` to force one, e.g. for benchmarks.
+"""
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.analytics.plans import PLANS, numpy_plan, rollup_plan, sql_plan
+from app.services.sales_rollup import ROLLUP_DIALECTS
+from app.services.analytics.query import (
+    GRANULARITIES,
+    SalesQuery,
+    SalesSeries,
+    bin_totals,
+    lookup_zone,
+    period_starts,
+    resolve_zone,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def choose_plan(db: AsyncSession) -> str:
+    return "rollup" if db.bind.dialect.name in ROLLUP_DIALECTS else "numpy"
+
+
+async def sales_series(db: AsyncSession, query: SalesQuery, plan: Optional[str] = None) -> SalesSeries:
+    """Zero-filled order totals for every period of `query`."""
+    starts, bounds = period_starts(query)
+    plan = plan or choose_plan(db)
+    if plan not in PLANS:
+        raise ValueError(f"Unknown analytics plan '{plan}'; expected one of {tuple(PLANS)}")
+    try:
+        totals = await PLANS[plan](db, query, starts, bounds)
+    except Exception as e:
+        if plan != "rollup":
+            raise
+        # Rollup migration not applied on this database
+        logger.warning("Order rollups unavailable, aggregating orders instead: %s", e)
+        await db.rollback()
+        plan = "sql" if db.bind.dialect.name == "postgresql" else "numpy"
+        totals = await PLANS[plan](db, query, starts, bounds)
+    counts, sales, earnings = totals
+    return SalesSeries(query, starts, counts, sales, earnings, plan=plan)
+
+
+__all__ = [
+    "GRANULARITIES",
+    "SalesQuery",
+    "SalesSeries",
+    "sales_series",
+    "choose_plan",
+    "period_starts",
+    "bin_totals",
+    "lookup_zone",
+    "resolve_zone",
+    "rollup_plan",
+    "sql_plan",
+    "numpy_plan",
+]
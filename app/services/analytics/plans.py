@@ -0,0 +1,170 @@
+"""Execution plans for `SalesQuery`.
+
+- ``rollup``: sum the pre-aggregated `order_daily_rollups` buckets in range
+  (PostgreSQL and SQLite, where triggers keep them current)
+- ``sql``: ``date_trunc`` grouping pushed down to PostgreSQL over ``orders``
+- ``numpy``: the database sums orders into 15-minute epoch buckets, NumPy
+  bins those into periods; works on any backend
+
+Every plan returns `(orders_count, total_sales, total_earnings)` arrays
+aligned with `period_starts(query)`.
+
+`scripts/benchmark_analytics.py --size 1000000` (about 780k orders in the
+week, SQLite): ``rollup`` about 30ms, ``numpy`` about 1.2s. The ``numpy``
+plan scans and sorts every order in range, so it is the fallback for
+databases without the rollup triggers, not the default.
+"""
+import sqlite3
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, cast, func, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.order import Order
+from app.models.order_rollup import OrderDailyRollup
+from app.services.analytics.query import SalesQuery, bin_totals
+from app.services.sales_rollup import BUCKET_SECONDS
+
+Totals = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _utc(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def _naive_utc(epoch: float) -> datetime:
+    # SQLite stores naive UTC strings; an aware bound would be compared by its wall time
+    return _utc(epoch).replace(tzinfo=None)
+
+
+async def rollup_plan(db: AsyncSession, query: SalesQuery, starts: List[datetime], bounds: np.ndarray) -> Totals:
+    stmt = (
+        select(
+            OrderDailyRollup.bucket_start,
+            func.sum(OrderDailyRollup.orders_count),
+            func.sum(OrderDailyRollup.total_sales),
+            func.sum(OrderDailyRollup.total_earnings),
+        )
+        .where(
+            OrderDailyRollup.status.in_(query.statuses),
+            OrderDailyRollup.bucket_start >= _utc(bounds[0]),
+            OrderDailyRollup.bucket_start < _utc(bounds[-1]),
+        )
+        .group_by(OrderDailyRollup.bucket_start)
+    )
+    if query.vendor_id is not None:
+        stmt = stmt.where(OrderDailyRollup.vendor_id == query.vendor_id)
+    rows = (await db.execute(stmt)).all()
+
+    epochs = np.fromiter(
+        ((b if b.tzinfo else b.replace(tzinfo=timezone.utc)).timestamp() for b, *_ in rows),
+        dtype=np.float64, count=len(rows),
+    )
+    counts = np.fromiter((r[1] or 0 for r in rows), dtype=np.float64, count=len(rows))
+    sales = np.fromiter((float(r[2] or 0) for r in rows), dtype=np.float64, count=len(rows))
+    earnings = np.fromiter((float(r[3] or 0) for r in rows), dtype=np.float64, count=len(rows))
+    return bin_totals(bounds, epochs, counts, sales, earnings)
+
+
+async def sql_plan(db: AsyncSession, query: SalesQuery, starts: List[datetime], bounds: np.ndarray) -> Totals:
+    # Range predicate on the raw column so an index on created_at applies.
+    # Each local period start goes back to a UTC epoch and is binned like
+    # the other plans, so no group depends on Python and PostgreSQL
+    # rendering the local time identically.
+    zone = query.zone_name
+    period = func.date_trunc(query.granularity, func.timezone(zone, Order.created_at))
+    stmt = (
+        select(
+            func.extract("epoch", func.timezone(zone, period)),
+            func.count(),
+            func.sum(Order.total_amount),
+            func.sum(func.coalesce(Order.vendor_earning, Order.total_amount)),
+        )
+        .where(
+            Order.status.in_(query.statuses),
+            Order.created_at >= _utc(bounds[0]),
+            Order.created_at < _utc(bounds[-1]),
+        )
+        .group_by(period)
+    )
+    if query.vendor_id is not None:
+        stmt = stmt.where(Order.vendor_id == query.vendor_id)
+    epochs, counts, sales, earnings = _columns((await db.execute(stmt)).all(), 4)
+    return bin_totals(bounds, epochs, counts, sales, earnings)
+
+
+def _epoch_bucket(dialect: str, column) -> Optional[object]:
+    """SQL expression for the 15-minute UTC epoch bucket of `column`, if the dialect has one."""
+    size = literal_column(str(BUCKET_SECONDS))
+    if dialect == "sqlite":
+        if sqlite3.sqlite_version_info >= (3, 38, 0):
+            epoch = func.unixepoch(column)
+        else:
+            epoch = cast(func.strftime("%s", column), BigInteger)
+        # Integer operands: SQLite and PostgreSQL `/` truncates
+        return epoch.op("/")(size)
+    if dialect == "postgresql":
+        return cast(func.floor(func.extract("epoch", column)), BigInteger).op("/")(size)
+    if dialect in ("mysql", "mariadb"):
+        return func.unix_timestamp(column).op("DIV")(size)
+    return None
+
+
+def _columns(rows, count: int) -> Tuple[np.ndarray, ...]:
+    if not rows:
+        return tuple(np.zeros(0) for _ in range(count))
+    data = np.array([tuple(r) for r in rows], dtype=np.float64)
+    return tuple(np.nan_to_num(data[:, i]) for i in range(count))
+
+
+async def numpy_plan(db: AsyncSession, query: SalesQuery, starts: List[datetime], bounds: np.ndarray) -> Totals:
+    # Returning every order costs a Python object per row in the driver
+    # (over a second per million on SQLite). Group into 15-minute epoch
+    # buckets in the database instead: at most 96 rows per day whatever the
+    # order volume, and every UTC offset is a whole number of quarter hours,
+    # so the buckets still sum exactly into local periods. See the module
+    # docstring for where the remaining time goes.
+    dialect = db.bind.dialect.name
+    bucket = _epoch_bucket(dialect, Order.created_at)
+    as_bound = _naive_utc if dialect == "sqlite" else _utc
+    filters = [
+        Order.status.in_(query.statuses),
+        Order.created_at >= as_bound(bounds[0]),
+        Order.created_at < as_bound(bounds[-1]),
+    ]
+    if query.vendor_id is not None:
+        filters.append(Order.vendor_id == query.vendor_id)
+
+    if bucket is None:
+        stmt = select(
+            Order.created_at,
+            Order.total_amount,
+            func.coalesce(Order.vendor_earning, Order.total_amount),
+        ).where(*filters)
+        rows = (await db.execute(stmt)).all()
+        epochs = np.fromiter(
+            ((c if c.tzinfo else c.replace(tzinfo=timezone.utc)).timestamp() for c, _, _ in rows),
+            dtype=np.float64, count=len(rows),
+        )
+        sales, earnings = _columns([r[1:] for r in rows], 2)
+        return bin_totals(bounds, epochs, np.ones(len(rows)), sales, earnings)
+
+    bucket = bucket.label("bucket")
+    stmt = (
+        select(
+            bucket,
+            func.count(),
+            func.sum(Order.total_amount),
+            func.sum(func.coalesce(Order.vendor_earning, Order.total_amount)),
+        )
+        .where(*filters)
+        .group_by(bucket)
+    )
+    buckets, counts, sales, earnings = _columns((await db.execute(stmt)).all(), 4)
+    return bin_totals(bounds, buckets * BUCKET_SECONDS, counts, sales, earnings)
+
+
+PLANS = {"rollup": rollup_plan, "sql": sql_plan, "numpy": numpy_plan}
@@ -0,0 +1,158 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+GRANULARITIES = ("hour", "day", "week", "month")
+
+
+def lookup_zone(tz: str) -> tzinfo:
+    """ZoneInfo for `tz`; raises ValueError when the name is unknown.
+
+    Windows installs without the `tzdata` package have no zone database at
+    all; the stdlib UTC object keeps ``"UTC"`` working there.
+    """
+    try:
+        return ZoneInfo(tz)
+    except Exception:
+        if tz == "UTC":
+            return timezone.utc
+        raise ValueError(f"Unknown timezone '{tz}'")
+
+
+def resolve_zone(tz: str) -> tzinfo:
+    """Like `lookup_zone`, but UTC when the name is unknown."""
+    try:
+        return lookup_zone(tz)
+    except ValueError:
+        return lookup_zone("UTC")
+
+
+@dataclass(frozen=True)
+class SalesQuery:
+    """Order totals over local dates ``[start, end)`` grouped by `granularity`.
+
+    Periods are aligned to the granularity (weeks start on Monday, months on
+    the 1st) in timezone `tz`, so the first period may begin before `start`.
+    `vendor_id` None means every vendor. An unknown `tz` raises ValueError.
+    """
+
+    start: date
+    end: date
+    granularity: str = "day"
+    tz: str = "UTC"
+    statuses: Tuple[str, ...] = ("completed",)
+    vendor_id: Optional[int] = None
+
+    def __post_init__(self):
+        if self.granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity '{self.granularity}'; expected one of {GRANULARITIES}")
+        if self.end <= self.start:
+            raise ValueError("end must be after start")
+        if isinstance(self.statuses, str):
+            object.__setattr__(self, "statuses", (self.statuses,))
+        lookup_zone(self.tz)
+
+    @property
+    def zone(self) -> tzinfo:
+        return lookup_zone(self.tz)
+
+    @property
+    def zone_name(self) -> str:
+        """IANA name of `zone` as the database should see it."""
+        return getattr(self.zone, "key", "UTC")
+
+
+def _align(d: date, granularity: str) -> date:
+    if granularity == "week":
+        return d - timedelta(days=d.weekday())
+    if granularity == "month":
+        return d.replace(day=1)
+    return d
+
+
+def _next(d: date, granularity: str) -> date:
+    if granularity == "week":
+        return d + timedelta(days=7)
+    if granularity == "month":
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=1)
+
+
+def period_starts(query: SalesQuery) -> Tuple[List[datetime], np.ndarray]:
+    """Local start of every period plus the UTC epoch boundaries.
+
+    Returns `(starts, bounds)` where ``bounds[i]`` is the UTC epoch second of
+    ``starts[i]`` and ``bounds[-1]`` the end of the last period, so
+    ``len(bounds) == len(starts) + 1``. Day, week and month boundaries are
+    local midnights (DST-aware); hours are consecutive absolute hours from
+    local midnight.
+    """
+    zone = query.zone
+    if query.granularity == "hour":
+        first = datetime.combine(query.start, time(0), tzinfo=zone).astimezone(timezone.utc)
+        last = datetime.combine(query.end, time(0), tzinfo=zone).astimezone(timezone.utc)
+        hours = int((last - first).total_seconds() // 3600)
+        utc_starts = [first + timedelta(hours=i) for i in range(hours)]
+        starts = [u.astimezone(zone) for u in utc_starts]
+        bounds = [u.timestamp() for u in utc_starts] + [last.timestamp()]
+        return starts, np.asarray(bounds, dtype=np.float64)
+
+    starts = []
+    d = _align(query.start, query.granularity)
+    while d < query.end:
+        starts.append(datetime.combine(d, time(0), tzinfo=zone))
+        d = _next(d, query.granularity)
+    end = datetime.combine(d, time(0), tzinfo=zone)
+    bounds = [s.timestamp() for s in starts] + [end.timestamp()]
+    return starts, np.asarray(bounds, dtype=np.float64)
+
+
+def bin_totals(
+    bounds: np.ndarray,
+    epochs: np.ndarray,
+    counts: np.ndarray,
+    sales: np.ndarray,
+    earnings: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum per-row (or per-bucket) values into the periods delimited by `bounds`."""
+    n = len(bounds) - 1
+    idx = np.searchsorted(bounds, epochs, side="right") - 1
+    keep = (idx >= 0) & (idx < n)
+    idx = idx[keep]
+    return (
+        np.bincount(idx, weights=counts[keep], minlength=n).astype(np.int64),
+        np.bincount(idx, weights=sales[keep], minlength=n),
+        np.bincount(idx, weights=earnings[keep], minlength=n),
+    )
+
+
+_LABELS = {"hour": "%H:%M", "day": "%a", "week": "%d %b", "month": "%b %Y"}
+
+
+@dataclass
+class SalesSeries:
+    """Zero-filled totals, one entry per period, in period order."""
+
+    query: SalesQuery
+    periods: List[datetime]
+    orders_count: np.ndarray
+    total_sales: np.ndarray
+    total_earnings: np.ndarray
+    plan: str = field(default="")
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Rows shaped like the weekly report's ``per_day`` entries."""
+        fmt = _LABELS[self.query.granularity]
+        out = []
+        for i, start in enumerate(self.periods):
+            out.append({
+                "date": start.isoformat() if self.query.granularity == "hour" else start.date().isoformat(),
+                "day": start.strftime(fmt),
+                "total_sales": round(float(self.total_sales[i]), 2),
+                "total_earnings": round(float(self.total_earnings[i]), 2),
+                "orders_count": int(self.orders_count[i]),
+            })
+        return out
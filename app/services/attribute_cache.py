@@ -0,0 +1,70 @@
+import hashlib
+import logging
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.product_attribute import ProductAttributeCache
+
+logger = logging.getLogger(__name__)
+
+# Bump PROMPT_VERSION whenever the extraction prompt changes so stale
+# entries are ignored instead of being served for the new prompt.
+ATTRIBUTE_MODEL = "gpt-3.5-turbo"
+PROMPT_VERSION = "v1"
+EXTRACTOR_VERSION = f"{ATTRIBUTE_MODEL}:{PROMPT_VERSION}"
+
+
+def content_hash(product_text: str) -> str:
+    """sha256 of the whitespace-normalised product text."""
+    normalised = re.sub(r"\s+", " ", product_text or "").strip()
+    return hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+
+
+def product_text(name: Optional[str], description: Optional[str]) -> str:
+    """The text attributes are extracted from, built the same way everywhere."""
+    return f"{name or ''} {description or ''}"
+
+
+async def get_cached_attributes_many(db: AsyncSession, texts: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Look up cached attributes for several texts in one query, keyed by content hash."""
+    hashes = {content_hash(t) for t in texts}
+    if not hashes:
+        return {}
+    result = await db.execute(
+        select(ProductAttributeCache.content_hash, ProductAttributeCache.attributes).where(
+            ProductAttributeCache.content_hash.in_(hashes),
+            ProductAttributeCache.extractor_version == EXTRACTOR_VERSION,
+        )
+    )
+    return {row[0]: row[1] for row in result.all()}
+
+
+async def get_cached_attributes(db: AsyncSession, text: str) -> Optional[Dict[str, Any]]:
+    cached = await get_cached_attributes_many(db, [text])
+    return cached.get(content_hash(text))
+
+
+async def store_attributes(
+    db: AsyncSession,
+    text: str,
+    attributes: Dict[str, Any],
+    product_id: Optional[int] = None,
+    commit: bool = True,
+) -> None:
+    """Persist extracted attributes; a concurrent insert of the same key is ignored."""
+    try:
+        async with db.begin_nested():
+            db.add(ProductAttributeCache(
+                content_hash=content_hash(text),
+                extractor_version=EXTRACTOR_VERSION,
+                product_id=product_id,
+                attributes=attributes,
+            ))
+    except IntegrityError:
+        logger.debug("Attributes for product %s already cached", product_id)
+    if commit:
+        await db.commit()
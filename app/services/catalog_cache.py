@@ -0,0 +1,108 @@
+"""Versioned cache for public catalog listing pages.
+
+Every cached page key embeds the current catalog version, so bumping the
+version (on any product mutation) invalidates all pages at once without
+scanning or deleting keys; stale entries simply expire. Redis is used when
+available; otherwise a small per-process LRU with a local version counter
+keeps single-worker deployments and tests working.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import redis as redis_cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "catalog:version"
+_PAGE_PREFIX = "catalog:page:"
+_LOCAL_MAX_PAGES = 512
+
+_lock = threading.Lock()
+_local_version = 0
+# Distinguishes local counters of different processes / restarts
+_BOOT_ID = uuid.uuid4().hex[:12]
+_local_pages: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+_counters = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+
+
+def catalog_version() -> int:
+    version = redis_cache.get_counter(VERSION_KEY)
+    return _local_version if version is None else version
+
+
+def catalog_version_token() -> str:
+    """Catalog version usable as an HTTP validator.
+
+    The Redis counter is shared by every worker; the local fallback is only
+    meaningful within this process, so it is qualified with a boot id.
+    """
+    version = redis_cache.get_counter(VERSION_KEY)
+    if version is None:
+        return f"local-{_BOOT_ID}-{_local_version}"
+    return f"redis-{version}"
+
+
+def bump_catalog_version() -> None:
+    """Invalidate every cached catalog page. Call after a product mutation commits."""
+    global _local_version
+    with _lock:
+        _local_version += 1
+        _local_pages.clear()
+        _counters["invalidations"] += 1
+    redis_cache.incr_counter(VERSION_KEY)
+
+
+def page_key(scope: str, cursor: Optional[str], limit: int, version: int, **filters) -> str:
+    parts = [scope, cursor or "", str(limit)] + [f"{k}={filters[k]}" for k in sorted(filters)]
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+    return f"{_PAGE_PREFIX}v{version}:{digest}"
+
+
+def get_page(key: str) -> Optional[Tuple[List[Dict[str, Any]], Optional[str]]]:
+    """Return `(rows, next_cursor)` for a cached page, or None on a miss."""
+    value = redis_cache.cache_get_json(key)
+    if value is None and not redis_cache.is_available():
+        with _lock:
+            entry = _local_pages.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                _local_pages.move_to_end(key)
+                value = entry[1]
+    with _lock:
+        _counters["hits" if value is not None else "misses"] += 1
+    if value is None:
+        return None
+    return value["rows"], value["next_cursor"]
+
+
+def store_page(key: str, rows: List[Dict[str, Any]], next_cursor: Optional[str]) -> None:
+    value = {"rows": rows, "next_cursor": next_cursor}
+    ttl = settings.CATALOG_CACHE_TTL_SECONDS
+    redis_cache.cache_set_json(key, value, ttl)
+    if not redis_cache.is_available():
+        with _lock:
+            _local_pages[key] = (time.monotonic() + ttl, value)
+            _local_pages.move_to_end(key)
+            while len(_local_pages) > _LOCAL_MAX_PAGES:
+                _local_pages.popitem(last=False)
+    with _lock:
+        _counters["stores"] += 1
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_counters)
+        local_pages = len(_local_pages)
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        **counters,
+        "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        "version": catalog_version(),
+        "backend": "redis" if redis_cache.is_available() else "local",
+        "local_pages": local_pages,
+    }
@@ -1,9 +1,17 @@
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 from typing import Optional, List, Dict, Any
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.result_cache import cached_result
+from app.services.analytics import SalesQuery, sales_series
 
+
+@cached_result(
+    "dashboard:weekly",
+    ttl=settings.REPORT_CACHE_TTL_SECONDS,
+    stale_ttl=settings.REPORT_CACHE_STALE_SECONDS,
+)
 async def get_weekly_summary(
     db: AsyncSession,
     week_start_date: str,
@@ -14,63 +22,17 @@ async def get_weekly_summary(
     """
     Return aggregated rows for each day in the 7-day window starting at `week_start_date`.
 
-    The function returns rows with columns: date, day_label, total_sales, total_earnings, orders_count
-    Uses Postgres `generate_series` in a single, efficient query.
+    The function returns rows with keys: date, day, total_sales, total_earnings, orders_count
+    Computed by the analytics engine (`app.services.analytics`) and cached
+    with stale-while-revalidate (`app.core.result_cache`).
 
     Parameters:
-    - db: AsyncSession
+    - db: AsyncSession, opened by the cache (callers omit it)
     - week_start_date: ISO date string (YYYY-MM-DD) representing the start (inclusive)
     - tz: timezone used for grouping (client timezone)
     - status: order status filter
     - vendor_id: optional vendor filter
     """
-
-    vendor_clause = "AND vendor_id = :vendor_id" if vendor_id is not None else ""
-
-    sql = f"""
-    WITH params AS (
-      SELECT :week_start::date AS wstart, :tz::text AS tz
-    ),
-    days AS (
-      SELECT generate_series(wstart, wstart + INTERVAL '6 days', INTERVAL '1 day')::date AS day FROM params
-    ),
-    agg AS (
-      SELECT
-        (created_at AT TIME ZONE 'UTC' AT TIME ZONE params.tz)::date AS day,
-        SUM(total_amount)::numeric(20,2) AS total_sales,
-        SUM(COALESCE(vendor_earning, total_amount))::numeric(20,2) AS total_earnings,
-        COUNT(*)::int AS orders_count
-      FROM orders, params
-      WHERE (created_at AT TIME ZONE 'UTC' AT TIME ZONE params.tz)::date BETWEEN params.wstart AND (params.wstart + INTERVAL '6 days')
-        AND status = :status
-        {vendor_clause}
-      GROUP BY day
-    )
-    SELECT to_char(d.day, 'YYYY-MM-DD') AS date, to_char(d.day, 'Dy') AS day_label,
-      COALESCE(a.total_sales, 0) AS total_sales, COALESCE(a.total_earnings, 0) AS total_earnings, COALESCE(a.orders_count, 0) AS orders_count
-    FROM days d
-    LEFT JOIN agg a USING (day)
-    ORDER BY d.day
-    """
-
-    params = {"week_start": week_start_date, "tz": tz, "status": status}
-    if vendor_id is not None:
-        params["vendor_id"] = vendor_id
-
-    result = await db.execute(text(sql), params)
-    rows = result.fetchall()
-
-    # Map rows into a list of dicts
-    out = []
-    for r in rows:
-        out.append(
-            {
-                "date": r[0],
-                "day": r[1],
-                "total_sales": float(r[2]) if r[2] is not None else 0.0,
-                "total_earnings": float(r[3]) if r[3] is not None else 0.0,
-                "orders_count": int(r[4]) if r[4] is not None else 0,
-            }
-        )
-
-    return out
+    start = date.fromisoformat(week_start_date)
+    query = SalesQuery(start=start, end=start + timedelta(days=7), granularity="day", tz=tz, statuses=(status,), vendor_id=vendor_id)
+    return (await sales_series(db, query)).rows()
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BatchEmbedFn = Callable[[List[str]], Awaitable[Sequence[np.ndarray]]]
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent single-text embedding requests into batched calls.
+
+    Callers await `embed(text)`. Requests are queued until either
+    `max_batch_size` texts are waiting or `max_wait_ms` has passed since the
+    first one arrived; the queue is then sent as one `embed_batch` call and
+    each waiter receives its own vector (or the batch's exception).
+    Identical texts in one batch are sent once.
+    """
+
+    def __init__(self, embed_batch: BatchEmbedFn, max_batch_size: int = 64, max_wait_ms: float = 10.0):
+        self._embed_batch = embed_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self.requests = 0
+        self.batches = 0
+
+    async def embed(self, text: str) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    async def embed_many(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """Embed several texts; they share batches with any concurrent callers."""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: self.max_batch_size]
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            # Keep a reference so the task isn't garbage collected mid-flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        unique: Dict[str, int] = {}
+        for text, _ in batch:
+            unique.setdefault(text, len(unique))
+        self.batches += 1
+        try:
+            vectors = await self._embed_batch(list(unique))
+            if len(vectors) != len(unique):
+                raise RuntimeError(f"Embedding batch returned {len(vectors)} vectors for {len(unique)} inputs")
+        except Exception as e:
+            logger.warning("Embedding batch of %d texts failed: %s", len(unique), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, future in batch:
+            if not future.done():
+                # Each waiter gets its own array, even for duplicate texts
+                future.set_result(np.array(vectors[unique[text]], copy=True))
@@ -0,0 +1,268 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.core import redis as redis_cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_REDIS_PREFIX = "embedding:v1:"
+_REDIS_LRU_KEY = "embedding:v1:lru"
+# Evict from the SQLite tier once every this many writes
+_DISK_EVICT_EVERY = 256
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    """sha256 over the model name and the whitespace-normalised text."""
+    normalised = re.sub(r"\s+", " ", text or "").strip()
+    return hashlib.sha256(f"{model}\n{normalised}".encode("utf-8")).hexdigest()
+
+
+class _MemoryTier:
+    """Bounded LRU of float32 vectors, limited by total array bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self._items: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        vec = self._items.get(key)
+        if vec is not None:
+            self._items.move_to_end(key)
+        return vec
+
+    def put(self, key: str, vec: np.ndarray) -> None:
+        if vec.nbytes > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._items[key] = vec
+        self._bytes += vec.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._bytes = 0
+
+
+class _SqliteTier:
+    """Local file fallback for the shared tier when Redis is unavailable.
+
+    Rows carry a last-access timestamp; the least recently used rows beyond
+    `max_entries` are deleted periodically.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.evictions = 0
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=1)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY, vector BLOB NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_accessed_at ON embeddings (accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, now: float) -> Optional[bytes]:
+        conn = self._connect()
+        row = conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE embeddings SET accessed_at = ? WHERE key = ?", (now, key))
+        conn.commit()
+        return row[0]
+
+    def put(self, key: str, value: bytes, now: float) -> None:
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO embeddings (key, vector, accessed_at) VALUES (?, ?, ?)",
+            (key, value, now),
+        )
+        self._writes += 1
+        if self._writes % _DISK_EVICT_EVERY == 0:
+            self.evict()
+        conn.commit()
+
+    def evict(self) -> None:
+        conn = self._connect()
+        (count,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += overflow
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class EmbeddingCache:
+    """Two-tier, content-addressed cache for embedding vectors.
+
+    Tier one is a per-process LRU bounded by bytes. Tier two is shared:
+    Redis when it is reachable, otherwise a local SQLite file. Hits in tier
+    two are promoted into tier one. Both tiers evict least recently used
+    entries once over their size limit.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int,
+        shared_max_entries: int,
+        disk_path: Optional[str] = None,
+        use_redis: bool = True,
+    ):
+        self._memory = _MemoryTier(memory_bytes)
+        self._disk = _SqliteTier(disk_path, shared_max_entries) if disk_path else None
+        self.shared_max_entries = max(1, shared_max_entries)
+        self.use_redis = use_redis
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "shared_hits": 0, "misses": 0, "shared_evictions": 0}
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        """Return a copy of the cached vector, or None on a miss."""
+        key = embedding_cache_key(model, text)
+        with self._lock:
+            vec = self._memory.get(key)
+            if vec is not None:
+                self._counters["memory_hits"] += 1
+                return vec.copy()
+
+        raw = self._shared_get(key)
+        with self._lock:
+            if raw is None:
+                self._counters["misses"] += 1
+                return None
+            vec = np.frombuffer(raw, dtype=np.float32)
+            self._memory.put(key, vec)
+            self._counters["shared_hits"] += 1
+        return vec.copy()
+
+    def get_local(self, model: str, text: str) -> Optional[np.ndarray]:
+        """In-process tier only; a miss here is not counted."""
+        key = embedding_cache_key(model, text)
+        with self._lock:
+            vec = self._memory.get(key)
+            if vec is None:
+                return None
+            self._counters["memory_hits"] += 1
+            return vec.copy()
+
+    def put(self, model: str, text: str, embedding: Any) -> None:
+        key = embedding_cache_key(model, text)
+        vec = np.array(embedding, dtype=np.float32).reshape(-1)
+        vec.flags.writeable = False
+        with self._lock:
+            self._memory.put(key, vec)
+        self._shared_put(key, vec.tobytes())
+
+    def _shared_get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        if self._redis_enabled():
+            return redis_cache.get_bytes_touch(_REDIS_PREFIX + key, _REDIS_LRU_KEY, now)
+        if self._disk is not None:
+            try:
+                with self._lock:
+                    return self._disk.get(key, now)
+            except sqlite3.Error as e:
+                logger.warning("Embedding disk cache read failed: %s", e)
+        return None
+
+    def _shared_put(self, key: str, value: bytes) -> None:
+        now = time.time()
+        if self._redis_enabled():
+            evicted = redis_cache.set_bytes_bounded(
+                _REDIS_PREFIX + key, value, _REDIS_LRU_KEY, now, self.shared_max_entries
+            )
+            with self._lock:
+                self._counters["shared_evictions"] += evicted
+            return
+        if self._disk is not None:
+            try:
+                with self._lock:
+                    self._disk.put(key, value, now)
+            except sqlite3.Error as e:
+                logger.warning("Embedding disk cache write failed: %s", e)
+
+    def _redis_enabled(self) -> bool:
+        if not self.use_redis:
+            return False
+        return redis_cache.is_available()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            lookups = counters["memory_hits"] + counters["shared_hits"] + counters["misses"]
+            shared_evictions = counters["shared_evictions"] + (self._disk.evictions if self._disk else 0)
+            return {
+                "memory_hits": counters["memory_hits"],
+                "shared_hits": counters["shared_hits"],
+                "misses": counters["misses"],
+                "hit_rate": round((lookups - counters["misses"]) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory.nbytes,
+                "memory_evictions": self._memory.evictions,
+                "shared_evictions": shared_evictions,
+                "shared_backend": "redis" if self._redis_enabled() else ("sqlite" if self._disk else "none"),
+            }
+
+    def clear(self) -> None:
+        """Drop the in-process tier and reset counters (the shared tier is kept)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory.evictions = 0
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide cache configured from settings."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(
+            memory_bytes=settings.EMBEDDING_CACHE_MEMORY_MB * 1024 * 1024,
+            shared_max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            disk_path=settings.EMBEDDING_CACHE_PATH or None,
+        )
+    return _cache
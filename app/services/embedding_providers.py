@@ -0,0 +1,144 @@
+"""Embedding backends used by `EmbeddingService`.
+
+- ``openai``: the OpenAI embeddings API (default)
+- ``local``: deterministic hashed character n-gram vectors computed on CPU,
+  for CI, load tests and benchmarks without network access
+
+`get_embedding_provider()` returns the backend selected by
+``settings.EMBEDDING_PROVIDER``.
+"""
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.openai_client import get_openai_client
+
+
+class EmbeddingProvider(ABC):
+    """Turns a batch of texts into vectors, one per text, in order."""
+
+    name: str = "base"
+    # Whether results are worth keeping in the embedding cache
+    cacheable: bool = True
+
+    @property
+    @abstractmethod
+    def model(self) -> str:
+        """Identifier of the vector space; part of the embedding cache key."""
+
+    @abstractmethod
+    async def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        ...
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """OpenAI embeddings API through the shared application client.
+
+    Raises ValueError on construction when no API key is configured and no
+    client is injected.
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None, client=None, model: Optional[str] = None):
+        key = api_key or settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+        if client is None and not key:
+            raise ValueError("OPENAI_API_KEY not set")
+        self._api_key = api_key
+        self._client = client
+        self._model = model
+
+    @property
+    def model(self) -> str:
+        return self._model or settings.EMBEDDING_MODEL
+
+    @property
+    def client(self):
+        # Resolved per use so a client recreated after shutdown is picked up
+        return self._client or get_openai_client(self._api_key)
+
+    async def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        resp = await self.client.embeddings.create(model=self.model, input=list(texts))
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        for item in resp.data:
+            vectors[item.index] = np.array(item.embedding, dtype=np.float32)
+        return vectors
+
+
+class LocalHashingEmbeddingProvider(EmbeddingProvider):
+    """Deterministic offline embeddings.
+
+    Character 3-5 grams (within word boundaries) are hashed into a sparse
+    term-frequency vector, dampened with log1p, projected to `dim`
+    dimensions with a seeded sparse random projection and L2-normalised.
+    The same text always maps to the same vector, and texts sharing many
+    n-grams land close together, which is enough to exercise duplicate
+    detection and the vector indexes realistically.
+    """
+
+    name = "local"
+    # Recomputing is cheaper than a cache round trip
+    cacheable = False
+
+    def __init__(self, dim: int = 1536, n_features: int = 2 ** 16, seed: int = 0):
+        from scipy import sparse
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.random_projection import SparseRandomProjection
+
+        self.dim = dim
+        self.seed = seed
+        self._vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=(3, 5),
+            n_features=n_features,
+            alternate_sign=False,
+            norm=None,
+            lowercase=True,
+        )
+        # The projection only depends on the input width and the seed
+        self._projection = SparseRandomProjection(
+            n_components=dim, dense_output=True, random_state=seed
+        ).fit(sparse.csr_matrix((1, n_features), dtype=np.float32))
+
+    @property
+    def model(self) -> str:
+        return f"local-char-ngram-v1-{self.dim}-{self.seed}"
+
+    def embed_sync(self, texts: Sequence[str]) -> np.ndarray:
+        """Return a `(len(texts), dim)` float32 matrix of unit vectors."""
+        counts = self._vectorizer.transform(list(texts)).astype(np.float32)
+        counts.data = np.log1p(counts.data)
+        vectors = np.asarray(self._projection.transform(counts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    async def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        # CPU-bound; keep large batches off the event loop
+        matrix = await asyncio.to_thread(self.embed_sync, texts)
+        return list(matrix)
+
+
+PROVIDERS = ("openai", "local")
+
+_local: Optional[LocalHashingEmbeddingProvider] = None
+
+
+def get_embedding_provider(name: Optional[str] = None, **kwargs) -> EmbeddingProvider:
+    """Build the configured provider. The local provider is shared per
+    process because building its projection matrix takes a moment."""
+    global _local
+    name = (name or settings.EMBEDDING_PROVIDER or "openai").lower()
+    if name == "openai":
+        return OpenAIEmbeddingProvider(**kwargs)
+    if name == "local":
+        if kwargs:
+            return LocalHashingEmbeddingProvider(**kwargs)
+        if _local is None:
+            _local = LocalHashingEmbeddingProvider(dim=settings.LOCAL_EMBEDDING_DIM)
+        return _local
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER '{name}'; expected one of {PROVIDERS}")
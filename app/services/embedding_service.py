@@ -1,7 +1,17 @@
-import os
 import asyncio
+from typing import List, Sequence
+
 import numpy as np
 
+from app.core.config import settings
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import get_embedding_cache
+from app.services.embedding_providers import (
+    EmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    get_embedding_provider,
+)
+
 # Prefer sklearn's implementation when available, but provide a lightweight
 # numpy-based fallback so tests and imports don't fail in minimal envs.
 try:
@@ -27,34 +37,74 @@ except Exception:
 
 
 class EmbeddingService:
-    """Wrapper around OpenAI embeddings client.
+    """Embeds text through a pluggable `EmbeddingProvider`.
+
+    The provider comes from ``settings.EMBEDDING_PROVIDER`` unless one is
+    passed in. With the default OpenAI provider an API key is required,
+    either passed directly or through the `OPENAI_API_KEY` environment
+    variable; if it is missing the constructor raises ValueError (tests
+    expect this behaviour).
 
-    Initialization requires an API key either passed directly or through
-    the `OPENAI_API_KEY` environment variable. If the key is missing the
-    constructor raises ValueError (tests expect this behaviour).
+    Concurrent `get_embedding` calls on one instance are coalesced by an
+    `EmbeddingBatcher` into a single multi-input provider request.
     """
 
-    def __init__(self, api_key: str | None = None):
-        key = api_key or os.getenv("OPENAI_API_KEY")
-        if not key:
-            raise ValueError("OPENAI_API_KEY not set")
-        try:
-            from openai import OpenAI
-        except Exception as e:
-            raise ImportError("openai package is required for EmbeddingService") from e
+    def __init__(self, api_key: str | None = None, client=None, provider: EmbeddingProvider | None = None):
+        if provider is None:
+            if api_key or client is not None:
+                provider = OpenAIEmbeddingProvider(api_key=api_key, client=client)
+            else:
+                provider = get_embedding_provider()
+        self.provider = provider
 
-        self.client = OpenAI(api_key=key)
+        self.batcher = EmbeddingBatcher(
+            self.embed_batch,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_wait_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+        )
 
     async def get_embedding(self, text: str) -> np.ndarray:
-        def _call():
-            resp = self.client.embeddings.create(model="text-embedding-3-small", input=text)
-            return np.array(resp.data[0].embedding)
-
-        return await asyncio.to_thread(_call)
+        if not text or not text.strip():
+            raise ValueError("Cannot embed empty text")
+        # In-process cache hits skip the batching window entirely
+        if self.provider.cacheable:
+            cached = get_embedding_cache().get_local(self.provider.model, text)
+            if cached is not None:
+                return cached
+        return await self.batcher.embed(text)
+
+    async def get_embeddings(self, texts: Sequence[str]) -> List[np.ndarray]:
+        return list(await asyncio.gather(*(self.get_embedding(text) for text in texts)))
+
+    async def embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed `texts` with one provider request for everything not already cached."""
+        if not self.provider.cacheable:
+            return await self.provider.embed(texts)
+
+        model = self.provider.model
+        cache = get_embedding_cache()
+
+        # The shared cache tier is blocking I/O: one worker-thread hop per
+        # batch for the lookup and one for the store, none per text.
+        results = await asyncio.to_thread(lambda: [cache.get(model, text) for text in texts])
+        missing = [i for i, vec in enumerate(results) if vec is None]
+        if not missing:
+            return results
+
+        vectors = await self.provider.embed([texts[i] for i in missing])
+        for i, vec in zip(missing, vectors):
+            results[i] = vec
+
+        def _store():
+            for i in missing:
+                if results[i] is not None:
+                    cache.put(model, texts[i], results[i])
+
+        await asyncio.to_thread(_store)
+        return results
 
     async def match_products(self, new_product: str, existing_product: str):
-        emb1 = await self.get_embedding(new_product)
-        emb2 = await self.get_embedding(existing_product)
+        emb1, emb2 = await self.get_embeddings([new_product, existing_product])
 
         similarity = cosine_similarity([emb1], [emb2])[0][0]
 
@@ -68,27 +118,24 @@ class EmbeddingService:
         return {"similarity_score": round(float(similarity), 3), "confidence_label": label}
 
 
+_service: EmbeddingService | None = None
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Return the shared service so concurrent callers share one batcher."""
+    global _service
+    if _service is None:
+        _service = EmbeddingService()
+    return _service
+
+
 async def get_embedding(text: str) -> np.ndarray:
-    svc = EmbeddingService()
-    return await svc.get_embedding(text)
+    return await get_embedding_service().get_embedding(text)
 
 
-async def match_products(new_product: str, existing_product: str):
-    svc = EmbeddingService()
-    return await svc.match_products(new_product, existing_product)
+async def get_embeddings(texts: Sequence[str]) -> List[np.ndarray]:
+    return await get_embedding_service().get_embeddings(texts)
 
 
-def get_openai_client(api_key: str | None = None):
-    """Return an OpenAI client instance using the provided API key or
-    the `OPENAI_API_KEY` environment variable. This is a convenience for
-    modules that need direct access to the OpenAI client (e.g. product_matcher).
-    """
-    key = api_key or os.getenv("OPENAI_API_KEY")
-    if not key:
-        raise ValueError("OPENAI_API_KEY not set")
-    try:
-        from openai import OpenAI
-    except Exception as e:
-        raise ImportError("openai package is required to get an OpenAI client") from e
-
-    return OpenAI(api_key=key)
+async def match_products(new_product: str, existing_product: str):
+    return await get_embedding_service().match_products(new_product, existing_product)
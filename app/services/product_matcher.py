@@ -1,10 +1,31 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+import asyncio
 import json
-from app.services.embedding_service import get_openai_client
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud import crud_product
+from app.db.session import async_session_maker
+from app.services.attribute_cache import (
+    ATTRIBUTE_MODEL,
+    content_hash,
+    get_cached_attributes_many,
+    product_text as build_product_text,
+    store_attributes,
+)
+from app.core.openai_client import get_openai_client
+from app.services.embedding_service import get_embedding
 
-async def extract_product_attributes(product_text: str) -> Dict[str, Any]:
+ATTRIBUTE_KEYS = ["brand", "item_type", "size", "quantity", "packaging", "target_users", "purpose"]
+
+
+def _empty_attributes() -> Dict[str, Any]:
+    return {key: None for key in ATTRIBUTE_KEYS}
+
+
+async def _request_attributes(product_text: str) -> Dict[str, Any]:
     """
-    Extract product attributes using OpenAI.
+    Ask the LLM for the attributes of one product. Raises on any failure so
+    that only successful extractions end up in the cache.
     """
     client = get_openai_client()
     prompt = f"""
@@ -25,38 +46,95 @@ async def extract_product_attributes(product_text: str) -> Dict[str, Any]:
     }}
     """
 
+    response = await client.chat.completions.create(
+        model=ATTRIBUTE_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=200,
+        temperature=0.1
+    )
+    content = response.choices[0].message.content.strip()
+    # Remove markdown if present
+    if content.startswith("```json"):
+        content = content[7:]
+    if content.endswith("```"):
+        content = content[:-3]
+    return json.loads(content)
+
+async def extract_product_attributes(product_text: str, db: Optional[AsyncSession] = None, product_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Extract product attributes using OpenAI.
+
+    With a session the persistent attribute cache is consulted first and a
+    successful extraction is stored, so each distinct text is only sent to
+    the LLM once.
+    """
+    attributes = await extract_attributes_many([product_text], db=db, product_ids=[product_id])
+    return attributes[0]
+
+async def extract_attributes_many(
+    texts: List[str],
+    db: Optional[AsyncSession] = None,
+    product_ids: Optional[List[Optional[int]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Extract attributes for several texts, in order.
+
+    Cached texts are served from one batched lookup; only the misses go to
+    the LLM, concurrently (bounded by `MATCH_LLM_CONCURRENCY`). The session
+    is never shared with the concurrent calls; new results are written
+    afterwards in a single commit.
+    """
+    product_ids = product_ids or [None] * len(texts)
+    cached = await get_cached_attributes_many(db, texts) if db is not None else {}
+    hashes = [content_hash(text) for text in texts]
+
+    # Texts that appear several times in one call are extracted once
+    pending: Dict[str, int] = {}
+    for i, h in enumerate(hashes):
+        if h not in cached and h not in pending:
+            pending[h] = i
+
+    semaphore = asyncio.Semaphore(max(1, settings.MATCH_LLM_CONCURRENCY))
+
+    async def _extract(text: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return await _request_attributes(text)
+            except Exception as e:
+                print(f"Error extracting attributes: {e}")
+                return None
+
+    extracted = await asyncio.gather(*(_extract(texts[i]) for i in pending.values()))
+
+    fresh: Dict[str, Dict[str, Any]] = {}
+    for (h, i), attributes in zip(pending.items(), extracted):
+        if attributes is None:
+            continue
+        fresh[h] = attributes
+        if db is not None:
+            await store_attributes(db, texts[i], attributes, product_id=product_ids[i], commit=False)
+    if db is not None and fresh:
+        await db.commit()
+
+    return [cached.get(h) or fresh.get(h) or _empty_attributes() for h in hashes]
+
+async def precompute_product_attributes(product_id: int, product_text: str) -> None:
+    """
+    Background task run after a product is saved: extract and cache its
+    attributes so later matching requests hit the cache. Uses its own
+    session because the request's session is closed by then.
+    """
     try:
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=200,
-            temperature=0.1
-        )
-        content = response.choices[0].message.content.strip()
-        # Remove markdown if present
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.endswith("```"):
-            content = content[:-3]
-        attributes = json.loads(content)
-        return attributes
+        async with async_session_maker() as db:
+            await extract_product_attributes(product_text, db=db, product_id=product_id)
     except Exception as e:
-        print(f"Error extracting attributes: {e}")
-        return {
-            "brand": None,
-            "item_type": None,
-            "size": None,
-            "quantity": None,
-            "packaging": None,
-            "target_users": None,
-            "purpose": None
-        }
+        print(f"Attribute precompute failed for product {product_id}: {e}")
 
 def compare_attributes(attr1: Dict[str, Any], attr2: Dict[str, Any]) -> Dict[str, Any]:
     """
     Compare two attribute dictionaries and return confidence label and similarity score.
     """
-    keys = ["brand", "item_type", "size", "quantity", "packaging", "target_users", "purpose"]
+    keys = ATTRIBUTE_KEYS
     match_attributes = []
     difference_attributes = []
     matches = 0
@@ -86,45 +164,85 @@ def compare_attributes(attr1: Dict[str, Any], attr2: Dict[str, Any]) -> Dict[str
         "similarity_score": similarity_score
     }
 
-async def match_products(new_product_text: str, existing_product_text: str) -> Dict[str, Any]:
+async def match_products(new_product_text: str, existing_product_text: str, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
     """
     Match two products based on their text descriptions.
     """
-    attr1 = await extract_product_attributes(new_product_text)
-    attr2 = await extract_product_attributes(existing_product_text)
+    attr1, attr2 = await extract_attributes_many([new_product_text, existing_product_text], db=db)
     result = compare_attributes(attr1, attr2)
     return {"confidence_label": result["confidence_label"]}
 
-async def find_top_matches(new_product_text: str, existing_products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def retrieve_match_candidates(db: AsyncSession, new_product_text: str, k: int = None) -> List[Dict[str, Any]]:
     """
-    Find top 3 matches for a new product against existing catalog products.
+    Stage one of matching: the `k` catalog products closest to the new product
+    by embedding similarity, served by the configured vector index.
     """
-    attr_new = await extract_product_attributes(new_product_text)
-    matches = []
+    k = k or settings.MATCH_CANDIDATE_K
+    embedding = await get_embedding(new_product_text)
+    similar = await crud_product.find_similar_products(db, embedding, k=k)
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "description": row.description or "",
+            "embedding_similarity": similarity,
+        }
+        for row, similarity in similar
+    ]
 
-    for product in existing_products:
-        existing_text = f"{product['name']} {product.get('description', '')}"
-        attr_existing = await extract_product_attributes(existing_text)
-        comparison = compare_attributes(attr_new, attr_existing)
-        similarity_score = comparison['similarity_score']
+async def find_top_matches(
+    new_product_text: str,
+    existing_products: List[Dict[str, Any]],
+    top_n: int = 3,
+    db: Optional[AsyncSession] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Find top 3 matches for a new product against the given candidate products.
+
+    Attribute extraction for the new product and every candidate runs
+    concurrently (bounded by `MATCH_LLM_CONCURRENCY`), so callers should pass
+    a short candidate list (see `retrieve_match_candidates`), not the catalog.
+    Pass `db` to serve previously extracted attributes from the cache.
+    """
+    texts = [new_product_text] + [
+        build_product_text(product['name'], product.get('description')) for product in existing_products
+    ]
+    product_ids = [None] + [product.get('id') for product in existing_products]
+    attr_new, *attr_existing = await extract_attributes_many(texts, db=db, product_ids=product_ids)
 
-        matches.append({
+    matches = []
+    for product, attrs in zip(existing_products, attr_existing):
+        comparison = compare_attributes(attr_new, attrs)
+        match = {
             "existing_product_id": product['id'],
             "name": product['name'],
-            "similarity_score": similarity_score
-        })
+            "similarity_score": comparison['similarity_score'],
+        }
+        if product.get("embedding_similarity") is not None:
+            match["embedding_similarity"] = round(float(product["embedding_similarity"]), 4)
+        matches.append(match)
+
+    # Sort by attribute similarity, then embedding similarity, and take the top N
+    matches.sort(key=lambda x: (x['similarity_score'], x.get('embedding_similarity', 0.0)), reverse=True)
+    return matches[:top_n]
 
-    # Sort by similarity score descending and take top 3
-    matches.sort(key=lambda x: x['similarity_score'], reverse=True)
-    return matches[:3]
+async def find_top_matches_in_catalog(db: AsyncSession, new_product_text: str, top_n: int = 3) -> List[Dict[str, Any]]:
+    """
+    Two-stage matching against the whole catalog: retrieve the top-K
+    candidates by embedding similarity, then compare LLM-extracted
+    attributes only for those K. Cost no longer grows with catalog size.
+    """
+    candidates = await retrieve_match_candidates(db, new_product_text)
+    if not candidates:
+        return []
+    return await find_top_matches(new_product_text, candidates, top_n=top_n, db=db)
 
-async def recommend_merge(new_product_text: str, matched_product_text: str) -> Dict[str, Any]:
+async def recommend_merge(new_product_text: str, matched_product_text: str, db: Optional[AsyncSession] = None) -> Dict[str, Any]:
     """
     AI Product Merge Advisor for ICCS.
     Recommend if the new product should merge into the matched catalog item.
     """
-    attr_new = await extract_product_attributes(new_product_text)
-    attr_matched = await extract_product_attributes(matched_product_text)
+    attr_new, attr_matched = await extract_attributes_many([new_product_text, matched_product_text], db=db)
     comparison = compare_attributes(attr_new, attr_matched)
     similarity_score = comparison['similarity_score']
 
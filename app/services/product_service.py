@@ -1,36 +1,71 @@
+import csv
+import io
+import json
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
+from app.crud import crud_product
+from app.crud.pagination import DEFAULT_PAGE_SIZE
+from app.db.session import async_session_maker
+from app.services import catalog_cache
 from app.models.product import Product
 from app.models.user import User, UserRole
-from app.schemas.product import ProductOut
 
 
-async def get_products_for_user(db: AsyncSession, user_id: int) -> List[ProductOut]:
+async def user_can_see_private_products(db: AsyncSession, user_id: int) -> bool:
+    """Only admins see private products."""
+    role = (await db.execute(select(User.role).where(User.id == user_id))).scalar_one_or_none()
+    return role == UserRole.admin
+
+
+async def get_products_for_user(
+    db: AsyncSession,
+    user_id: int,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    include_private: Optional[bool] = None,
+) -> Tuple[List[dict], Optional[str]]:
     """
-    Get products visible to a specific user based on their role.
+    Get one page of products visible to a specific user based on their role,
+    newest first, plus the cursor for the next page (None on the last page).
     - Admin: sees all products
     - Others: see only public products
+
+    Rows are plain dicts shaped like `ProductListItem`. Pass `include_private`
+    when the caller has already resolved the user's role.
     """
-    # Get user role
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    user = user_result.scalars().first()
+    if include_private is None:
+        include_private = await user_can_see_private_products(db, user_id)
+    if include_private:
+        rows, next_cursor = await crud_product.get_product_list_rows(
+            db, include_private=True, cursor=cursor, limit=limit
+        )
+        return [dict(row._mapping) for row in rows], next_cursor
+    return await get_public_product_list(db, cursor, limit)
 
-    if not user:
-        # If user not found, return only public products (safe default)
-        query = select(Product).where(Product.is_public == True)
-    elif user.role == UserRole.admin:
-        # Admin sees all products
-        query = select(Product)
-    else:
-        # Non-admin users see only public products
-        query = select(Product).where(Product.is_public == True)
 
-    result = await db.execute(query)
-    products = result.scalars().all()
+async def get_public_product_list(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One storefront page of public products, served from the versioned
+    catalog cache when possible. Any product mutation bumps the catalog
+    version, so cached pages never outlive a change.
+    """
+    key = catalog_cache.page_key("public", cursor, limit, catalog_cache.catalog_version())
+    cached = catalog_cache.get_page(key)
+    if cached is not None:
+        return cached
 
-    # Convert to Pydantic models
-    return [ProductOut.model_validate(product) for product in products]
+    rows, next_cursor = await crud_product.get_product_list_rows(
+        db, include_private=False, cursor=cursor, limit=limit
+    )
+    items = [dict(row._mapping) for row in rows]
+    catalog_cache.store_page(key, items, next_cursor)
+    return items, next_cursor
 
 
 async def get_filtered_products_for_matching(db: AsyncSession, user_id: int) -> List[dict]:
@@ -38,25 +73,78 @@ async def get_filtered_products_for_matching(db: AsyncSession, user_id: int) ->
     Get products for matching/suggestions, filtered by user visibility.
     Used for find-matches endpoint to ensure private products don't appear in suggestions for non-admins.
     """
-    # Get user role
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    user = user_result.scalars().first()
-
-    if not user:
-        # If user not found, return only public products
-        query = select(Product).where(Product.is_public == True)
-    elif user.role == UserRole.admin:
-        # Admin sees all products
-        query = select(Product)
-    else:
-        # Non-admin users see only public products
-        query = select(Product).where(Product.is_public == True)
+    query = select(Product.id, Product.name, Product.description)
+    if not await user_can_see_private_products(db, user_id):
+        # Non-admin (or unknown) users see only public products
+        query = query.where(Product.is_public == True)
 
     result = await db.execute(query)
-    products = result.scalars().all()
+    products = result.all()
 
     # Return in format expected by matching functions
     return [
         {"id": p.id, "name": p.name, "description": p.description or ""}
         for p in products
     ]
+
+
+# Columns written by the catalog export (never the embedding)
+EXPORT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.description,
+    Product.selling_price,
+    Product.category_id,
+    Product.subcategory_id,
+    Product.brand_id,
+    Product.vendor_id,
+    Product.visibility,
+    Product.is_public,
+    Product.created_at,
+    Product.updated_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Rows fetched from the server-side cursor, and serialised, per chunk
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def stream_product_export(include_private: bool, fmt: str = "ndjson") -> AsyncIterator[str]:
+    """
+    Yield the visible catalog as NDJSON lines or CSV text, one chunk per
+    `EXPORT_BATCH_SIZE` rows.
+
+    Rows come from a server-side cursor (`AsyncSession.stream` with
+    `yield_per`) and only the export columns are selected, so memory stays
+    flat whatever the catalog size. The generator opens its own session:
+    it runs while the response is being sent, after request-scoped
+    dependencies may have been cleaned up.
+    """
+    query = select(*EXPORT_COLUMNS).order_by(Product.id)
+    if not include_private:
+        query = query.where(Product.is_public == True)
+    query = query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(EXPORT_FIELDS)
+        yield buffer.getvalue()
+
+    async with async_session_maker() as db:
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            for row in partition:
+                values = [_export_value(v) for v in row]
+                if writer is not None:
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(EXPORT_FIELDS, values)), separators=(",", ":")))
+                    buffer.write("\n")
+            yield buffer.getvalue()
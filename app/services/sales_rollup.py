@@ -0,0 +1,127 @@
+"""Maintenance of `order_daily_rollups`.
+
+The rollup table holds one row per (vendor, status, 15-minute UTC bucket),
+kept current by triggers on ``orders`` (PostgreSQL and SQLite). A week is
+at most 672 bucket rows regardless of how many orders it contains; the
+analytics engine (`app.services.analytics`) reads them. All UTC offsets are
+whole quarter hours, so the buckets sum exactly into local days in any
+timezone.
+
+On SQLite `bucket_start` is written in the text format SQLAlchemy binds
+datetimes with (``YYYY-MM-DD HH:MM:SS.000000``), so range filters on it
+compare like for like.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order_rollup import OrderDailyRollup
+
+BUCKET_SECONDS = 900
+
+ROLLUP_DIALECTS = ("postgresql", "sqlite")
+
+_SQLITE_BUCKET = (
+    "strftime('%Y-%m-%d %H:%M:%S.000000', "
+    "CAST(strftime('%s', {row}created_at) AS INTEGER) / 900 * 900, 'unixepoch')"
+)
+
+# Adds (sign 1) or removes (sign -1) the order `row` (NEW or OLD) from its bucket
+_SQLITE_APPLY = """
+    INSERT INTO order_daily_rollups (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+    SELECT COALESCE({row}.vendor_id, 0), {row}.status, {bucket},
+           {sign}, {sign} * COALESCE({row}.total_amount, 0), {sign} * COALESCE({row}.vendor_earning, {row}.total_amount, 0)
+    WHERE {row}.status IS NOT NULL AND {row}.created_at IS NOT NULL
+    ON CONFLICT (vendor_id, status, bucket_start) DO UPDATE SET
+        orders_count = orders_count + excluded.orders_count,
+        total_sales = total_sales + excluded.total_sales,
+        total_earnings = total_earnings + excluded.total_earnings;"""
+
+
+def _sqlite_apply(row: str, sign: int) -> str:
+    return _SQLITE_APPLY.format(row=row, sign=sign, bucket=_SQLITE_BUCKET.format(row=f"{row}."))
+
+
+SQLITE_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS orders_rollup_insert AFTER INSERT ON orders BEGIN{_sqlite_apply('NEW', 1)}\nEND",
+    f"CREATE TRIGGER IF NOT EXISTS orders_rollup_delete AFTER DELETE ON orders BEGIN{_sqlite_apply('OLD', -1)}\nEND",
+    "CREATE TRIGGER IF NOT EXISTS orders_rollup_update "
+    "AFTER UPDATE OF vendor_id, status, created_at, total_amount, vendor_earning ON orders "
+    f"BEGIN{_sqlite_apply('OLD', -1)}{_sqlite_apply('NEW', 1)}\nEND",
+)
+
+_REBUILD_SQL = """
+INSERT INTO order_daily_rollups (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+SELECT COALESCE(vendor_id, 0), status,
+       to_timestamp(floor(extract(epoch FROM created_at) / 900) * 900),
+       COUNT(*), SUM(COALESCE(total_amount, 0)), SUM(COALESCE(vendor_earning, total_amount, 0))
+FROM orders
+WHERE status IS NOT NULL AND created_at IS NOT NULL {since_clause}
+GROUP BY 1, 2, 3
+"""
+
+_SQLITE_REBUILD_SQL = f"""
+INSERT INTO order_daily_rollups (vendor_id, status, bucket_start, orders_count, total_sales, total_earnings)
+SELECT COALESCE(vendor_id, 0), status, {_SQLITE_BUCKET.format(row="")},
+       COUNT(*), SUM(COALESCE(total_amount, 0)), SUM(COALESCE(vendor_earning, total_amount, 0))
+FROM orders
+WHERE status IS NOT NULL AND created_at IS NOT NULL {{since_clause}}
+GROUP BY 1, 2, 3
+"""
+
+
+def rollups_enabled(db: AsyncSession) -> bool:
+    """Rollups are trigger-maintained on PostgreSQL and SQLite."""
+    return db.bind.dialect.name in ROLLUP_DIALECTS
+
+
+def install_sqlite_triggers(connection: Connection) -> None:
+    """Create the SQLite rollup triggers if missing, filling the rollups from
+    the existing orders when they are first installed. Synchronous; runs in
+    the caller's transaction."""
+    tables = {row[0] for row in connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('orders', 'order_daily_rollups')"
+    )}
+    if tables != {"orders", "order_daily_rollups"}:
+        return
+    installed = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'orders_rollup_insert'"
+    ).first()
+    if installed:
+        return
+    connection.exec_driver_sql("DELETE FROM order_daily_rollups")
+    connection.exec_driver_sql(_SQLITE_REBUILD_SQL.format(since_clause=""))
+    for ddl in SQLITE_TRIGGERS:
+        connection.exec_driver_sql(ddl)
+
+
+async def rebuild_rollups(db: AsyncSession, since: Optional[datetime] = None) -> int:
+    """Recompute rollups from ``orders`` (all of them, or from `since` on).
+
+    Runs in the caller's transaction. On PostgreSQL it holds a SHARE lock
+    on ``orders`` so concurrent writes (and their trigger updates) wait
+    until commit; on SQLite the first write takes the database lock.
+    Returns the number of rollup rows written.
+    """
+    sqlite = db.bind.dialect.name == "sqlite"
+    if not sqlite:
+        await db.execute(text("LOCK TABLE orders IN SHARE MODE"))
+    rebuild_sql = _SQLITE_REBUILD_SQL if sqlite else _REBUILD_SQL
+    if since is None:
+        await db.execute(delete(OrderDailyRollup))
+        result = await db.execute(text(rebuild_sql.format(since_clause="")))
+    else:
+        # Align to a bucket so the first bucket is rebuilt whole
+        since = datetime.fromtimestamp(since.timestamp() // BUCKET_SECONDS * BUCKET_SECONDS, tz=timezone.utc)
+        await db.execute(delete(OrderDailyRollup).where(OrderDailyRollup.bucket_start >= since))
+        if sqlite:
+            # Stored timestamps mix text formats; compare epochs
+            since_clause, params = "AND CAST(strftime('%s', created_at) AS INTEGER) >= :since", {"since": int(since.timestamp())}
+        else:
+            since_clause, params = "AND created_at >= :since", {"since": since}
+        result = await db.execute(text(rebuild_sql.format(since_clause=since_clause)), params)
+    return result.rowcount
+
@@ -0,0 +1,72 @@
+"""Pluggable nearest-neighbour backends for product embedding search.
+
+Backends:
+- ``exact``: brute-force NumPy matrix-vector product (exact results)
+- ``ivf``: inverted-file index with a scikit-learn k-means coarse quantiser
+- ``pgvector``: HNSW search pushed into PostgreSQL
+
+`get_vector_index()` returns the process-wide backend selected by
+``settings.VECTOR_INDEX_BACKEND``. ``auto`` picks ``pgvector`` when the
+database is PostgreSQL and ``exact`` otherwise.
+"""
+
+from typing import Dict
+
+from app.core.config import settings
+from app.services.vector_index.base import VectorIndex, as_unit_vector
+from app.services.vector_index.evaluation import evaluate_index, exact_ground_truth
+from app.services.vector_index.exact import ExactNumpyIndex, InMemoryVectorIndex
+from app.services.vector_index.ivf import IVFIndex
+from app.services.vector_index.pgvector import PgVectorIndex
+
+BACKENDS = ("exact", "ivf", "pgvector")
+
+_instances: Dict[str, VectorIndex] = {}
+
+
+def resolve_backend_name(name: str = None) -> str:
+    name = (name or settings.VECTOR_INDEX_BACKEND or "auto").lower()
+    if name == "auto":
+        is_postgres = settings.DATABASE_URL.startswith("postgresql")
+        return "pgvector" if is_postgres else "exact"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown VECTOR_INDEX_BACKEND '{name}'; expected one of {BACKENDS + ('auto',)}")
+    return name
+
+
+def create_vector_index(name: str) -> VectorIndex:
+    """Build a fresh backend instance configured from settings."""
+    if name == "exact":
+        return ExactNumpyIndex()
+    if name == "ivf":
+        return IVFIndex(
+            nlist=settings.VECTOR_INDEX_IVF_NLIST,
+            nprobe=settings.VECTOR_INDEX_IVF_NPROBE,
+            min_train_size=settings.VECTOR_INDEX_IVF_MIN_TRAIN_SIZE,
+        )
+    if name == "pgvector":
+        return PgVectorIndex(ef_search=settings.VECTOR_INDEX_HNSW_EF_SEARCH)
+    raise ValueError(f"Unknown vector index backend '{name}'")
+
+
+def get_vector_index(name: str = None) -> VectorIndex:
+    """Return the shared per-process backend (configured one by default)."""
+    resolved = resolve_backend_name(name)
+    if resolved not in _instances:
+        _instances[resolved] = create_vector_index(resolved)
+    return _instances[resolved]
+
+
+__all__ = [
+    "VectorIndex",
+    "InMemoryVectorIndex",
+    "ExactNumpyIndex",
+    "IVFIndex",
+    "PgVectorIndex",
+    "as_unit_vector",
+    "evaluate_index",
+    "exact_ground_truth",
+    "get_vector_index",
+    "create_vector_index",
+    "resolve_backend_name",
+]
@@ -0,0 +1,66 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def as_unit_vector(value: Any) -> Optional[np.ndarray]:
+    """Coerce a stored/generated embedding into an L2-normalised float32 vector.
+
+    Accepts lists, numpy arrays and JSON/pgvector text such as
+    ``"[0.1, 0.2, ...]"`` (how legacy and SQLite rows are stored).
+    Returns None for empty, malformed or zero vectors so callers can skip them.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        try:
+            value = json.loads(value)
+        except Exception:
+            return None
+    try:
+        vec = np.asarray(value, dtype=np.float32).ravel()
+    except Exception:
+        return None
+    if vec.size == 0:
+        return None
+    norm = float(np.linalg.norm(vec))
+    if not np.isfinite(norm) or norm == 0.0:
+        return None
+    return vec / norm
+
+
+class VectorIndex(ABC):
+    """Common interface for product embedding similarity backends.
+
+    Backends return `(product_id, cosine_similarity)` pairs, best first.
+    The CRUD layer calls `on_product_saved` / `on_product_deleted` after each
+    commit so in-memory backends stay in sync with the `products` table.
+    """
+
+    name = "base"
+
+    async def ensure_ready(self, db: AsyncSession) -> None:
+        """Load or train the backend before the first search (no-op by default)."""
+
+    @abstractmethod
+    async def search(
+        self,
+        db: Optional[AsyncSession],
+        embedding: Any,
+        k: int = 1,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        """Return up to `k` nearest products scoring at least `threshold`."""
+
+    def on_product_saved(self, product_id: int, embedding: Any) -> None:
+        """Called after a product's embedding was inserted or changed."""
+
+    def on_product_deleted(self, product_id: int) -> None:
+        """Called after a product was deleted."""
+
+    def on_embedding_version(self, version: Optional[int]) -> None:
+        """Called with the change log version of this process's own embedding
+        write (`app.services.vector_index.changes`); None without Redis."""
@@ -0,0 +1,44 @@
+"""Shared log of product embedding changes.
+
+In-memory backends keep a copy of every embedding per worker. Each write
+that adds, changes or removes an embedding is logged in Redis under the
+next value of one counter, so a worker that did not make the write can
+apply just the changed products instead of reloading the table. Only the
+last `MAX_CHANGES` entries are kept; a worker that fell further behind
+reloads. Writes that leave embeddings alone (visibility, prices, ...) are
+not logged, so they cost the indexes nothing.
+
+Without Redis every function returns None and each worker only sees its
+own writes.
+"""
+from typing import List, Optional, Tuple
+
+from app.core import redis as redis_cache
+
+VERSION_KEY = "vector:embeddings:version"
+LOG_KEY = "vector:embeddings:changes"
+MAX_CHANGES = 10000
+
+
+def record_embedding_change(product_id: int) -> Optional[int]:
+    """Log that `product_id`'s embedding changed. Call after the write commits.
+
+    Returns the version the change was logged under.
+    """
+    return redis_cache.append_versioned_log(VERSION_KEY, LOG_KEY, str(product_id), MAX_CHANGES)
+
+
+def embedding_version() -> Optional[int]:
+    return redis_cache.get_counter(VERSION_KEY)
+
+
+def changes_since(version: int) -> Optional[List[Tuple[int, int]]]:
+    """`(version, product_id)` pairs logged after `version`, oldest first."""
+    entries = redis_cache.zrange_since(LOG_KEY, version + 1)
+    if entries is None:
+        return None
+    changes = []
+    for entry in entries:
+        logged_version, _, product_id = entry.partition(":")
+        changes.append((int(logged_version), int(product_id)))
+    return sorted(changes)
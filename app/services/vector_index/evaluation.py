@@ -0,0 +1,51 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.vector_index.base import VectorIndex
+from app.services.vector_index.exact import ExactNumpyIndex
+
+
+def exact_ground_truth(reference: ExactNumpyIndex, queries: Sequence[Any], k: int) -> List[List[int]]:
+    """Exact top-k product ids for each query, used as the recall baseline."""
+    return [[pid for pid, _ in reference.search_vectors(q, k=k)] for q in queries]
+
+
+async def evaluate_index(
+    index: VectorIndex,
+    queries: Sequence[Any],
+    ground_truth: List[List[int]],
+    k: int = 10,
+    db: Optional[AsyncSession] = None,
+) -> Dict[str, float]:
+    """Measure recall@k and per-query latency of `index` against `ground_truth`.
+
+    Returns a dict with `recall_at_k`, `p50_ms`, `p95_ms`, `p99_ms`, `mean_ms`
+    and `qps` so backends can be compared on the same query set.
+    """
+    latencies = []
+    hits = 0
+    expected = 0
+    for query, truth in zip(queries, ground_truth):
+        start = time.perf_counter()
+        results = await index.search(db, query, k=k)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+        truth_set = set(truth[:k])
+        hits += len(truth_set.intersection(pid for pid, _ in results))
+        expected += len(truth_set)
+
+    lat = np.asarray(latencies) if latencies else np.zeros(1)
+    total_s = float(lat.sum()) / 1000.0
+    return {
+        "backend": index.name,
+        "queries": len(latencies),
+        "recall_at_k": round(hits / expected, 4) if expected else 1.0,
+        "p50_ms": round(float(np.percentile(lat, 50)), 3),
+        "p95_ms": round(float(np.percentile(lat, 95)), 3),
+        "p99_ms": round(float(np.percentile(lat, 99)), 3),
+        "mean_ms": round(float(lat.mean()), 3),
+        "qps": round(len(latencies) / total_s, 1) if total_s > 0 else 0.0,
+    }
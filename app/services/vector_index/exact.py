@@ -0,0 +1,275 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.product import Product
+from app.services.vector_index.base import VectorIndex, as_unit_vector
+from app.services.vector_index.changes import changes_since, embedding_version
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryVectorIndex(VectorIndex):
+    """Process-local vector storage shared by the NumPy-based backends.
+
+    All vectors live in one contiguous, L2-normalised float32 matrix. The
+    index is loaded lazily from the database on first use and then kept in
+    sync incrementally via `upsert` / `remove`.
+
+    Writes handled by other workers are followed through the embedding
+    change log (`app.services.vector_index.changes`): `ensure_ready` applies
+    the products changed since the version this copy reflects, and reloads
+    everything only if the log no longer reaches back that far. The log
+    lives in Redis; without Redis each worker only sees its own writes, so
+    run a single worker or use the ``pgvector`` backend.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._initial_capacity = max(1, initial_capacity)
+        self._matrix: Optional[np.ndarray] = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows: Dict[int, int] = {}
+        self._size = 0
+        self._dim: Optional[int] = None
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        # Embedding change log version the contents reflect; None until
+        # loaded from the database, or without Redis
+        self._synced_version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    async def ensure_ready(self, db: AsyncSession) -> None:
+        """Load the stored product embeddings, then follow other workers' changes to them."""
+        if self._loaded and self._is_current(embedding_version()):
+            return
+        async with self._load_lock:
+            # Read before loading: a write landing mid-load is applied on the next call
+            version = embedding_version()
+            if self._loaded and self._is_current(version):
+                return
+            if not self._loaded or self._synced_version is None or not await self._apply_changes(db):
+                await self.load(db)
+                self._synced_version = version
+
+    def _is_current(self, version: Optional[int]) -> bool:
+        # Without Redis (None) there is nothing to follow
+        return version is None or version == self._synced_version
+
+    async def _apply_changes(self, db: AsyncSession) -> bool:
+        """Re-read the products changed since `_synced_version`. False if the
+        log no longer covers them all and a full load is needed instead."""
+        changes = changes_since(self._synced_version)
+        if not changes or changes[0][0] != self._synced_version + 1:
+            return False
+        product_ids = {product_id for _, product_id in changes}
+        result = await db.execute(
+            select(Product.id, Product.product_embedding).where(Product.id.in_(product_ids))
+        )
+        embeddings = {row[0]: row[1] for row in result.all()}
+        for product_id in product_ids:
+            # Deleted products and cleared embeddings both come back as missing
+            if embeddings.get(product_id) is None:
+                self.remove(product_id)
+            else:
+                self.upsert(product_id, embeddings[product_id])
+        self._synced_version = changes[-1][0]
+        logger.debug("Applied %d embedding changes to the %s index", len(product_ids), self.name)
+        return True
+
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)build the index from all products that have an embedding."""
+        query = (
+            select(Product.id, Product.product_embedding)
+            .where(Product.product_embedding.isnot(None))
+            .execution_options(yield_per=2000)
+        )
+        result = await db.stream(query)
+        pairs = []
+        async for partition in result.partitions():
+            pairs.extend((row[0], row[1]) for row in partition)
+        self.rebuild(pairs)
+        logger.info("Loaded %d product embeddings into the %s index", self._size, self.name)
+
+    def rebuild(self, items: Iterable[Tuple[int, Any]]) -> None:
+        """Replace the index contents with `(product_id, embedding)` pairs."""
+        self.clear()
+        vectors: Dict[int, np.ndarray] = {}
+        for product_id, embedding in items:
+            vec = as_unit_vector(embedding)
+            if vec is None:
+                vectors.pop(product_id, None)
+                continue
+            if self._dim is None:
+                self._dim = int(vec.size)
+            elif vec.size != self._dim:
+                logger.warning(
+                    "Skipping embedding for product %s: dimension %d != index dimension %d",
+                    product_id, vec.size, self._dim,
+                )
+                continue
+            vectors[product_id] = vec
+
+        if vectors:
+            self._reserve(len(vectors))
+            self._matrix[: len(vectors)] = np.stack(list(vectors.values()))
+            self._ids[: len(vectors)] = np.fromiter(vectors.keys(), dtype=np.int64, count=len(vectors))
+            self._rows = {pid: row for row, pid in enumerate(vectors.keys())}
+            self._size = len(vectors)
+        self._loaded = True
+
+    def clear(self) -> None:
+        self._synced_version = None
+        self._matrix = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows = {}
+        self._size = 0
+        self._dim = None
+        self._loaded = False
+
+    def on_product_saved(self, product_id: int, embedding: Any) -> None:
+        # Before the first load the table is the source of truth; the lazy
+        # load will pick the product up.
+        if self._loaded:
+            self.upsert(product_id, embedding)
+
+    def on_product_deleted(self, product_id: int) -> None:
+        self.remove(product_id)
+
+    def on_embedding_version(self, version: Optional[int]) -> None:
+        # Our own write, already applied; another worker's write that slipped
+        # in between leaves a gap that the next `ensure_ready` fills
+        if version is not None and self._synced_version is not None and version == self._synced_version + 1:
+            self._synced_version = version
+
+    def upsert(self, product_id: int, embedding: Any) -> bool:
+        """Insert or replace a product's vector. Returns False if it was skipped."""
+        vec = as_unit_vector(embedding)
+        if vec is None:
+            self.remove(product_id)
+            return False
+
+        if self._dim is None:
+            self._dim = int(vec.size)
+        elif vec.size != self._dim:
+            logger.warning(
+                "Skipping embedding for product %s: dimension %d != index dimension %d",
+                product_id, vec.size, self._dim,
+            )
+            self.remove(product_id)
+            return False
+
+        row = self._rows.get(product_id)
+        if row is None:
+            self._reserve(self._size + 1)
+            row = self._size
+            self._ids[row] = product_id
+            self._rows[product_id] = row
+            self._size += 1
+        self._matrix[row] = vec
+        self._row_written(row, vec)
+        return True
+
+    def remove(self, product_id: int) -> bool:
+        """Drop a product's vector by moving the last row into its slot."""
+        row = self._rows.pop(product_id, None)
+        if row is None:
+            return False
+        last = self._size - 1
+        if row != last:
+            moved_id = int(self._ids[last])
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+            self._row_moved(last, row)
+        self._size = last
+        return True
+
+    async def search(
+        self,
+        db: Optional[AsyncSession],
+        embedding: Any,
+        k: int = 1,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        return self.search_vectors(embedding, k=k, threshold=threshold)
+
+    def search_vectors(
+        self,
+        embedding: Any,
+        k: int = 1,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        """Synchronous search over the in-memory matrix."""
+        if self._size == 0 or k <= 0:
+            return []
+        query = as_unit_vector(embedding)
+        if query is None or query.size != self._dim:
+            return []
+        rows, scores = self._score(query)
+        return self._top_k(rows, scores, k, threshold)
+
+    def _score(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return candidate rows and their scores for `query`."""
+        return np.arange(self._size), self._matrix[: self._size] @ query
+
+    def _top_k(
+        self,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+        threshold: Optional[float],
+    ) -> List[Tuple[int, float]]:
+        if threshold is not None:
+            keep = scores >= threshold
+            rows, scores = rows[keep], scores[keep]
+        if rows.size == 0:
+            return []
+        if rows.size > k:
+            top = np.argpartition(scores, -k)[-k:]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(self._ids[rows[i]]), float(scores[i])) for i in order]
+
+    def _reserve(self, needed: int) -> None:
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(self._initial_capacity, capacity * 2, needed)
+        matrix = np.zeros((new_capacity, self._dim), dtype=np.float32)
+        ids = np.zeros(new_capacity, dtype=np.int64)
+        if self._size:
+            matrix[: self._size] = self._matrix[: self._size]
+            ids[: self._size] = self._ids[: self._size]
+        self._matrix = matrix
+        self._ids = ids
+        self._resized(new_capacity)
+
+    # Hooks for backends that keep per-row side data aligned with the matrix.
+    def _row_written(self, row: int, vec: np.ndarray) -> None:
+        pass
+
+    def _row_moved(self, src: int, dst: int) -> None:
+        pass
+
+    def _resized(self, capacity: int) -> None:
+        pass
+
+
+class ExactNumpyIndex(InMemoryVectorIndex):
+    """Exact brute-force cosine search: one matrix-vector product per query."""
+
+    name = "exact"
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+from typing import Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.vector_index.exact import InMemoryVectorIndex
+
+logger = logging.getLogger(__name__)
+
+# Vectors used per centroid when fitting the coarse quantiser
+_TRAIN_SAMPLES_PER_LIST = 64
+# Rows assigned per matrix multiplication when (re)assigning the whole index
+_ASSIGN_CHUNK = 16384
+
+
+class IVFIndex(InMemoryVectorIndex):
+    """Inverted-file approximate index with a k-means coarse quantiser.
+
+    Vectors are clustered into `nlist` cells with scikit-learn's
+    MiniBatchKMeans; a query only scores the vectors in its `nprobe` closest
+    cells. Until `min_train_size` vectors exist the index scans exactly.
+    The quantiser is retrained whenever the index has doubled since the last
+    training run, as a background task fitting in a worker thread; searches
+    keep using the current centroids (or the exact scan) until it finishes.
+    """
+
+    name = "ivf"
+
+    def __init__(
+        self,
+        nlist: int = 0,
+        nprobe: int = 8,
+        min_train_size: int = 2048,
+        initial_capacity: int = 1024,
+    ):
+        super().__init__(initial_capacity)
+        self.nlist = nlist
+        self.nprobe = max(1, nprobe)
+        self.min_train_size = max(1, min_train_size)
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.empty(0, dtype=np.int32)
+        self._trained_size = 0
+        self._training = False
+        self._train_lock = asyncio.Lock()
+        self._train_task: Optional[asyncio.Task] = None
+        self._dirty_ids: Set[int] = set()
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def needs_training(self) -> bool:
+        if self._size < self.min_train_size:
+            return False
+        return self._centroids is None or self._size >= 2 * self._trained_size
+
+    async def ensure_ready(self, db: AsyncSession) -> None:
+        await super().ensure_ready(db)
+        if self.needs_training and not self._training:
+            self.schedule_training()
+
+    def schedule_training(self) -> asyncio.Task:
+        """Start `train_async` in the background (once at a time); the caller does not wait."""
+        if self._train_task is None or self._train_task.done():
+            # Flag set before the task runs so concurrent callers don't schedule another
+            self._training = True
+            self._train_task = asyncio.get_running_loop().create_task(self._train_in_background())
+        return self._train_task
+
+    async def _train_in_background(self) -> None:
+        try:
+            await self.train_async()
+        except Exception as e:
+            self._training = False
+            logger.warning("IVF training failed; searching with the previous quantiser: %s", e)
+
+    async def train_async(self) -> None:
+        """Fit the quantiser on a snapshot in a worker thread, then install it."""
+        async with self._train_lock:
+            self._training = True
+            self._dirty_ids = set()
+            try:
+                n = self._size
+                if n == 0:
+                    return
+                snap_ids = self._ids[:n].copy()
+                snap_matrix = self._matrix[:n].copy()
+                centroids, snap_assign = await asyncio.to_thread(self._fit, snap_matrix)
+                self._install(centroids, snap_ids, snap_assign)
+            finally:
+                self._training = False
+
+    def train(self) -> None:
+        """Synchronously fit the quantiser on the current contents."""
+        n = self._size
+        if n == 0:
+            return
+        centroids, assign = self._fit(self._matrix[:n])
+        self._install(centroids, self._ids[:n].copy(), assign)
+
+    def clear(self) -> None:
+        super().clear()
+        self._centroids = None
+        self._assign = np.empty(0, dtype=np.int32)
+        self._trained_size = 0
+        self._dirty_ids = set()
+
+    def _fit(self, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        from sklearn.cluster import MiniBatchKMeans
+
+        n = data.shape[0]
+        nlist = self.nlist or int(round(4 * np.sqrt(n)))
+        nlist = max(1, min(nlist, n))
+
+        rng = np.random.default_rng(0)
+        sample_size = min(n, max(nlist * _TRAIN_SAMPLES_PER_LIST, 10000))
+        sample = data if sample_size == n else data[rng.choice(n, sample_size, replace=False)]
+
+        km = MiniBatchKMeans(
+            n_clusters=nlist,
+            random_state=0,
+            n_init=1,
+            batch_size=max(1024, 4 * nlist),
+        ).fit(sample)
+        centroids = km.cluster_centers_.astype(np.float32)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+        return centroids, self._assign_rows(centroids, data)
+
+    @staticmethod
+    def _assign_rows(centroids: np.ndarray, data: np.ndarray) -> np.ndarray:
+        out = np.empty(data.shape[0], dtype=np.int32)
+        for start in range(0, data.shape[0], _ASSIGN_CHUNK):
+            chunk = data[start:start + _ASSIGN_CHUNK]
+            out[start:start + chunk.shape[0]] = np.argmax(chunk @ centroids.T, axis=1)
+        return out
+
+    def _install(self, centroids: np.ndarray, snap_ids: np.ndarray, snap_assign: np.ndarray) -> None:
+        """Map snapshot assignments onto the current rows (which may have moved)."""
+        n = self._size
+        current = self._ids[:n]
+        assign = np.empty(self._ids.shape[0], dtype=np.int32)
+
+        order = np.argsort(snap_ids)
+        sorted_ids = snap_ids[order]
+        pos = np.clip(np.searchsorted(sorted_ids, current), 0, max(len(sorted_ids) - 1, 0))
+        found = sorted_ids[pos] == current if len(sorted_ids) else np.zeros(n, dtype=bool)
+        assign[:n][found] = snap_assign[order][pos[found]]
+
+        # Rows added or changed while the snapshot was being trained
+        stale = ~found
+        if self._dirty_ids:
+            stale |= np.isin(current, np.fromiter(self._dirty_ids, dtype=np.int64))
+        stale_rows = np.flatnonzero(stale)
+        if stale_rows.size:
+            assign[stale_rows] = self._assign_rows(centroids, self._matrix[stale_rows])
+
+        self._centroids = centroids
+        self._assign = assign
+        self._trained_size = n
+        self._dirty_ids = set()
+        logger.info("Trained IVF index: %d vectors in %d lists", n, centroids.shape[0])
+
+    def _score(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self._centroids is None:
+            return super()._score(query)
+        centroid_scores = self._centroids @ query
+        nprobe = min(self.nprobe, centroid_scores.size)
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        rows = np.flatnonzero(np.isin(self._assign[: self._size], probe))
+        return rows, self._matrix[rows] @ query
+
+    def _row_written(self, row: int, vec: np.ndarray) -> None:
+        if self._training:
+            self._dirty_ids.add(int(self._ids[row]))
+        if self._centroids is not None:
+            self._assign[row] = int(np.argmax(self._centroids @ vec))
+
+    def _row_moved(self, src: int, dst: int) -> None:
+        if self._centroids is not None:
+            self._assign[dst] = self._assign[src]
+
+    def _resized(self, capacity: int) -> None:
+        if self._centroids is None:
+            return
+        assign = np.zeros(capacity, dtype=np.int32)
+        assign[: self._size] = self._assign[: self._size]
+        self._assign = assign
@@ -0,0 +1,53 @@
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.product import Product
+from app.services.vector_index.base import VectorIndex, as_unit_vector
+
+
+class PgVectorIndex(VectorIndex):
+    """Nearest-neighbour search pushed into PostgreSQL.
+
+    Orders by the pgvector `<=>` (cosine distance) operator so the HNSW index
+    on `products.product_embedding` serves the query. The database maintains
+    the index itself, so the CRUD hooks are no-ops.
+    """
+
+    name = "pgvector"
+
+    def __init__(self, ef_search: Optional[int] = None):
+        self.ef_search = ef_search
+
+    async def search(
+        self,
+        db: Optional[AsyncSession],
+        embedding: Any,
+        k: int = 1,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        if db is None:
+            raise ValueError("PgVectorIndex.search requires a database session")
+        query_vec = as_unit_vector(embedding)
+        if query_vec is None or k <= 0:
+            return []
+
+        if self.ef_search:
+            # HNSW returns at most ef_search candidates; widen it for large k.
+            ef = max(int(self.ef_search), int(k))
+            await db.execute(text(f"SET LOCAL hnsw.ef_search = {ef}"))
+
+        distance = Product.product_embedding.cosine_distance(query_vec.tolist())
+        query = (
+            select(Product.id, distance.label("distance"))
+            .where(Product.product_embedding.isnot(None))
+            .order_by(distance)
+            .limit(k)
+        )
+        result = await db.execute(query)
+        matches = [(int(pid), 1.0 - float(dist)) for pid, dist in result.all()]
+        if threshold is not None:
+            matches = [(pid, sim) for pid, sim in matches if sim >= threshold]
+        return matches
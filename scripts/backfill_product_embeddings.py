@@ -1,76 +1,269 @@
+"""Compute and store product embeddings.
+
+Usage:
+    python scripts/backfill_product_embeddings.py
+    python scripts/backfill_product_embeddings.py --reembed-model text-embedding-3-large
+    python scripts/backfill_product_embeddings.py --restart
+
+Products are paged with a keyset cursor on `Product.id`, embedded in
+batched API requests with bounded concurrency and written back with one
+bulk UPDATE per page. The cursor is saved to a JSON checkpoint after every
+committed page, so an interrupted run resumes where it stopped. Products
+whose batch fails are recorded in the checkpoint and skipped, never retried
+in a loop; rerun with `--retry-failed` to try them again. A retry pass
+walks the failed ids only and leaves the saved cursor where it was.
+
+By default only products without an embedding are processed.
+`--reembed-model` re-embeds every product with the given model, e.g. after
+switching EMBEDDING_MODEL.
+"""
+import argparse
 import asyncio
+import json
 import logging
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.future import select
-from app.models.product import Product
-from app.services.embedding_service import EmbeddingService
-from app.db.session import get_db
 import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.db.session import async_session_maker  # noqa: E402
+from app.models.product import PRODUCT_EMBEDDING_DIM, Product  # noqa: E402
+from app.services.embedding_service import EmbeddingService  # noqa: E402
+from app.services.vector_index.changes import record_embedding_change  # noqa: E402
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-CHUNK_SIZE = 100
+PAGE_SIZE = 1000
+DEFAULT_CHECKPOINT = ROOT / ".cache" / "backfill_product_embeddings.json"
+
+
+def load_checkpoint(path: Path, mode: str, model: str) -> Dict[str, Any]:
+    """Return the saved state for this mode/model, or a fresh one."""
+    fresh = {"mode": mode, "model": model, "last_id": 0, "processed": 0, "failed_ids": []}
+    if not path.exists():
+        return fresh
+    try:
+        state = json.loads(path.read_text())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return fresh
+    if state.get("mode") != mode or state.get("model") != model:
+        logger.info(f"Checkpoint {path} is for another run ({state.get('mode')}/{state.get('model')}); starting over")
+        return fresh
+    return state
+
+
+def save_checkpoint(path: Path, state: Dict[str, Any]) -> None:
+    """Write the checkpoint atomically so a crash never leaves it half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    state["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+async def fetch_page(db: AsyncSession, after_id: int, limit: int, reembed: bool, only_ids: Optional[List[int]] = None):
+    """Next page of (id, text) ordered by id, starting after `after_id`."""
+    query = select(Product.id, Product.name, Product.description).where(Product.id > after_id)
+    if only_ids is not None:
+        query = query.where(Product.id.in_(only_ids))
+    elif not reembed:
+        query = query.where(Product.product_embedding.is_(None))
+    result = await db.execute(query.order_by(Product.id).limit(limit))
+    return [(row.id, f"{row.name or ''} {row.description or ''}".strip()) for row in result.all()]
+
+
+async def embed_page(
+    service: EmbeddingService,
+    items: Sequence[Tuple[int, str]],
+    batch_size: int,
+    semaphore: asyncio.Semaphore,
+) -> Tuple[List[Tuple[int, np.ndarray]], List[int]]:
+    """Embed a page in `batch_size` API requests, at most `semaphore` in flight."""
 
-async def backfill_product_embeddings():
+    async def _embed(chunk):
+        async with semaphore:
+            try:
+                vectors = await service.embed_batch([t for _, t in chunk])
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(chunk)} products failed (ids {chunk[0][0]}..{chunk[-1][0]}): {e}")
+                return [], [pid for pid, _ in chunk]
+        ok, bad = [], []
+        for (pid, _), vec in zip(chunk, vectors):
+            if vec is None or len(vec) != PRODUCT_EMBEDDING_DIM:
+                logger.error(f"Product {pid}: expected a {PRODUCT_EMBEDDING_DIM}-dim embedding")
+                bad.append(pid)
+            else:
+                ok.append((pid, vec))
+        return ok, bad
+
+    chunks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    results = await asyncio.gather(*(_embed(chunk) for chunk in chunks))
+    embedded = [pair for ok, _ in results for pair in ok]
+    failed = [pid for _, bad in results for pid in bad]
+    return embedded, failed
+
+
+def _vector_literal(vec: np.ndarray) -> str:
+    return "[" + ",".join(f"{float(x):.7g}" for x in vec) + "]"
+
+
+async def write_embeddings(db: AsyncSession, rows: Sequence[Tuple[int, np.ndarray]]) -> None:
+    """One statement per page: UPDATE ... FROM (VALUES ...) on PostgreSQL,
+    an executemany bulk update elsewhere."""
+    if not rows:
+        return
+    if db.bind.dialect.name == "postgresql":
+        params = {}
+        values = []
+        for i, (pid, vec) in enumerate(rows):
+            params[f"id{i}"] = pid
+            params[f"e{i}"] = _vector_literal(vec)
+            values.append(f"(CAST(:id{i} AS integer), CAST(:e{i} AS vector))")
+        await db.execute(
+            text(
+                "UPDATE products AS p SET product_embedding = v.embedding "
+                f"FROM (VALUES {', '.join(values)}) AS v(id, embedding) "
+                "WHERE p.id = v.id"
+            ),
+            params,
+        )
+    else:
+        await db.execute(
+            update(Product.__table__)
+            .where(Product.__table__.c.id == bindparam("pid"))
+            .values(product_embedding=bindparam("embedding")),
+            [{"pid": pid, "embedding": vec} for pid, vec in rows],
+        )
+
+
+async def backfill_product_embeddings(
+    page_size: int = PAGE_SIZE,
+    batch_size: Optional[int] = None,
+    concurrency: int = 4,
+    checkpoint_path: Path = DEFAULT_CHECKPOINT,
+    reembed_model: Optional[str] = None,
+    restart: bool = False,
+    retry_failed: bool = False,
+) -> Dict[str, Any]:
     """
-    Background job to compute and save embeddings for products that don't have them.
-    Processes products in chunks of 100 and logs progress.
+    Background job to compute and save embeddings for products that don't
+    have them (or for every product when `reembed_model` is given).
+    Returns the final checkpoint state.
     """
-    logger.info("Starting product embedding backfill job")
+    if reembed_model:
+        settings.EMBEDDING_MODEL = reembed_model
+    mode = "reembed" if reembed_model else "missing"
+    batch_size = batch_size or settings.EMBEDDING_BATCH_MAX_SIZE
 
-    # Get database session
-    db = next(get_db())
-
-    try:
-        # Initialize embedding service
-        embedding_service = EmbeddingService()
-        logger.info("Embedding service initialized")
+    service = EmbeddingService()
+    model = service.provider.model
+    state = load_checkpoint(checkpoint_path, mode, model)
+    if restart:
+        state.update(last_id=0, processed=0, failed_ids=[])
+    retry_ids = None
+    cursor = state["last_id"]
+    if retry_failed:
+        # The retry pass keeps its own cursor; failed ids are dropped from
+        # the checkpoint page by page as they are retried.
+        retry_ids = sorted(state.get("failed_ids", []))
+        cursor = 0
+        logger.info(f"Retrying {len(retry_ids)} previously failed products")
 
-        total_processed = 0
-        chunk_count = 0
+    logger.info(
+        f"Starting product embedding backfill ({mode}, model={model}) "
+        f"from id > {cursor}"
+    )
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    started = time.perf_counter()
+    done_this_run = 0
 
+    async with async_session_maker() as db:
         while True:
-            chunk_count += 1
-
-            # Query products without embeddings, limit to chunk size
-            query = select(Product).where(Product.product_embedding.is_(None)).limit(CHUNK_SIZE)
-            result = await db.execute(query)
-            products = result.scalars().all()
-
-            if not products:
-                logger.info(f"No more products to process. Total processed: {total_processed}")
-                break
-
-            logger.info(f"Processing chunk {chunk_count} with {len(products)} products")
-
-            # Process each product in the chunk
-            for product in products:
-                try:
-                    # Generate text for embedding
-                    text = f"{product.name or ''} {product.description or ''}".strip()
-                    if text:
-                        embedding = await embedding_service.get_embedding(text)
-                        product.product_embedding = embedding
-                        total_processed += 1
-                    else:
-                        logger.warning(f"Product {product.id} has no text to embed")
-                except Exception as e:
-                    logger.error(f"Failed to generate embedding for product {product.id}: {e}")
-
-            # Commit the chunk
-            await db.commit()
-            logger.info(f"Chunk {chunk_count} processed. Total processed so far: {total_processed}")
-
-        logger.info(f"Product embedding backfill completed. Total products processed: {total_processed}")
-
-    except Exception as e:
-        logger.error(f"Error during backfill: {e}")
-        await db.rollback()
-    finally:
-        await db.close()
+            if retry_ids is not None:
+                page_ids = [pid for pid in retry_ids if pid > cursor][:page_size]
+                if not page_ids:
+                    break
+                items = await fetch_page(db, cursor, page_size, True, only_ids=page_ids)
+                next_cursor = page_ids[-1]
+            else:
+                page_ids = []
+                items = await fetch_page(db, cursor, page_size, bool(reembed_model))
+                if not items:
+                    break
+                next_cursor = items[-1][0]
+
+            to_embed = [(pid, t) for pid, t in items if t]
+            empty = [pid for pid, t in items if not t]
+            for pid in empty:
+                logger.warning(f"Product {pid} has no text to embed")
+
+            embedded, failed = await embed_page(service, to_embed, batch_size, semaphore)
+            try:
+                await write_embeddings(db, embedded)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Writing page ending at id {next_cursor} failed: {e}")
+                failed.extend(pid for pid, _ in embedded)
+                embedded = []
+            # Running workers' in-memory indexes pick the new vectors up
+            for pid, _ in embedded:
+                record_embedding_change(pid)
+
+            cursor = next_cursor
+            if retry_ids is None:
+                state["last_id"] = cursor
+            state["processed"] += len(embedded)
+            state["failed_ids"] = sorted((set(state["failed_ids"]) - set(page_ids)) | set(failed))
+            save_checkpoint(checkpoint_path, state)
+
+            done_this_run += len(embedded)
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Up to id {next_cursor}: {state['processed']} embedded, {len(state['failed_ids'])} failed "
+                f"({done_this_run / elapsed:.1f} products/s)"
+            )
+
+    logger.info(
+        f"Product embedding backfill completed. Embedded {done_this_run} products this run, "
+        f"{len(state['failed_ids'])} failed (see {checkpoint_path})"
+    )
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Products read and written per page")
+    parser.add_argument("--batch-size", type=int, default=None, help="Texts per embeddings request (default EMBEDDING_BATCH_MAX_SIZE)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Embedding requests in flight")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--reembed-model", default=None, help="Re-embed every product with this model")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first product")
+    parser.add_argument("--retry-failed", action="store_true", help="Only retry products recorded as failed")
+    args = parser.parse_args()
+    asyncio.run(backfill_product_embeddings(
+        page_size=args.page_size,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        checkpoint_path=args.checkpoint,
+        reembed_model=args.reembed_model,
+        restart=args.restart,
+        retry_failed=args.retry_failed,
+    ))
+
 
 if __name__ == "__main__":
-    asyncio.run(backfill_product_embeddings())
+    main()
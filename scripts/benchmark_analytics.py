@@ -0,0 +1,87 @@
+"""Time the analytics plans on a synthetic orders table.
+
+Usage:
+    python scripts/benchmark_analytics.py --size 1000000
+    python scripts/benchmark_analytics.py --size 200000 --tz America/New_York --granularity hour
+
+Seeds a throwaway SQLite database with `--size` completed orders spread
+over one week and times `sales_series` with the ``rollup`` plan (the
+default on SQLite, fed by the order triggers while seeding) and the
+``numpy`` plan (the sql plan needs PostgreSQL). The database is kept between
+runs of the same size, so only the first run pays for seeding.
+"""
+import argparse
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.db.base import Base  # noqa: E402
+from app.models.order import Order  # noqa: E402
+from app.models.order_rollup import OrderDailyRollup  # noqa: E402
+from app.services.analytics import SalesQuery, sales_series  # noqa: E402
+
+WEEK_START = date(2025, 3, 3)
+
+
+def seed(path: Path, size: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    start = datetime.combine(WEEK_START, datetime.min.time(), tzinfo=timezone.utc).timestamp()
+    epochs = np.sort(start - 86400 + rng.integers(0, 9 * 86400, size=size))
+    stamps = np.datetime_as_string(epochs.astype("datetime64[s]"), unit="us")
+    amounts = np.round(rng.gamma(2.0, 250.0, size=size), 2)
+    vendors = rng.integers(1, 50, size=size)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO orders (status, total_amount, vendor_id, vendor_earning, created_at) VALUES ('completed', ?, ?, ?, ?)",
+            ((float(a), int(v), float(a) * 0.9, s.replace("T", " ")) for a, v, s in zip(amounts, vendors, stamps)),
+        )
+    conn.close()
+
+
+async def run(args):
+    path = Path(tempfile.gettempdir()) / f"benchmark_analytics_{args.size}.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sc: Base.metadata.create_all(sc, tables=[Order.__table__, OrderDailyRollup.__table__]))
+    if not sqlite3.connect(path).execute("SELECT 1 FROM orders LIMIT 1").fetchone():
+        started = time.perf_counter()
+        seed(path, args.size)
+        print(f"seeded {args.size} orders: {time.perf_counter() - started:.2f}s")
+
+    query = SalesQuery(WEEK_START, date(2025, 3, 10), granularity=args.granularity, tz=args.tz)
+    async with AsyncSession(engine) as db:
+        for plan in ("rollup", "numpy"):
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                series = await sales_series(db, query, plan=plan)
+                print(
+                    f"[{plan}] {len(series.periods)} periods, {int(series.orders_count.sum())} orders: "
+                    f"{(time.perf_counter() - started) * 1000:.0f}ms"
+                )
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=1_000_000, help="Number of synthetic orders")
+    parser.add_argument("--tz", default="Asia/Kolkata")
+    parser.add_argument("--granularity", default="day", choices=["hour", "day", "week", "month"])
+    parser.add_argument("--repeat", type=int, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Compare recall@k and latency of the product vector index backends.
+
+Usage:
+    python scripts/benchmark_vector_index.py --size 200000 --dim 1536
+    python scripts/benchmark_vector_index.py --from-db --backends exact,ivf,pgvector
+    python scripts/benchmark_vector_index.py --local-text --size 50000
+
+Synthetic mode generates clustered vectors so IVF behaves like it would on
+a real catalog. `--local-text` instead generates product-like names and
+embeds them offline with the local embedding provider. `--from-db` loads
+`products.product_embedding` and is required for the pgvector backend.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.services.vector_index import (  # noqa: E402
+    ExactNumpyIndex,
+    create_vector_index,
+    evaluate_index,
+    exact_ground_truth,
+)
+
+
+def synthetic_vectors(size: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=size)
+    return centers[labels] + 0.35 * rng.normal(size=(size, dim)).astype(np.float32)
+
+
+def synthetic_product_texts(size: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    brands = ["Camlin", "Classmate", "Apsara", "Natraj", "Faber-Castell", "Doms", "Reynolds", "Cello", "Kangaro", "Navneet"]
+    items = ["notebook", "pencil", "ballpoint pen", "geometry box", "eraser", "sharpener", "crayons", "stapler", "school bag", "water bottle"]
+    variants = ["ruled", "unruled", "HB", "2B", "blue", "black", "assorted", "spiral", "long", "single line"]
+    sizes = ["A4", "A5", "small", "medium", "large", "172 pages", "200 pages", "15 cm", "30 cm", "1 litre"]
+    packs = ["pack of 1", "pack of 5", "pack of 10", "box of 12", "set of 24"]
+    grades = ["", "for grade 1-4", "for grade 5-8", "for college", "for office"]
+    picks = [rng.integers(0, len(words), size=size) for words in (brands, variants, items, sizes, packs, grades)]
+    return [
+        f"{brands[b]} {variants[v]} {items[i]} {sizes[z]} {packs[p]} {grades[g]}".strip()
+        for b, v, i, z, p, g in zip(*picks)
+    ]
+
+
+async def run(args):
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    db = None
+
+    if args.from_db:
+        from app.db.session import async_session_maker
+        import app.models  # noqa: F401
+
+        db = async_session_maker()
+        exact = ExactNumpyIndex()
+        await exact.ensure_ready(db)
+        if len(exact) == 0:
+            print("No product embeddings found in the database")
+            await db.close()
+            return
+        rng = np.random.default_rng(1)
+        sample_rows = rng.choice(len(exact), size=min(args.queries, len(exact)), replace=False)
+        queries = exact._matrix[sample_rows] + 0.01 * rng.normal(size=(len(sample_rows), exact.dim))
+    else:
+        if "pgvector" in backends:
+            print("pgvector requires --from-db; skipping it")
+            backends.remove("pgvector")
+        if args.local_text:
+            from app.services.embedding_providers import LocalHashingEmbeddingProvider
+
+            start = time.perf_counter()
+            provider = LocalHashingEmbeddingProvider(dim=args.dim)
+            vectors = provider.embed_sync(synthetic_product_texts(args.size))
+            print(f"[local] embedded {args.size} texts: {time.perf_counter() - start:.2f}s")
+        else:
+            vectors = synthetic_vectors(args.size, args.dim, args.clusters)
+        exact = ExactNumpyIndex()
+        exact.rebuild(enumerate(vectors))
+        rng = np.random.default_rng(1)
+        queries = vectors[rng.choice(args.size, size=args.queries, replace=False)]
+        queries = queries + 0.05 * rng.normal(size=queries.shape).astype(np.float32)
+
+    truth = exact_ground_truth(exact, queries, args.k)
+
+    try:
+        for name in backends:
+            if name == "exact":
+                index = exact
+            else:
+                index = create_vector_index(name)
+                if getattr(index, "rebuild", None) is not None:
+                    start = time.perf_counter()
+                    index.rebuild((int(pid), exact._matrix[row]) for pid, row in exact._rows.items())
+                    if hasattr(index, "train"):
+                        index.train()
+                    print(f"[{name}] build: {time.perf_counter() - start:.2f}s")
+            stats = await evaluate_index(index, queries, truth, k=args.k, db=db)
+            print(stats)
+    finally:
+        if db is not None:
+            await db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="exact,ivf", help="Comma-separated: exact,ivf,pgvector")
+    parser.add_argument("--size", type=int, default=100_000, help="Synthetic catalog size")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--from-db", action="store_true", help="Benchmark against stored product embeddings")
+    parser.add_argument("--local-text", action="store_true", help="Embed synthetic product names with the local provider")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Rebuild order_daily_rollups from the orders table.
+
+Usage:
+    python scripts/rebuild_order_rollups.py
+    python scripts/rebuild_order_rollups.py --since 2026-01-01
+
+The rollups are normally kept current by the ``orders_rollup`` triggers; run
+this after bulk imports done with the triggers disabled, or to repair drift.
+Order writes wait while the rebuild transaction holds its lock, so prefer
+`--since` for routine repairs on a large table.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.db.session import async_session_maker  # noqa: E402
+from app.services.sales_rollup import rebuild_rollups, rollups_enabled  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def rebuild(since: Optional[datetime] = None) -> int:
+    async with async_session_maker() as db:
+        if not rollups_enabled(db):
+            raise SystemExit("Order rollups are only maintained on PostgreSQL and SQLite")
+        started = time.perf_counter()
+        async with db.begin():
+            rows = await rebuild_rollups(db, since)
+        logger.info(
+            f"Rebuilt {rows} rollup rows{f' since {since.isoformat()}' if since else ''} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", default=None, help="Only rebuild orders created on/after this UTC date (YYYY-MM-DD)")
+    args = parser.parse_args()
+    since = None
+    if args.since:
+        since = datetime.fromisoformat(args.since)
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+    asyncio.run(rebuild(since))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+import pytest
+
+from app.core import redis as redis_cache
+
+
+@pytest.fixture
+def local_only(monkeypatch):
+    """Run with Redis unreachable so the shared caches fall back to in-process state."""
+    monkeypatch.setattr(redis_cache, "_redis_available", False)
+    monkeypatch.setattr(redis_cache, "_ensure_redis_client", lambda: None)
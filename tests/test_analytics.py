@@ -0,0 +1,147 @@
+import asyncio
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import app.models  # noqa: F401  (registers every mapper Order relates to)
+from app.db.base import Base
+from app.models.order import Order
+from app.models.order_rollup import OrderDailyRollup
+from app.services.analytics import SalesQuery, period_starts, sales_series, sql_plan
+
+WEEK = (date(2025, 3, 3), date(2025, 3, 10))
+
+
+def _bucket(vendor_id, status, when, orders, sales):
+    return OrderDailyRollup(
+        vendor_id=vendor_id, status=status, bucket_start=when,
+        orders_count=orders, total_sales=sales, total_earnings=sales * 0.9,
+    )
+
+
+def _order(vendor_id, status, when, amount):
+    # SQLite keeps naive UTC
+    return Order(vendor_id=vendor_id, status=status, created_at=when, total_amount=amount, vendor_earning=amount * 0.9)
+
+
+async def _series(rows, query, plan):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sc: Base.metadata.create_all(
+            sc, tables=[Order.__table__, OrderDailyRollup.__table__]
+        ))
+    async with AsyncSession(engine) as db:
+        db.add_all(rows)
+        await db.commit()
+        series = await sales_series(db, query, plan=plan)
+    await engine.dispose()
+    return series.rows()
+
+
+def _rollup_week(tz, vendor_id=None):
+    rows = [
+        # 18:15 UTC Monday is still Monday in Kolkata (23:45) ...
+        _bucket(1, "completed", datetime(2025, 3, 3, 18, 15, tzinfo=timezone.utc), 2, 100),
+        # ... 18:30 UTC is already Tuesday there
+        _bucket(1, "completed", datetime(2025, 3, 3, 18, 30, tzinfo=timezone.utc), 1, 50),
+        _bucket(2, "completed", datetime(2025, 3, 3, 18, 30, tzinfo=timezone.utc), 3, 30),
+        _bucket(1, "cancelled", datetime(2025, 3, 4, 9, 0, tzinfo=timezone.utc), 5, 500),
+        # Outside the week
+        _bucket(1, "completed", datetime(2025, 3, 10, 12, 0, tzinfo=timezone.utc), 9, 900),
+    ]
+    return asyncio.run(_series(rows, SalesQuery(*WEEK, tz=tz, vendor_id=vendor_id), "rollup"))
+
+
+def test_rollup_buckets_are_grouped_into_local_days():
+    rows = _rollup_week("Asia/Kolkata")
+    assert [r["date"] for r in rows] == [f"2025-03-0{d}" for d in range(3, 10)]
+    assert rows[0] == {"date": "2025-03-03", "day": "Mon", "total_sales": 100.0, "total_earnings": 90.0, "orders_count": 2}
+    assert (rows[1]["total_sales"], rows[1]["orders_count"]) == (80.0, 4)
+    assert all(r["orders_count"] == 0 for r in rows[2:])
+
+    assert _rollup_week("UTC")[0]["orders_count"] == 6
+    assert [r["orders_count"] for r in _rollup_week("Asia/Kolkata", vendor_id=1)[:2]] == [2, 1]
+
+
+def test_numpy_plan_matches_rollup_plan():
+    orders = [
+        _order(1, "completed", datetime(2025, 3, 3, 18, 20), 60),
+        _order(1, "completed", datetime(2025, 3, 3, 18, 25), 40),
+        _order(1, "completed", datetime(2025, 3, 3, 18, 40), 50),
+        _order(2, "completed", datetime(2025, 3, 3, 18, 31), 30),
+        _order(1, "cancelled", datetime(2025, 3, 4, 9, 0), 500),
+        _order(1, "completed", datetime(2025, 3, 10, 12, 0), 900),
+    ]
+    rows = asyncio.run(_series(orders, SalesQuery(*WEEK, tz="Asia/Kolkata"), "numpy"))
+    assert [(r["total_sales"], r["orders_count"]) for r in rows[:3]] == [(100.0, 2), (80.0, 2), (0.0, 0)]
+    assert rows[1]["total_earnings"] == 72.0
+
+
+def test_weeks_and_months_align_to_local_boundaries():
+    starts, bounds = period_starts(SalesQuery(date(2025, 3, 5), date(2025, 3, 20), granularity="week"))
+    assert [s.date() for s in starts] == [date(2025, 3, 3), date(2025, 3, 10), date(2025, 3, 17)]
+    assert len(bounds) == len(starts) + 1
+
+    starts, _ = period_starts(SalesQuery(date(2025, 1, 15), date(2025, 3, 1), granularity="month", tz="Europe/Berlin"))
+    assert [s.date() for s in starts] == [date(2025, 1, 1), date(2025, 2, 1)]
+    assert starts[0].utcoffset().total_seconds() == 3600
+
+    # 23 local hours on the spring-forward day
+    starts, _ = period_starts(SalesQuery(date(2025, 3, 30), date(2025, 3, 31), granularity="hour", tz="Europe/Berlin"))
+    assert len(starts) == 23
+
+
+def test_unknown_timezone_is_rejected():
+    with pytest.raises(ValueError):
+        SalesQuery(*WEEK, tz="Mars/Olympus_Mons")
+
+
+def test_sql_plan_bins_periods_by_epoch():
+    query = SalesQuery(*WEEK, tz="Asia/Kolkata")
+    starts, bounds = period_starts(query)
+    statements = []
+
+    class FakeDb:
+        async def execute(self, stmt):
+            statements.append(stmt)
+            # Tuesday in Kolkata, as PostgreSQL returns the epoch (numeric)
+            return SimpleNamespace(all=lambda: [(Decimal(str(bounds[1])), 2, Decimal("80"), Decimal("72"))])
+
+    counts, sales, earnings = asyncio.run(sql_plan(FakeDb(), query, starts, bounds))
+    assert counts.tolist() == [0, 2, 0, 0, 0, 0, 0]
+    assert (sales[1], earnings[1]) == (80.0, 72.0)
+    assert "Asia/Kolkata" in str(statements[0].compile(compile_kwargs={"literal_binds": True}))
+
+
+def test_sqlite_triggers_keep_rollups_in_step_with_orders():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sc: Base.metadata.create_all(
+                sc, tables=[Order.__table__, OrderDailyRollup.__table__]
+            ))
+        query = SalesQuery(*WEEK, tz="Asia/Kolkata")
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            orders = [
+                _order(1, "completed", datetime(2025, 3, 3, 18, 20), 60),
+                _order(1, "completed", datetime(2025, 3, 3, 18, 40), 50),
+                _order(2, "completed", datetime(2025, 3, 4, 9, 0), 30),
+            ]
+            db.add_all(orders)
+            await db.commit()
+            orders[2].status = "cancelled"
+            await db.execute(delete(Order).where(Order.id == orders[1].id))
+            await db.commit()
+            rollup = await sales_series(db, query)
+            scanned = await sales_series(db, query, plan="numpy")
+        await engine.dispose()
+        return rollup, scanned
+
+    rollup, scanned = asyncio.run(scenario())
+    assert rollup.plan == "rollup"
+    assert rollup.rows() == scanned.rows()
+    assert [r["orders_count"] for r in rollup.rows()[:2]] == [1, 0]
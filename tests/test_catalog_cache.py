@@ -0,0 +1,28 @@
+import pytest
+
+from app.services import catalog_cache
+
+pytestmark = pytest.mark.usefixtures("local_only")
+
+
+def test_page_is_served_until_catalog_version_bumps():
+    key = catalog_cache.page_key("public", None, 20, catalog_cache.catalog_version())
+    assert catalog_cache.get_page(key) is None
+
+    catalog_cache.store_page(key, [{"id": 1, "name": "Pencil"}], "next")
+    assert catalog_cache.get_page(key) == ([{"id": 1, "name": "Pencil"}], "next")
+
+    catalog_cache.bump_catalog_version()
+    assert catalog_cache.get_page(key) is None
+    new_key = catalog_cache.page_key("public", None, 20, catalog_cache.catalog_version())
+    assert new_key != key
+
+
+def test_keys_differ_by_cursor_limit_and_filters():
+    keys = {
+        catalog_cache.page_key("public", None, 20, 1),
+        catalog_cache.page_key("public", "abc", 20, 1),
+        catalog_cache.page_key("public", None, 50, 1),
+        catalog_cache.page_key("public", None, 20, 1, category_id=3),
+    }
+    assert len(keys) == 4
@@ -0,0 +1,49 @@
+import asyncio
+
+import numpy as np
+
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+def make_batcher(calls, **kwargs):
+    async def embed_batch(texts):
+        calls.append(list(texts))
+        return [np.full(3, len(t), dtype=np.float32) for t in texts]
+
+    return EmbeddingBatcher(embed_batch, **kwargs)
+
+
+def test_concurrent_requests_share_batches():
+    calls = []
+    batcher = make_batcher(calls, max_batch_size=64, max_wait_ms=20)
+    texts = ["x" * (i % 50 + 1) for i in range(100)]
+
+    results = asyncio.run(batcher.embed_many(texts))
+
+    assert [int(r[0]) for r in results] == [len(t) for t in texts]
+    # 100 requests -> a full batch of 64 and one timed batch; duplicates sent once
+    assert [len(c) for c in calls] == [50, 36]
+    assert batcher.stats()["batches"] == 2
+
+
+def test_batch_failure_reaches_every_waiter():
+    async def failing(texts):
+        raise RuntimeError("api down")
+
+    batcher = EmbeddingBatcher(failing, max_wait_ms=1)
+
+    async def run():
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_duplicate_texts_get_independent_arrays():
+    calls = []
+    batcher = make_batcher(calls, max_wait_ms=1)
+
+    a, b = asyncio.run(batcher.embed_many(["same", "same"]))
+    assert calls == [["same"]]
+    a[0] = -1
+    assert b[0] == 4
@@ -0,0 +1,61 @@
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingCache, embedding_cache_key
+
+
+def make_cache(tmp_path, memory_bytes=1 << 20, max_entries=100):
+    return EmbeddingCache(
+        memory_bytes=memory_bytes,
+        shared_max_entries=max_entries,
+        disk_path=str(tmp_path / "emb.sqlite3"),
+        use_redis=False,
+    )
+
+
+def test_key_ignores_whitespace_but_not_model():
+    assert embedding_cache_key("m", "pencil  box ") == embedding_cache_key("m", "pencil box")
+    assert embedding_cache_key("m", "pencil box") != embedding_cache_key("other", "pencil box")
+
+
+def test_memory_hit_then_shared_hit_after_memory_cleared(tmp_path):
+    cache = make_cache(tmp_path)
+    vec = np.arange(8, dtype=np.float64)
+    assert cache.get("m", "a") is None
+    cache.put("m", "a", vec)
+
+    hit = cache.get("m", "a")
+    assert hit.dtype == np.float32
+    np.testing.assert_allclose(hit, vec)
+    hit[0] = 99  # callers get a copy
+    assert cache.get("m", "a")[0] == 0
+
+    cache.clear()
+    np.testing.assert_allclose(cache.get("m", "a"), vec)
+    stats = cache.stats()
+    assert stats["shared_hits"] == 1 and stats["misses"] == 0
+    assert stats["shared_backend"] == "sqlite"
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    # room for two 4-float vectors
+    cache = make_cache(tmp_path, memory_bytes=32)
+    for name in ("a", "b"):
+        cache.put("m", name, np.ones(4))
+    cache.get("m", "a")
+    cache.put("m", "c", np.ones(4))
+
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2
+    assert stats["memory_evictions"] == 1
+    assert cache._memory.get(embedding_cache_key("m", "b")) is None
+
+
+def test_disk_tier_evicts_oldest_rows(tmp_path):
+    cache = make_cache(tmp_path, max_entries=3)
+    for i in range(5):
+        cache.put("m", f"t{i}", np.full(4, i))
+    cache._disk.evict()
+    cache.clear()
+
+    assert cache.get("m", "t0") is None
+    assert cache.get("m", "t4") is not None
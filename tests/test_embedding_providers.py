@@ -0,0 +1,32 @@
+import asyncio
+
+import numpy as np
+
+from app.services.embedding_providers import LocalHashingEmbeddingProvider
+from app.services.embedding_service import EmbeddingService
+
+
+def test_local_provider_is_deterministic_and_normalised():
+    a = LocalHashingEmbeddingProvider(dim=256).embed_sync(["Camlin Geometry Box", "Apsara pencil pack"])
+    b = LocalHashingEmbeddingProvider(dim=256).embed_sync(["Camlin Geometry Box", "Apsara pencil pack"])
+
+    assert a.shape == (2, 256) and a.dtype == np.float32
+    np.testing.assert_array_equal(a, b)
+    np.testing.assert_allclose(np.linalg.norm(a, axis=1), 1.0, rtol=1e-5)
+
+
+def test_local_provider_places_similar_texts_closer():
+    vecs = LocalHashingEmbeddingProvider(dim=512).embed_sync([
+        "Classmate notebook 200 pages ruled",
+        "Classmate ruled notebook, 200 pages",
+        "Stainless steel water bottle 1 litre",
+    ])
+    assert vecs[0] @ vecs[1] > vecs[0] @ vecs[2] + 0.3
+
+
+def test_service_runs_offline_with_local_provider():
+    service = EmbeddingService(provider=LocalHashingEmbeddingProvider(dim=64))
+    vecs = asyncio.run(service.get_embeddings(["red pen", "blue pen", "red pen"]))
+
+    assert [v.shape for v in vecs] == [(64,)] * 3
+    np.testing.assert_array_equal(vecs[0], vecs[2])
@@ -0,0 +1,43 @@
+import asyncio
+
+from passlib.context import CryptContext
+
+from app.core.hashing import check_password, hash_password, needs_rehash, vendor_pwd_context
+
+
+def test_hash_and_check_round_trip():
+    async def run():
+        hashed = await hash_password("Paris@224")
+        assert await check_password("Paris@224", hashed)
+        assert not await check_password("wrong-password", hashed)
+        assert not await check_password("Paris@224", "not-a-hash")
+
+        vendor_hash = await hash_password("Paris@224", vendor_pwd_context)
+        assert vendor_hash.startswith("$2")
+        assert await check_password("Paris@224", vendor_hash, vendor_pwd_context)
+
+    asyncio.run(run())
+
+
+def test_hashing_does_not_block_the_event_loop():
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(hash_password(f"pw-{i}") for i in range(8)))
+        task.cancel()
+        # The loop kept scheduling the ticker while hashes were computed
+        assert ticks >= 3
+
+    asyncio.run(run())
+
+
+def test_needs_rehash_after_work_factor_change():
+    weaker = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__rounds=1000)
+    assert needs_rehash(weaker.hash("secret"))
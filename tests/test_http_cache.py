@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.core.http_cache import conditional_response, make_etag
+
+LAST_MODIFIED = datetime(2025, 5, 1, 10, 30, 0, tzinfo=timezone.utc)
+app = FastAPI()
+
+
+@app.get("/items")
+async def items(request: Request, response: Response):
+    etag = make_etag("items", 3, LAST_MODIFIED)
+    not_modified = conditional_response(request, response, etag, LAST_MODIFIED)
+    if not_modified is not None:
+        return not_modified
+    return [1, 2, 3]
+
+
+client = TestClient(app)
+
+
+def test_first_request_gets_validators():
+    resp = client.get("/items")
+    assert resp.status_code == 200
+    assert resp.headers["etag"].startswith('"')
+    assert resp.headers["last-modified"] == "Thu, 01 May 2025 10:30:00 GMT"
+
+
+def test_matching_etag_returns_304_without_body():
+    etag = client.get("/items").headers["etag"]
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        resp = client.get("/items", headers={"If-None-Match": header})
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+
+def test_stale_etag_wins_over_if_modified_since():
+    resp = client.get("/items", headers={
+        "If-None-Match": '"stale"',
+        "If-Modified-Since": "Fri, 02 May 2025 00:00:00 GMT",
+    })
+    assert resp.status_code == 200
+
+
+def test_if_modified_since():
+    assert client.get("/items", headers={"If-Modified-Since": "Thu, 01 May 2025 10:30:00 GMT"}).status_code == 304
+    assert client.get("/items", headers={"If-Modified-Since": "Thu, 01 May 2025 10:29:59 GMT"}).status_code == 200
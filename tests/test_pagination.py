@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+import app.models  # noqa: F401  (registers every mapper Product relates to)
+from app.crud.pagination import clamp_page_size, decode_cursor, encode_cursor, fetch_product_page
+from app.db.base import Base
+from app.models.product import Product
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    token = encode_cursor(created_at, 42)
+
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, 42)
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor", "e30", encode_cursor(datetime(2025, 1, 1), 1)[:-3]])
+def test_invalid_cursor_is_rejected(token):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(token)
+    assert exc.value.status_code == 400
+
+
+def test_page_size_is_clamped():
+    assert clamp_page_size(None) == 100
+    assert clamp_page_size(0) == 100
+    assert clamp_page_size(10_000) == 500
+
+
+def test_pages_advance_through_rows_sharing_one_timestamp():
+    async def walk():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sc: Base.metadata.create_all(sc, tables=[Product.__table__]))
+            # The server default stores whole seconds, unlike bound datetimes
+            await conn.execute(text(
+                "INSERT INTO products (id, name, selling_price, created_at) "
+                "VALUES (1, 'a', 1, '2025-03-01 12:00:00'), (2, 'b', 1, '2025-03-01 12:00:00'), "
+                "(3, 'c', 1, '2025-03-01 12:00:00'), (4, 'd', 1, '2025-03-01 12:00:00'), "
+                "(5, 'e', 1, '2025-03-01 12:00:00.250000')"
+            ))
+        pages, cursor = [], None
+        async with AsyncSession(engine) as db:
+            while len(pages) < 5:
+                rows, cursor = await fetch_product_page(db, select(Product), cursor, limit=2)
+                pages.append([p.id for p in rows])
+                if cursor is None:
+                    break
+        await engine.dispose()
+        return pages
+
+    assert asyncio.run(walk()) == [[5, 4], [3, 2], [1]]
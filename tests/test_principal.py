@@ -0,0 +1,139 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.core.principal_cache import invalidate_user, principal_cache
+from app.core.security import (
+    Principal,
+    create_access_token,
+    get_current_admin,
+    get_current_principal,
+    principal_claims,
+)
+from app.db.session import get_db
+from app.models.user import UserRole
+
+app = FastAPI()
+
+
+async def _fake_db():
+    yield object()
+
+
+app.dependency_overrides[get_db] = _fake_db
+
+
+@app.get("/whoami")
+async def whoami(
+    principal: Principal = Depends(get_current_principal),
+    admin: Principal = Depends(get_current_admin),
+):
+    return {"id": principal.id, "role": principal.role.value, "same": principal is admin}
+
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _empty_principal_cache():
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+def _token(**claims):
+    return create_access_token({"sub": "7", **claims})
+
+
+def test_claims_round_trip():
+    user = SimpleNamespace(id=7, role=UserRole.vendor)
+    principal = Principal.from_claims(principal_claims(user, vendor_id="abc"))
+    assert principal.id == 7
+    assert principal.role == UserRole.vendor
+    assert principal.vendor_id == "abc"
+
+
+def test_role_claim_authorises_without_user_lookup(monkeypatch):
+    async def fail_lookup(db, user_id):
+        raise AssertionError("user should not be loaded")
+
+    monkeypatch.setattr("app.crud.crud_user.get_user", fail_lookup)
+    resp = client.get("/whoami", headers={"Authorization": f"Bearer {_token(role='admin')}"})
+    assert resp.status_code == 200
+    assert resp.json() == {"id": 7, "role": "admin", "same": True}
+
+    resp = client.get("/whoami", headers={"Authorization": f"Bearer {_token(role='customer')}"})
+    assert resp.status_code == 403
+
+
+def test_token_without_role_loads_user_once(monkeypatch):
+    calls = []
+
+    async def get_user(db, user_id):
+        calls.append(user_id)
+        return SimpleNamespace(id=user_id, role=UserRole.admin, is_active=True)
+
+    monkeypatch.setattr("app.crud.crud_user.get_user", get_user)
+    resp = client.get("/whoami", headers={"Authorization": f"Bearer {_token()}"})
+    assert resp.status_code == 200
+    assert calls == [7]
+
+
+def test_unknown_user_without_role_is_unauthorised(monkeypatch):
+    async def get_user(db, user_id):
+        return None
+
+    monkeypatch.setattr("app.crud.crud_user.get_user", get_user)
+    resp = client.get("/whoami", headers={"Authorization": f"Bearer {_token()}"})
+    assert resp.status_code == 401
+
+
+def test_cached_token_skips_verification(monkeypatch):
+    token = _token(role="admin")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/whoami", headers=headers).status_code == 200
+
+    def fail_decode(token):
+        raise AssertionError("token should come from the cache")
+
+    monkeypatch.setattr(security, "decode_access_token", fail_decode)
+    assert client.get("/whoami", headers=headers).status_code == 200
+
+
+def test_invalidate_user_rereads_role(monkeypatch):
+    async def get_user(db, user_id):
+        return SimpleNamespace(id=user_id, role=UserRole.customer, is_active=True)
+
+    monkeypatch.setattr("app.crud.crud_user.get_user", get_user)
+    headers = {"Authorization": f"Bearer {_token(role='admin', iat=int(time.time()) - 5)}"}
+    assert client.get("/whoami", headers=headers).status_code == 200
+
+    invalidate_user(7)
+    assert client.get("/whoami", headers=headers).status_code == 403
+
+
+def test_marker_published_by_another_worker_is_honoured(monkeypatch):
+    from app.core import principal_cache as principal_cache_module
+
+    async def get_user(db, user_id):
+        return SimpleNamespace(id=user_id, role=UserRole.admin, is_active=False)
+
+    monkeypatch.setattr("app.crud.crud_user.get_user", get_user)
+    headers = {"Authorization": f"Bearer {_token(role='admin', iat=int(time.time()) - 5)}"}
+    assert client.get("/whoami", headers=headers).status_code == 200
+
+    # Deactivated elsewhere: this process's cache still holds the admin claims
+    redis_cache = principal_cache_module.redis_cache
+    monkeypatch.setattr(principal_cache_module, "_synced_invalidations", None)
+    monkeypatch.setattr(redis_cache, "get_counter", lambda key: 1)
+    monkeypatch.setattr(redis_cache, "zrange_since", lambda key, min_score: {"7": time.time()})
+    assert client.get("/whoami", headers=headers).status_code == 200
+
+    # Picked up by the background sync, not by the request
+    principal_cache_module.sync_stale_markers()
+    assert client.get("/whoami", headers=headers).status_code == 401
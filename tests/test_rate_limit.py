@@ -0,0 +1,68 @@
+import pytest
+from fastapi import Depends, FastAPI, Form
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import LocalTokenBuckets, limit_login_attempts
+
+app = FastAPI()
+
+
+class Login(BaseModel):
+    email: str
+    password: str
+
+
+@app.post("/login", dependencies=[Depends(limit_login_attempts)])
+async def login(body: Login):
+    return {"ok": True}
+
+
+@app.post("/token", dependencies=[Depends(limit_login_attempts)])
+async def token(username: str = Form(...), password: str = Form(...)):
+    return {"ok": True}
+
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def local_buckets(local_only, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_IP_BURST", 100)
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_EMAIL_BURST", 3)
+    rate_limit._local_buckets.clear()
+    yield
+    rate_limit._local_buckets.clear()
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    buckets = LocalTokenBuckets()
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    assert buckets.take("k", capacity=2, rate=1.0) == (True, 0.0)
+    assert buckets.take("k", capacity=2, rate=1.0) == (True, 0.0)
+    allowed, retry_after = buckets.take("k", capacity=2, rate=1.0)
+    assert not allowed and retry_after == pytest.approx(1.0)
+    now[0] += 1.0
+    assert buckets.take("k", capacity=2, rate=1.0)[0]
+
+
+def test_email_budget_is_shared_by_both_endpoints():
+    for _ in range(2):
+        assert client.post("/login", json={"email": "A@x.com", "password": "p"}).status_code == 200
+    assert client.post("/token", data={"username": "a@x.com", "password": "p"}).status_code == 200
+
+    resp = client.post("/login", json={"email": "a@x.com", "password": "p"})
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) >= 1
+    # Other accounts are unaffected
+    assert client.post("/login", json={"email": "b@x.com", "password": "p"}).status_code == 200
+
+
+def test_ip_budget(monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_IP_BURST", 2)
+    assert client.post("/login", json={"email": "a@x.com", "password": "p"}).status_code == 200
+    assert client.post("/login", json={"email": "b@x.com", "password": "p"}).status_code == 200
+    assert client.post("/login", json={"email": "c@x.com", "password": "p"}).status_code == 429
@@ -0,0 +1,30 @@
+import asyncio
+
+from app.db import session as db_session
+from app.db.session import ReplicaRouter
+
+
+def test_without_replicas_reads_use_primary():
+    router = ReplicaRouter([], max_lag_seconds=30, check_seconds=5)
+    assert asyncio.run(router.session_maker()) is db_session.async_session_maker
+
+
+def test_round_robin_skips_lagging_replicas():
+    router = ReplicaRouter(
+        ["sqlite+aiosqlite:///:memory:", "sqlite+aiosqlite:///:memory:"],
+        max_lag_seconds=30,
+        check_seconds=60,
+    )
+    first, second = router.replicas
+
+    async def pick():
+        return await router.session_maker()
+
+    picks = [asyncio.run(pick()) for _ in range(4)]
+    assert picks == [first.session_maker, second.session_maker] * 2
+
+    second.usable = False
+    assert {asyncio.run(pick()) for _ in range(4)} == {first.session_maker}
+
+    first.usable = False
+    assert asyncio.run(pick()) is db_session.async_session_maker
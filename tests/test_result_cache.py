@@ -0,0 +1,110 @@
+import asyncio
+import contextlib
+import time
+
+import pytest
+
+from app.core import result_cache
+from app.core.result_cache import cached_result
+
+
+@pytest.fixture(autouse=True)
+def local_results(local_only):
+    result_cache.clear_local()
+    yield
+    result_cache.clear_local()
+
+
+@pytest.fixture(autouse=True)
+def read_sessions(monkeypatch):
+    """Count the sessions the cache opens; each yields "cache-session-N"."""
+    opened = []
+
+    @contextlib.asynccontextmanager
+    async def read_db():
+        opened.append(f"cache-session-{len(opened) + 1}")
+        yield opened[-1]
+
+    async def session_maker():
+        return read_db
+
+    monkeypatch.setattr(result_cache, "_read_session", session_maker)
+    return opened
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    @cached_result("test:single-flight", ttl=60)
+    async def report(db, week):
+        calls.append(week)
+        await asyncio.sleep(0.05)
+        return {"week": week, "total": 10}
+
+    async def burst():
+        return await asyncio.gather(*(report("2025-03-03") for _ in range(20)))
+
+    results = asyncio.run(burst())
+    assert calls == ["2025-03-03"]
+    assert all(r == {"week": "2025-03-03", "total": 10} for r in results)
+
+    asyncio.run(report("2025-03-10"))
+    assert calls == ["2025-03-03", "2025-03-10"]
+
+
+def test_misses_compute_on_their_own_session():
+    calls = []
+
+    @cached_result("test:own-session", ttl=60)
+    async def report(db):
+        calls.append(db)
+        return {"ok": True}
+
+    asyncio.run(report())
+    assert calls == ["cache-session-1"]
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    calls = []
+
+    @cached_result("test:swr", ttl=60, stale_ttl=600)
+    async def report(db):
+        calls.append(db)
+        return {"version": len(calls)}
+
+    async def scenario():
+        assert await report() == {"version": 1}
+        # Age the entry past its fresh window
+        key = result_cache.result_key("test:swr")
+        expires_at, entry = result_cache._local_entries[key]
+        result_cache._local_entries[key] = (expires_at, {**entry, "fresh_until": time.time() - 1})
+
+        stale = await asyncio.gather(*(report() for _ in range(5)))
+        await asyncio.gather(*result_cache._background)
+        return stale, await report()
+
+    stale, fresh = asyncio.run(scenario())
+    assert all(r == {"version": 1} for r in stale)
+    assert calls == ["cache-session-1", "cache-session-2"]
+    assert fresh == {"version": 2}
+
+
+def test_errors_are_not_cached():
+    calls = []
+
+    @cached_result("test:errors", ttl=60)
+    async def report(db):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database went away")
+        return {"ok": True}
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(report())
+    assert asyncio.run(report()) == {"ok": True}
+
+
+def test_ttl_jitter_stays_within_bounds():
+    values = [result_cache.jittered(100, 0.1) for _ in range(200)]
+    assert all(90 <= v <= 110 for v in values)
+    assert len(set(values)) > 1
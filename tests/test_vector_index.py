@@ -0,0 +1,168 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.vector_index import ExactNumpyIndex, IVFIndex, evaluate_index, exact_ground_truth
+
+
+def test_search_returns_best_matches_first():
+    index = ExactNumpyIndex(initial_capacity=1)
+    index.upsert(1, [1.0, 0.0, 0.0])
+    index.upsert(2, [0.0, 1.0, 0.0])
+    index.upsert(3, [0.9, 0.1, 0.0])
+
+    results = index.search_vectors([1.0, 0.0, 0.0], k=2)
+    assert [pid for pid, _ in results] == [1, 3]
+    assert results[0][1] == pytest.approx(1.0)
+
+
+def test_threshold_filters_and_accepts_json_text():
+    index = ExactNumpyIndex()
+    index.upsert(10, json.dumps([1.0, 1.0]))
+    index.upsert(11, [1.0, -1.0])
+
+    hits = index.search_vectors([2.0, 2.0], k=5, threshold=0.9)
+    assert [pid for pid, _ in hits] == [10]
+    assert hits[0][1] == pytest.approx(1.0)
+    assert index.search_vectors([0.0, 1.0], k=5, threshold=0.99) == []
+
+
+def test_upsert_replaces_and_remove_keeps_rows_consistent():
+    index = ExactNumpyIndex()
+    for pid in range(5):
+        vec = np.zeros(4)
+        vec[pid % 4] = 1.0
+        index.upsert(pid, vec)
+
+    index.upsert(0, [0.0, 0.0, 0.0, 1.0])
+    assert index.remove(1)
+    assert not index.remove(1)
+    assert len(index) == 4
+
+    hits = {pid for pid, _ in index.search_vectors([0.0, 0.0, 0.0, 1.0], k=5, threshold=0.99)}
+    assert hits == {0, 3}
+    assert index.search_vectors([0.0, 1.0, 0.0, 0.0], k=1, threshold=0.5) == []
+
+
+def test_invalid_and_mismatched_vectors_are_skipped():
+    index = ExactNumpyIndex()
+    assert not index.upsert(1, None)
+    assert not index.upsert(2, [0.0, 0.0])
+    assert index.upsert(3, [1.0, 0.0])
+    assert not index.upsert(4, [1.0, 0.0, 0.0])
+    assert len(index) == 1
+
+
+def _clustered_vectors(n=3000, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=n)
+    return centers[labels] + 0.3 * rng.normal(size=(n, dim))
+
+
+def test_ivf_recall_matches_exact_on_clustered_data():
+    vectors = _clustered_vectors()
+    exact = ExactNumpyIndex()
+    exact.rebuild(enumerate(vectors))
+    ivf = IVFIndex(nlist=40, nprobe=8, min_train_size=100)
+    ivf.rebuild(enumerate(vectors))
+    ivf.train()
+    assert ivf.trained
+
+    queries = vectors[:50] + 0.05
+    truth = exact_ground_truth(exact, queries, k=10)
+    stats = asyncio.run(evaluate_index(ivf, queries, truth, k=10))
+    assert stats["backend"] == "ivf"
+    assert stats["recall_at_k"] >= 0.9
+    assert stats["p99_ms"] >= stats["p50_ms"] >= 0
+
+
+def test_ivf_stays_consistent_after_incremental_updates():
+    vectors = _clustered_vectors(n=500)
+    ivf = IVFIndex(nlist=10, nprobe=10, min_train_size=100)
+    ivf.rebuild(enumerate(vectors))
+    ivf.train()
+
+    for pid in range(0, 100):
+        ivf.remove(pid)
+    ivf.upsert(10_000, vectors[200])
+
+    hits = [pid for pid, _ in ivf.search_vectors(vectors[200], k=2)]
+    assert set(hits) == {200, 10_000}
+    assert all(pid >= 100 for pid, _ in ivf.search_vectors(vectors[5], k=20))
+
+
+def test_follows_other_workers_changes_without_reloading(monkeypatch):
+    from app.services.vector_index import exact as exact_module
+
+    log = {1: 1}  # version -> product id
+    monkeypatch.setattr(exact_module, "embedding_version", lambda: max(log))
+    monkeypatch.setattr(exact_module, "changes_since", lambda v: sorted((k, p) for k, p in log.items() if k > v))
+    stored = {1: [1.0, 0.0]}
+    loads = []
+
+    class FakeDb:
+        async def execute(self, query):
+            return SimpleNamespace(all=lambda: list(stored.items()))
+
+    index = ExactNumpyIndex()
+
+    async def fake_load(db):
+        loads.append(max(log))
+        index.rebuild(stored.items())
+
+    monkeypatch.setattr(index, "load", fake_load)
+
+    asyncio.run(index.ensure_ready(FakeDb()))
+    asyncio.run(index.ensure_ready(FakeDb()))
+    assert loads == [1]
+
+    # This worker's own write: applied in place
+    stored[2] = [0.0, 1.0]
+    index.on_product_saved(2, stored[2])
+    log[2] = 2
+    index.on_embedding_version(2)
+
+    # Other workers' writes: only the changed products are re-read
+    stored[3] = [0.6, 0.8]
+    log[3] = 3
+    del stored[1]
+    log[4] = 1
+    asyncio.run(index.ensure_ready(FakeDb()))
+    assert loads == [1]
+    assert len(index) == 2
+    assert index.search_vectors([0.6, 0.8], k=1)[0][0] == 3
+
+    # The log was trimmed past our version: reload
+    del log[1]
+    index._synced_version = 0
+    asyncio.run(index.ensure_ready(FakeDb()))
+    assert loads == [1, 4]
+
+
+def test_ivf_trains_in_the_background(monkeypatch):
+    from app.services.vector_index import exact as exact_module
+
+    monkeypatch.setattr(exact_module, "embedding_version", lambda: None)
+    vectors = _clustered_vectors(n=500)
+    ivf = IVFIndex(nlist=10, nprobe=10, min_train_size=100)
+
+    async def fake_load(db):
+        ivf.rebuild(enumerate(vectors))
+
+    monkeypatch.setattr(ivf, "load", fake_load)
+
+    async def scenario():
+        await ivf.ensure_ready(None)
+        # Not trained yet: the request is served by the exact scan
+        assert not ivf.trained
+        hits = ivf.search_vectors(vectors[7], k=1)
+        await ivf.ensure_ready(None)
+        await ivf._train_task
+        return hits
+
+    assert asyncio.run(scenario())[0][0] == 7
+    assert ivf.trained and not ivf._training